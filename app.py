@@ -1,12 +1,69 @@
 import streamlit as st
+import functools
+import hashlib
+import json
+import logging
 import os
-import io
-from PIL import Image
-import base64
-import PyPDF2
-import warnings
-import google.generativeai as genai
+from ats_resume import (
+    DEFAULT_DPI,
+    DEFAULT_ANALYSIS_CALL_MODE,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_GENERATION_CONFIG,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_PAGES,
+    DEFAULT_MIN_CACHE_TOKENS,
+    DEFAULT_MAX_TEXT_CHARS,
+    DEFAULT_MODE,
+    DEFAULT_MODEL,
+    DEFAULT_PAGES,
+    DEFAULT_INDEX_KIND,
+    DEFAULT_JOB_TTL,
+    DEFAULT_JOB_WORKERS,
+    DEFAULT_RENDER_THREADS,
+    DEFAULT_RENDER_WORKERS,
+    DEFAULT_TOP_K,
+    DONE,
+    FAILED,
+    AnalysisResult,
+    ClientRegistry,
+    ContextCache,
+    JobQueue,
+    MemoryResponseCache,
+    PdfCache,
+    RateLimiter,
+    RenderPool,
+    SqliteBucketStore,
+    SqliteResponseCache,
+    TieredResponseCache,
+    apply_budget,
+    compact_content,
+    configure,
+    content_digest,
+    count_tokens,
+    enable_tracing,
+    extract_pdf_text,
+    generate_analysis,
+    generate_report,
+    generate_structured_analysis,
+    get_metrics,
+    image_options_from_env,
+    open_index,
+    parse_resume,
+    payload_stats,
+    prepare_job_description,
+    prepare_pdf_content,
+    prompts,
+    render_limits_from_env,
+    score_resume,
+    set_span_collector,
+    span,
+    start_metrics_server,
+    stream_analysis,
+    token_budget_from_env,
+    unindexable_reason,
+)
 
+logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file if present
 try:
@@ -15,23 +72,80 @@ try:
 except ImportError:
     pass
 
-# Try importing pdf2image, but provide fallback if not available/configured
-try:
-    import pdf2image
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
-
-# Initialize Google Generative AI client
 api_key = os.getenv("GOOGLE_API_KEY")
-if api_key:
-    genai.configure(api_key=api_key)
 
 # Set model to use (from environment variable or default)
-model_name = os.getenv("MODEL", "gemini-2.0-flash")
+model_name = os.getenv("MODEL", DEFAULT_MODEL)
+generation_config = DEFAULT_GENERATION_CONFIG
+
+# Stream model output into the results as it is generated
+stream_responses = os.getenv("STREAM_RESPONSES", "true").strip().lower() in ("1", "true", "yes", "on")
+
+# Ask for JSON matching a per-analysis schema and render typed results instead of free-form markdown
+structured_output = os.getenv("STRUCTURED_OUTPUT", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# "Analyze Everything" makes one call per analysis ("separate") or a single report call
+# that sends the resume and job description once ("combined")
+analysis_call_mode = os.getenv("ANALYSIS_CALL_MODE", DEFAULT_ANALYSIS_CALL_MODE).strip().lower()
+
+# Upload each resume to Gemini's context cache once and reference it from every analysis
+context_cache_enabled = os.getenv("CONTEXT_CACHE", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# Analyses run as background jobs on this many worker threads, shared by every session,
+# so a rerun never interrupts or repeats a model call in flight
+job_workers = int(os.getenv("JOB_WORKERS", str(DEFAULT_JOB_WORKERS)))
+job_ttl = float(os.getenv("JOB_TTL", str(DEFAULT_JOB_TTL)))
+
+# How often a page waiting on a job refreshes its progress, in seconds
+job_poll_seconds = float(os.getenv("JOB_POLL_SECONDS", "0.5"))
+
+# "local" answers the ATS Score tab from keyword overlap without a model call,
+# "both" adds the model's review below it, "model" always asks the model
+ats_score_mode = os.getenv("ATS_SCORE_MODE", "local").strip().lower()
+
+# Strip boilerplate (company blurb, benefits, EEO text) from the job description before every call
+jd_preprocess = os.getenv("JD_PREPROCESS", "true").strip().lower() in ("1", "true", "yes", "on")
+
+# Send text-layer resumes as parsed sections (experience with dates, education, skills) instead of the full text and pages
+resume_parsed = os.getenv("RESUME_PARSED", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# Per-request token budgets for the resume text and job description; oversized inputs keep their most relevant sections
+input_budget = token_budget_from_env()
 
-# Define show_debug at the beginning of the file
-show_debug = False
+# Check inputs near their budget with the model's count_tokens API instead of trusting the local estimate alone
+token_count_verify = os.getenv("TOKEN_COUNT_VERIFY", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# Uploaded resumes are added to this index (BM25 or semantic) so candidates can be ranked against a job description
+resume_index_dir = os.getenv("RESUME_INDEX_DIR")
+resume_index_kind = os.getenv("RESUME_INDEX_KIND", DEFAULT_INDEX_KIND)
+resume_index_top_k = int(os.getenv("RESUME_INDEX_TOP_K", str(DEFAULT_TOP_K)))
+
+# Rendering settings for PDF to image conversion
+pdf_dpi = int(os.getenv("PDF_DPI", str(DEFAULT_DPI)))
+pdf_pages = os.getenv("PDF_PAGES", DEFAULT_PAGES)
+pdf_max_pages = int(os.getenv("PDF_MAX_PAGES", str(DEFAULT_MAX_PAGES)))
+pdf_render_threads = int(os.getenv("PDF_RENDER_THREADS", str(DEFAULT_RENDER_THREADS)))
+
+# Pages are rendered in this many worker processes so a pathological PDF can't stall or exhaust the server; 0 renders in-process
+pdf_render_workers = int(os.getenv("PDF_RENDER_WORKERS", str(DEFAULT_RENDER_WORKERS)))
+
+# How each resume is sent: "auto" picks text, image or both from the PDF's text layer
+pdf_mode = os.getenv("PDF_MODE", DEFAULT_MODE)
+
+# Text extraction stops after this many characters so oversized PDFs can't stall a session
+pdf_max_text_chars = int(os.getenv("PDF_MAX_TEXT_CHARS", str(DEFAULT_MAX_TEXT_CHARS)))
+
+# Downscaling and re-encoding applied to rendered pages before upload
+image_options = image_options_from_env()
+
+# Serve Prometheus metrics (stage latency, tokens) on this port; unset disables the endpoint
+metrics_port = os.getenv("METRICS_PORT")
+
+# Also export every stage as an OpenTelemetry span (configured through the OTEL_* variables)
+otel_tracing = os.getenv("OTEL_TRACING", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# Offer a sidebar debug panel with this run's stage timings, routing and cache statistics
+debug_panel_enabled = os.getenv("DEBUG_PANEL", "false").strip().lower() in ("1", "true", "yes", "on")
 
 # Configure Streamlit page
 st.set_page_config(
@@ -41,346 +155,64 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700&display=swap');
-    
-    :root {
-        --primary-color: #6C63FF;
-        --primary-light: rgba(108, 99, 255, 0.1);
-        --secondary-color: #4A4A8F;
-        --bg-color: #0E1117;
-        --card-bg: #1A1C24;
-        --text-color: #F1F1F1;
-        --text-secondary: #AFAFAF;
-        --border-color: #2D2D3D;
-        --success-color: #4CAF50;
-        --warning-color: #FFC107;
-        --error-color: #F44336;
-    }
-    
-    .stApp {
-        background-color: var(--bg-color);
-        color: var(--text-color);
-        font-family: 'Poppins', sans-serif;
-    }
-    
-    /* Header styles */
-    .main-header {
-        font-size: 3.2rem;
-        font-weight: 700;
-        background: linear-gradient(90deg, var(--primary-color), var(--secondary-color));
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        padding-bottom: 15px;
-        text-align: center;
-        margin-bottom: 20px;
-        letter-spacing: -0.5px;
-    }
-    
-    .subheader {
-        font-size: 1.5rem;
-        font-weight: 500;
-        color: var(--text-color);
-        margin-bottom: 25px;
-        text-align: center;
-        opacity: 0.9;
-    }
-    
-    /* Card styles */
-    .card {
-        background-color: var(--card-bg);
-        border-radius: 16px;
-        padding: 25px;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.2);
-        margin-bottom: 20px;
-        border: 1px solid var(--border-color);
-    }
-    
-    /* Input styles */
-    div[data-testid="stFileUploader"] {
-        padding: 20px;
-        border: 2px dashed var(--primary-color);
-        border-radius: 12px;
-        margin-bottom: 20px;
-        background-color: rgba(108, 99, 255, 0.05);
-        transition: all 0.3s ease;
-    }
-    
-    div[data-testid="stFileUploader"]:hover {
-        background-color: rgba(108, 99, 255, 0.08);
-        box-shadow: 0 0 0 2px rgba(108, 99, 255, 0.2);
-    }
-    
-    .stTextInput input, .stTextArea textarea {
-        background-color: var(--card-bg);
-        color: var(--text-color);
-        border: 1px solid var(--border-color);
-        border-radius: 10px;
-        padding: 12px;
-        font-size: 16px;
-    }
-    
-    .stTextInput input:focus, .stTextArea textarea:focus {
-        border-color: var(--primary-color);
-        box-shadow: 0 0 0 2px rgba(108, 99, 255, 0.2);
-    }
-    
-    /* Button styles */
-    .stButton button {
-        background: linear-gradient(90deg, var(--primary-color), var(--secondary-color));
-        color: white;
-        border: none;
-        border-radius: 10px;
-        padding: 10px 20px;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 12px rgba(108, 99, 255, 0.3);
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-        font-size: 14px;
-    }
-    
-    .stButton button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 15px rgba(108, 99, 255, 0.4);
-    }
-    
-    .stButton button:active {
-        transform: translateY(0);
-        box-shadow: 0 2px 8px rgba(108, 99, 255, 0.3);
-    }
-    
-    /* Message styles */
-    .chat-message {
-        padding: 1.8rem;
-        border-radius: 12px;
-        margin-bottom: 1.2rem;
-        display: flex;
-        animation: fadeIn 0.5s ease-in-out;
-    }
-    
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(10px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    .chat-message.user {
-        background-color: #2D2F3A;
-        color: var(--text-color);
-    }
-    
-    .chat-message.assistant {
-        background-color: #1E2030;
-        border-left: 5px solid var(--primary-color);
-        color: var(--text-color);
-    }
-    
-    /* Status indicators */
-    .status-box {
-        padding: 15px;
-        border-radius: 10px;
-        margin-bottom: 15px;
-        display: flex;
-        align-items: center;
-        animation: slideIn 0.3s ease-in-out;
-    }
-    
-    @keyframes slideIn {
-        from { transform: translateX(-10px); opacity: 0; }
-        to { transform: translateX(0); opacity: 1; }
-    }
-    
-    .status-box.success {
-        background-color: rgba(76, 175, 80, 0.1);
-        border-left: 4px solid var(--success-color);
-    }
-    
-    .status-box.warning {
-        background-color: rgba(255, 193, 7, 0.1);
-        border-left: 4px solid var(--warning-color);
-    }
-    
-    .status-box.error {
-        background-color: rgba(244, 67, 54, 0.1);
-        border-left: 4px solid var(--error-color);
-    }
-    
-    .status-box.info {
-        background-color: rgba(108, 99, 255, 0.1);
-        border-left: 4px solid var(--primary-color);
-    }
-    
-    /* Results section */
-    .results-header {
-        font-size: 1.6rem;
-        font-weight: 600;
-        color: var(--text-color);
-        margin: 25px 0 15px 0;
-        padding-bottom: 10px;
-        border-bottom: 2px solid var(--primary-color);
-    }
-    
-    .results-container {
-        background-color: var(--card-bg);
-        border-radius: 16px;
-        padding: 20px;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.2);
-        border: 1px solid var(--border-color);
-        margin-top: 20px;
-    }
-    
-    /* Footer styles */
-    .footer {
-        text-align: center;
-        margin-top: 40px;
-        padding: 20px;
-        color: var(--text-secondary);
-        font-size: 14px;
-        border-top: 1px solid var(--border-color);
-    }
-    
-    /* Sidebar styles */
-    div[data-testid="stSidebarUserContent"] {
-        background-color: var(--card-bg);
-        padding: 20px;
-    }
-    
-    div[data-testid="stSidebarUserContent"] .stExpander {
-        background-color: rgba(108, 99, 255, 0.05);
-        border-radius: 10px;
-        border: 1px solid var(--border-color);
-    }
-    
-    /* Input labels */
-    .stTextInput label, .stTextArea label, div[data-testid="stFileUploader"] label {
-        color: var(--text-color);
-        font-weight: 500;
-        font-size: 16px;
-        margin-bottom: 8px;
-    }
-    
-    /* Section headers */
-    .section-title {
-        font-size: 1.3rem;
-        font-weight: 600;
-        margin-bottom: 15px;
-        color: var(--text-color);
-        display: flex;
-        align-items: center;
-        gap: 8px;
-    }
-    
-    /* Progress bar */
-    div[data-testid="stProgressBar"] {
-        background-color: rgba(108, 99, 255, 0.2);
-    }
-    
-    div[data-testid="stProgressBar"] > div {
-        background-color: var(--primary-color);
-    }
-    
-    /* Tab styling */
-    button[data-baseweb="tab"] {
-        background-color: transparent;
-        border-radius: 10px 10px 0 0;
-        border: none;
-        border-bottom: 2px solid transparent;
-        padding: 10px 16px;
-        margin-right: 2px;
-        color: var(--text-secondary);
-        transition: all 0.2s ease;
-    }
-    
-    button[data-baseweb="tab"]:hover {
-        background-color: rgba(108, 99, 255, 0.05);
-        color: var(--text-color);
-    }
-    
-    button[data-baseweb="tab"][aria-selected="true"] {
-        background-color: rgba(108, 99, 255, 0.1);
-        border-bottom: 2px solid var(--primary-color);
-        color: var(--primary-color);
-        font-weight: 500;
-    }
-    
-    /* Tooltip */
-    .tooltip {
-        position: relative;
-        display: inline-block;
-        cursor: help;
-    }
-    
-    .tooltip .tooltiptext {
-        visibility: hidden;
-        width: 200px;
-        background-color: var(--card-bg);
-        color: var(--text-color);
-        text-align: center;
-        border-radius: 6px;
-        padding: 10px;
-        position: absolute;
-        z-index: 1;
-        bottom: 125%;
-        left: 50%;
-        margin-left: -100px;
-        opacity: 0;
-        transition: opacity 0.3s;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.2);
-        border: 1px solid var(--border-color);
-        font-size: 14px;
-    }
-    
-    .tooltip:hover .tooltiptext {
-        visibility: visible;
-        opacity: 1;
-    }
-    
-    /* Loading animation */
-    @keyframes pulse {
-        0% { opacity: 0.6; }
-        50% { opacity: 1; }
-        100% { opacity: 0.6; }
-    }
-    
-    .loader {
-        width: 100%;
-        height: 4px;
-        background-color: rgba(108, 99, 255, 0.2);
-        overflow: hidden;
-        position: relative;
-    }
-    
-    .loader:before {
-        content: "";
-        position: absolute;
-        height: 100%;
-        width: 50%;
-        background-color: var(--primary-color);
-        animation: loading 1.5s infinite ease;
-    }
-    
-    @keyframes loading {
-        0% { transform: translateX(-100%); }
-        100% { transform: translateX(200%); }
-    }
-    
-    /* Hide loader class for JavaScript manipulation */
-    .hidden {
-        display: none !important;
-    }
-    
-    /* Responsive adjustments */
-    @media screen and (max-width: 768px) {
-        .main-header {
-            font-size: 2.5rem;
-        }
-        
-        .subheader {
-            font-size: 1.2rem;
-        }
-    }
-    </style>
+show_debug = debug_panel_enabled and st.sidebar.toggle("🔧 Debug panel")
+# Spans finished during this run, and (label, value) pairs, shown in the debug panel
+debug_spans = []
+debug_items = []
+set_span_collector(debug_spans if show_debug else None)
+
+def debug(label, value):
+    """Add a value to the debug panel for this run"""
+    if show_debug:
+        debug_items.append((label, value))
+
+@st.cache_resource
+def load_stylesheet():
+    """Read the page stylesheet once per process"""
+    with open(os.path.join(os.path.dirname(__file__), "assets", "style.css"), encoding="utf-8") as f:
+        return f.read()
+
+@st.cache_resource
+def configure_client():
+    """Configure the Gemini SDK once per process"""
+    if api_key:
+        configure(
+            api_key,
+            transport=os.getenv("GEMINI_TRANSPORT") or None,
+            api_endpoint=os.getenv("GEMINI_API_ENDPOINT") or None,
+        )
+    return bool(api_key)
+
+@st.cache_resource
+def get_client_registry():
+    """Gemini models, the connection limit and the rate limiter shared by every session"""
+    rpm = os.getenv("GEMINI_RPM")
+    tpm = os.getenv("GEMINI_TPM")
+    limiter = None
+    if rpm or tpm:
+        # A shared bucket file keeps several server processes under one quota
+        db_path = os.getenv("GEMINI_RATE_LIMIT_DB")
+        limiter = RateLimiter(
+            rpm=float(rpm) if rpm else None,
+            tpm=float(tpm) if tpm else None,
+            store=SqliteBucketStore(db_path) if db_path else None,
+        )
+    return ClientRegistry(
+        max_connections=int(os.getenv("GEMINI_MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS))),
+        limiter=limiter,
+    )
+
+@st.cache_resource
+def start_telemetry():
+    """Start the metrics endpoint and tracing once per process"""
+    if otel_tracing and not enable_tracing("ats-resume"):
+        logger.warning("OTEL_TRACING is set but opentelemetry is not installed; tracing is off")
+    return start_metrics_server(int(metrics_port)) if metrics_port else None
+
+configure_client()
+start_telemetry()
+
+st.markdown("<style>\n" + load_stylesheet() + "</style>\n" + """
     
     <div class="main-header">ATS Resume Expert</div>
     <div class="subheader">Upload your resume and job description for AI-powered career insights</div>
@@ -415,6 +247,18 @@ input_text = st.text_area("Paste the job description you're applying for:",
                         key="input", 
                         height=200)
 
+# Every analysis, score and ranking uses the same compact job description
+job_description = input_text
+if input_text and jd_preprocess:
+    prepared_jd = prepare_job_description(input_text)
+    job_description = prepared_jd.text
+    if prepared_jd.tokens_saved > 0:
+        st.caption(
+            f"✂️ Trimmed the job description from ~{prepared_jd.original_tokens} to ~{prepared_jd.tokens} tokens, "
+            f"saving ~{prepared_jd.tokens_saved} input tokens on each analysis call."
+        )
+    debug("Job description", prepared_jd.as_dict())
+
 st.markdown('</div>', unsafe_allow_html=True)
 
 st.markdown('---', unsafe_allow_html=True)
@@ -427,34 +271,95 @@ if uploaded_file is not None:
     st.markdown('</div>', unsafe_allow_html=True)
 st.markdown('</div>', unsafe_allow_html=True)
 
+@st.cache_resource
+def get_pdf_cache():
+    """Process-wide cache of prepared PDF content, shared across reruns and sessions"""
+    return PdfCache(
+        max_bytes=int(os.getenv("PDF_CACHE_MAX_MB", "256")) * 1024 * 1024,
+        disk_dir=os.getenv("PDF_CACHE_DIR") or None,
+        max_disk_bytes=int(os.getenv("PDF_CACHE_DISK_MAX_MB", "1024")) * 1024 * 1024,
+    )
+
+@st.cache_resource
+def get_render_pool():
+    """Process-wide pool of PDF render workers, or None when PDF_RENDER_WORKERS is 0"""
+    if pdf_render_workers <= 0:
+        return None
+    return RenderPool(max_workers=pdf_render_workers, limits=render_limits_from_env())
+
+@st.cache_resource
+def get_resume_index():
+    """Process-wide resume index, or None when RESUME_INDEX_DIR is not set"""
+    if not resume_index_dir:
+        return None
+    return open_index(resume_index_dir, resume_index_kind, os.getenv("RESUME_EMBEDDER"))
+
+def resume_text_for(uploaded_file, pdf_content):
+    """Plain text of the resume, reusing the text already prepared for the model when there is one"""
+    if isinstance(pdf_content, str):
+        return pdf_content
+    if pdf_content and isinstance(pdf_content[0], str):
+        return pdf_content[0]
+    # Image route: the text layer was judged poor, but may still carry keywords
+    return extract_pdf_text(uploaded_file.getvalue(), max_chars=pdf_max_text_chars)
+
+def index_resume(uploaded_file, pdf_content):
+    """Add the uploaded resume to the resume index unless this exact file is already there.
+
+    Resumes are keyed by content digest, so two uploads that share a file name
+    are kept apart; the file name is only shown when ranking.
+    """
+    index = get_resume_index()
+    if index is None:
+        return
+    digest = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    if digest in index:
+        return
+    text = resume_text_for(uploaded_file, pdf_content)
+    reason = unindexable_reason(text)
+    if reason:
+        st.caption(f"Not added to the resume index: {reason}")
+        return
+    index.add(digest, text, digest=digest, title=uploaded_file.name)
+    index.flush()
+
 def input_pdf_setup(uploaded_file):
     """Convert PDF to images and prepare for API submission"""
     if uploaded_file is not None:
         try:
-            if PDF2IMAGE_AVAILABLE:
-                # Primary method: Convert PDF to image using pdf2image
-                try:
-                    images = pdf2image.convert_from_bytes(uploaded_file.read())
-                    # Use the first page
-                    first_page = images[0]
-                    
-                    # Convert to PIL Image for Gemini
-                    return first_page
-                except Exception as e:
-                    st.warning(f"pdf2image failed: {str(e)}. Trying alternate method...")
-                    # If pdf2image fails, fall back to text extraction
+            uploaded_file.seek(0)
+            with span("upload_read") as attributes:
+                pdf_bytes = uploaded_file.read()
+                attributes["bytes"] = len(pdf_bytes)
+            routing = []
+            pdf_content = prepare_pdf_content(
+                pdf_bytes,
+                cache=get_pdf_cache(),
+                dpi=pdf_dpi,
+                pages=pdf_pages,
+                max_pages=pdf_max_pages,
+                thread_count=pdf_render_threads,
+                image_options=image_options,
+                mode=pdf_mode,
+                max_text_chars=pdf_max_text_chars,
+                on_route=routing.append,
+                on_warning=st.warning,
+                render_pool=get_render_pool(),
+            )
             
-            # Fallback: Extract text from PDF
-            uploaded_file.seek(0)  # Reset file pointer
-            pdf_reader = PyPDF2.PdfReader(uploaded_file)
-            text_content = ""
-            for page_num in range(len(pdf_reader.pages)):
-                text_content += pdf_reader.pages[page_num].extract_text()
+            # Only suggest Poppler when the text route was forced by a rendering problem
+            if routing and routing[0].reason in ("pdf2image unavailable", "rendering failed"):
+                st.markdown('<div class="status-box info">', unsafe_allow_html=True)
+                st.write("ℹ️ Using text extraction instead of image processing. For best results, install Poppler.")
+                st.markdown('</div>', unsafe_allow_html=True)
             
-            st.markdown('<div class="status-box info">', unsafe_allow_html=True)
-            st.write("ℹ️ Using text extraction instead of image processing. For best results, install Poppler.")
-            st.markdown('</div>', unsafe_allow_html=True)
-            return text_content
+            if routing:
+                debug("PDF routing", routing[0].as_dict())
+            if show_debug and image_options is not None and isinstance(pdf_content, list):
+                debug("Image payload", payload_stats([page for page in pdf_content if not isinstance(page, str)]))
+            
+            index_resume(uploaded_file, pdf_content)
+            return pdf_content
         except Exception as e:
             st.markdown('<div class="status-box error">', unsafe_allow_html=True)
             st.write(f"❌ Error processing PDF: {str(e)}")
@@ -463,56 +368,134 @@ def input_pdf_setup(uploaded_file):
     else:
         raise FileNotFoundError("No file uploaded")
 
-def analyze_resume(prompt, pdf_content, job_description):
-    """Send resume and job description to Gemini API for analysis"""
-    try:
-        if not api_key:
-            return "Error: GOOGLE_API_KEY environment variable not found! Please set it before using this application."
-        
-        # Initialize the model
-        model = genai.GenerativeModel(
-            model_name=model_name,
-            generation_config={"temperature": 0.2, "top_p": 0.95, "top_k": 64, "max_output_tokens": 2048},
+@st.cache_resource
+def get_response_cache():
+    """Process-wide cache of model responses, with an optional SQLite tier"""
+    ttl = float(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+    cache_path = os.getenv("RESPONSE_CACHE_PATH")
+    return TieredResponseCache(
+        MemoryResponseCache(max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512")), ttl=ttl),
+        SqliteResponseCache(cache_path, ttl=ttl) if cache_path else None,
+    )
+
+@st.cache_resource
+def get_context_cache():
+    """Process-wide Gemini context cache for resume content, or None when disabled"""
+    if not context_cache_enabled:
+        return None
+    return ContextCache(
+        ttl=int(os.getenv("CONTEXT_CACHE_TTL", str(DEFAULT_CACHE_TTL))),
+        min_tokens=int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", str(DEFAULT_MIN_CACHE_TOKENS))),
+    )
+
+@st.cache_resource
+def get_job_queue():
+    """Background job queue shared by every session; jobs outlive the run that submitted them"""
+    return JobQueue(max_workers=job_workers, ttl=job_ttl)
+
+def analysis_options():
+    """Model settings and shared clients for a job; resolved here because jobs run outside the script thread"""
+    return dict(
+        model_name=model_name,
+        generation_config=generation_config,
+        cache=get_response_cache(),
+        registry=get_client_registry(),
+        context_cache=get_context_cache(),
+    )
+
+def analyze_resume(prompt_key, pdf_content, job_description, options, on_progress):
+    """Job body: one analysis in the configured output mode, publishing streamed text as it arrives"""
+    if structured_output:
+        # Partial JSON is unreadable, so structured results are only shown whole
+        return generate_structured_analysis(prompt_key, pdf_content, job_description, **options)
+    if not stream_responses:
+        return generate_analysis(prompts[prompt_key], pdf_content, job_description, **options)
+    chunks = []
+    for chunk in stream_analysis(
+        prompts[prompt_key],
+        pdf_content,
+        job_description,
+        on_complete=lambda timings: on_progress(**timings),
+        **options,
+    ):
+        chunks.append(chunk)
+        on_progress("".join(chunks))
+    return "".join(chunks)
+
+def analyze_report(pdf_content, job_description, prompt_keys, options, on_progress):
+    """Job body: all requested analyses from one report call, as {prompt_key: response}"""
+    return generate_report(pdf_content, job_description, prompt_keys, structured=structured_output, **options)
+
+def job_key(*parts):
+    """Identity of an analysis, so a repeated click while it runs attaches to the same job"""
+    payload = json.dumps([model_name, generation_config, structured_output, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def submit_analyses(pdf_content, job_description, prompt_keys):
+    """Queue the analyses and return {prompt_key: job_id}; a combined report is one job for all of them"""
+    queue = get_job_queue()
+    options = analysis_options()
+    resume_digest = content_digest(pdf_content)
+    if analysis_call_mode == "combined" and len(prompt_keys) > 1:
+        job_id = queue.submit(
+            analyze_report, pdf_content, job_description, list(prompt_keys), options,
+            key=job_key("report", list(prompt_keys), resume_digest, job_description),
         )
-        
-        # Build the prompt
-        system_prompt = prompt
-        user_prompt = f"Job Description: {job_description}\n\n"
-        
-        # Handle different content types (image vs text)
-        if isinstance(pdf_content, Image.Image):
-            # Image content from PDF
-            content_parts = [
-                system_prompt,
-                user_prompt,
-                pdf_content
-            ]
-            
-            # Make the API call
-            response = model.generate_content(content_parts)
-            
+        return {prompt_key: job_id for prompt_key in prompt_keys}
+    return {
+        prompt_key: queue.submit(
+            analyze_resume, prompt_key, pdf_content, job_description, options,
+            key=job_key(prompt_key, stream_responses, resume_digest, job_description),
+        )
+        for prompt_key in prompt_keys
+    }
+
+def job_response(job, prompt_key):
+    """The finished job's response for ``prompt_key``; report jobs hold every analysis"""
+    return job.result[prompt_key] if isinstance(job.result, dict) else job.result
+
+def show_job_error(job):
+    """Report a failed job in the page and its traceback in the sidebar"""
+    st.markdown('<div class="status-box error">', unsafe_allow_html=True)
+    st.write(f"❌ Error in API call: {job.error_type}")
+    st.markdown('</div>', unsafe_allow_html=True)
+    st.sidebar.expander("Error Details", expanded=False).code(job.details)
+
+def show_response(response, container=st):
+    """Render a free-form reply or a structured result"""
+    with span("ui_render"):
+        if isinstance(response, AnalysisResult):
+            container.markdown(response.to_markdown())
         else:
-            # Text content from PDF
-            content_parts = [
-                system_prompt,
-                f"{user_prompt}Resume Content:\n{pdf_content}"
-            ]
-            
-            # Make the API call
-            response = model.generate_content(content_parts)
-        
-        # Debug response - we'll handle this outside the function
-        
-        # Extract the text from the response
-        return response.text
-        
-    except Exception as e:
-        st.markdown('<div class="status-box error">', unsafe_allow_html=True)
-        st.write(f"❌ Error in API call: {type(e).__name__}")
-        st.markdown('</div>', unsafe_allow_html=True)
-        import traceback
-        st.sidebar.expander("Error Details", expanded=False).code(traceback.format_exc())
-        return f"Error in API call: {str(e)}"
+            container.write(response)
+
+def debug_response(prompt_key, response):
+    debug(f"Response: {prompt_key}", response.as_dict() if isinstance(response, AnalysisResult) else str(response))
+
+def show_debug_panel():
+    """Stage timings of this run, process-wide stage latency and the values collected with ``debug``"""
+    with st.sidebar.expander("🔧 Debug panel", expanded=True):
+        st.markdown("**This run**")
+        if debug_spans:
+            st.dataframe([record.as_dict() for record in debug_spans], hide_index=True)
+        else:
+            st.caption("No instrumented stage ran.")
+        st.markdown("**Stage latency since start**")
+        st.json(get_metrics().stage_summary(), expanded=False)
+        for label, value in debug_items:
+            st.markdown(f"**{label}**")
+            st.json(value, expanded=False)
+
+def local_ats_score(uploaded_file, pdf_content, job_description):
+    """Keyword match score computed in-process, or None if the resume has no usable text"""
+    resume_text = resume_text_for(uploaded_file, pdf_content)
+    if not resume_text.strip():
+        return None
+    return score_resume(resume_text, job_description)
+
+def show_local_score(local_score):
+    st.markdown(local_score.to_markdown())
+    st.caption("⚡ Scored locally from keyword overlap with the job description, without a model call.")
 
 # Create a tab-based interface for analysis options
 st.markdown('---', unsafe_allow_html=True)
@@ -525,61 +508,53 @@ analysis_tabs = st.tabs([
     "🎯 ATS Scoring"
 ])
 
-# Prompts for different analyses
-prompts = {
-    "resume_review": """
-    You are an experienced Technical Human Resource Manager. Your task is to review the provided resume against the job description. 
-    Please share your professional evaluation on whether the candidate's profile aligns with the role.
-    Highlight the strengths and weaknesses of the applicant in relation to the specified job requirements.
-    Provide a structured analysis with clear sections.
-    """,
-    
-    "skill_gap": """
-    You are an experienced Technical Human Resource Manager specializing in skill assessment.
-    Extract all skills mentioned in the resume and compare them with the skills required in the job description.
-    Identify skill gaps and provide recommendations on which skills the candidate should develop further.
-    Format your response with clear sections for:
-    1. Skills found in resume
-    2. Skills required by job description
-    3. Skill gaps identified
-    4. Recommendations for improvement
-    """,
-    
-    "improvement": """
-    You are an expert Resume Consultant with deep experience in technical hiring.
-    Analyze the provided resume against the job description and suggest specific improvements to make the resume more effective.
-    Focus on:
-    1. Content organization and structure
-    2. Highlighting relevant experiences better
-    3. Keyword optimization for ATS scanning
-    4. Quantifying achievements
-    5. Formatting and presentation suggestions
-    """,
-    
-    "ats_score": """
-    You are an expert ATS (Applicant Tracking System) scanner with deep understanding of how resume filtering works.
-    Evaluate the resume against the provided job description and assign a percentage match score.
-    Your response should have the following structure:
-    1. ATS Match Score: [X]%
-    2. Keywords Found: [list keywords found in both resume and job description]
-    3. Keywords Missing: [list important keywords from job description not found in the resume]
-    4. Recommendations: [specific suggestions to improve ATS matching]
-    5. Final Thoughts: [brief conclusion about the candidate's chances]
-    """
+# Result headers for each analysis, in tab order
+analysis_headers = {
+    "resume_review": "📊 Resume Analysis Results",
+    "skill_gap": "🧩 Skills Analysis & Gap Assessment",
+    "improvement": "⚡ Improvement Suggestions",
+    "ats_score": "🎯 ATS Compatibility Score",
 }
 
 # Add buttons in the tabs and handle results
 with analysis_tabs[0]:
     resume_review_btn = st.button("🔎 Analyze Resume Fit", key="review_btn", use_container_width=True)
+    review_tab_results = st.empty()
     
 with analysis_tabs[1]:
     skill_analysis_btn = st.button("🔎 Analyze Skills & Gaps", key="skills_btn", use_container_width=True)
+    skills_tab_results = st.empty()
     
 with analysis_tabs[2]:
     improvement_btn = st.button("🔎 Get Improvement Tips", key="improve_btn", use_container_width=True)
+    improve_tab_results = st.empty()
     
 with analysis_tabs[3]:
     ats_score_btn = st.button("🔎 Calculate ATS Score", key="ats_btn", use_container_width=True)
+    ats_tab_results = st.empty()
+
+# Progress messages shown while a single analysis runs
+analysis_messages = {
+    "resume_review": "Analyzing resume alignment with job description...",
+    "skill_gap": "Extracting skills and analyzing gaps...",
+    "improvement": "Generating improvement suggestions...",
+    "ats_score": "Calculating ATS compatibility score...",
+}
+
+# Placeholders where "Analyze Everything" renders each result
+tab_results = {
+    "resume_review": review_tab_results,
+    "skill_gap": skills_tab_results,
+    "improvement": improve_tab_results,
+    "ats_score": ats_tab_results,
+}
+
+analyze_all_btn = st.button("🚀 Analyze Everything", key="analyze_all_btn", use_container_width=True)
+
+# Ranking needs no upload: it searches every resume indexed so far
+rank_btn = False
+if get_resume_index() is not None:
+    rank_btn = st.button("🏆 Rank Indexed Resumes", key="rank_btn", use_container_width=True)
 
 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -616,124 +591,182 @@ def end_processing():
         unsafe_allow_html=True
     )
 
+@st.fragment(run_every=job_poll_seconds)
+def poll_jobs(job_ids, prompt_key=None):
+    """Refresh the progress of pending jobs; a full rerun renders the results once any of them finishes.
+
+    With ``prompt_key`` it shows that single analysis's streamed text, otherwise a summary of every job.
+    """
+    queue = get_job_queue()
+    jobs = [queue.get(job_id) for job_id in job_ids]
+    if any(job is None or job.done for job in jobs):
+        st.rerun()
+    if prompt_key is not None:
+        job = jobs[0]
+        if job.partial:
+            st.markdown(job.partial + " ▌")
+        elif queue.position(job.job_id):
+            st.caption(f"⏳ Waiting for {queue.position(job.job_id)} earlier requests...")
+        else:
+            st.markdown(analysis_messages[prompt_key])
+    else:
+        queued = sum(1 for job in jobs if job.started is None)
+        st.markdown(f"Running all analyses... {len(jobs)} still in progress" + (f", {queued} queued" if queued else ""))
+
+def show_submission(submission):
+    """Render the analyses of the latest submission from their jobs, polling any still in progress"""
+    queue = get_job_queue()
+    single = submission["single"]
+    local_score = submission["local_score"]
+    jobs = {prompt_key: queue.get(job_id) for prompt_key, job_id in submission["jobs"].items()}
+    shown = [single] if single else [key for key in prompts if key in jobs or (key == "ats_score" and local_score is not None)]
+    pending = []
+    for prompt_key in shown:
+        container = results_container if single else tab_results[prompt_key].container()
+        with container:
+            st.markdown(f'<div class="results-header">{analysis_headers[prompt_key]}</div>', unsafe_allow_html=True)
+            if prompt_key == "ats_score" and local_score is not None:
+                show_local_score(local_score)
+            job = jobs.get(prompt_key)
+            if prompt_key not in jobs:
+                # Answered in-process, no model call needed
+                pass
+            elif job is None:
+                st.info("This result has expired. Run the analysis again.")
+            elif job.status == DONE:
+                response = job_response(job, prompt_key)
+                show_response(response)
+                debug_response(prompt_key, response)
+                if "ttft_seconds" in job.info:
+                    st.caption(
+                        f"⏱️ First text after {job.info['ttft_seconds']:.2f}s · "
+                        f"complete after {job.info['total_seconds']:.2f}s"
+                        + (" (cached)" if job.info["cached"] else "")
+                    )
+                if submission["trimmed"]:
+                    st.caption(f"✂️ {submission['trimmed']}.")
+            elif job.status == FAILED:
+                show_job_error(job)
+            elif single:
+                poll_jobs([job.job_id], prompt_key)
+            else:
+                st.caption(analysis_messages[prompt_key])
+            if job is not None and not job.done and job.job_id not in pending:
+                pending.append(job.job_id)
+            st.markdown('</div>', unsafe_allow_html=True)
+    if pending:
+        start_processing()
+        if not single:
+            with results_container:
+                poll_jobs(pending)
+    else:
+        end_processing()
+        if not single:
+            results_container.markdown("✅ All analyses complete. Open each tab to see its results.")
+    # A report job answers several tabs; list it once
+    for job in {job.job_id: job for job in jobs.values() if job is not None}.values():
+        debug(f"Job {job.job_id[:8]}", job.as_dict())
+        if show_debug:
+            # The job's stages ran in a worker thread, after the run that submitted it
+            debug_spans.extend(job.spans)
+
+# The single analysis requested by a tab button, if any
+selected_analysis = (
+    "resume_review" if resume_review_btn
+    else "skill_gap" if skill_analysis_btn
+    else "improvement" if improvement_btn
+    else "ats_score" if ats_score_btn
+    else None
+)
+any_analysis_btn = selected_analysis is not None or analyze_all_btn
+
+# Rank indexed resumes against the job description without any model call
+if rank_btn:
+    if not input_text:
+        st.markdown('<div class="status-box error">', unsafe_allow_html=True)
+        st.write("❌ Please enter a job description.")
+        st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        hits = get_resume_index().search(job_description, resume_index_top_k)
+        results_container.markdown('<div class="results-header">🏆 Top Candidates</div>', unsafe_allow_html=True)
+        if hits:
+            results_container.table([
+                {"Rank": rank, "Resume": hit.title or hit.name, "Match score": round(hit.score, 2)}
+                for rank, hit in enumerate(hits, start=1)
+            ])
+            results_container.caption(
+                f"Ranked {len(get_resume_index())} indexed resumes. Upload a shortlisted resume for a full review."
+            )
+        else:
+            results_container.write("No indexed resume matches this job description yet.")
+        results_container.markdown('</div>', unsafe_allow_html=True)
+
 # Handle button clicks
-if uploaded_file is None and (resume_review_btn or skill_analysis_btn or improvement_btn or ats_score_btn):
+if uploaded_file is None and any_analysis_btn:
     st.markdown('<div class="status-box error">', unsafe_allow_html=True)
     st.write("❌ Please upload a resume (PDF) first.")
     st.markdown('</div>', unsafe_allow_html=True)
-elif not input_text and (resume_review_btn or skill_analysis_btn or improvement_btn or ats_score_btn):
+elif not input_text and any_analysis_btn:
     st.markdown('<div class="status-box error">', unsafe_allow_html=True)
     st.write("❌ Please enter a job description.")
     st.markdown('</div>', unsafe_allow_html=True)
+elif not api_key and any_analysis_btn:
+    st.markdown('<div class="status-box error">', unsafe_allow_html=True)
+    st.write("❌ GOOGLE_API_KEY environment variable not found! Please set it before using this application.")
+    st.markdown('</div>', unsafe_allow_html=True)
 else:
     try:
-        if resume_review_btn:
-            with st.spinner(""):
-                # Show loading indicator
-                start_processing()
-                
-                progress_placeholder = results_container.empty()
-                progress_placeholder.markdown("Analyzing resume alignment with job description...")
-                
-                pdf_content = input_pdf_setup(uploaded_file)
-                response = analyze_resume(prompts["resume_review"], pdf_content, input_text)
-                
-                # Show debug info if enabled
-                if show_debug:
-                    st.sidebar.json(str(response))
-                
-                # Clear the placeholder with processing message
-                progress_placeholder.empty()
-                
-                # Hide loading indicator
-                end_processing()
-                
-                # Display results
-                
-                results_container.markdown('<div class="results-header">📊 Resume Analysis Results</div>', unsafe_allow_html=True)
-                results_container.write(response)
-                results_container.markdown('</div>', unsafe_allow_html=True)
-                
-        elif skill_analysis_btn:
-            with st.spinner(""):
-                # Show loading indicator
-                start_processing()
-                
-                progress_placeholder = results_container.empty()
-                progress_placeholder.markdown("Extracting skills and analyzing gaps...")
-                
-                pdf_content = input_pdf_setup(uploaded_file)
-                response = analyze_resume(prompts["skill_gap"], pdf_content, input_text)
-                
-                # Show debug info if enabled
-                if show_debug:
-                    st.sidebar.json(str(response))
-                
-                # Clear the placeholder with processing message
-                progress_placeholder.empty()
-                
-                # Hide loading indicator
-                end_processing()
-                
-                # Display results
-                
-                results_container.markdown('<div class="results-header">🧩 Skills Analysis & Gap Assessment</div>', unsafe_allow_html=True)
-                results_container.write(response)
-                results_container.markdown('</div>', unsafe_allow_html=True)
-                
-        elif improvement_btn:
+        if any_analysis_btn:
             with st.spinner(""):
-                # Show loading indicator
-                start_processing()
-                
-                progress_placeholder = results_container.empty()
-                progress_placeholder.markdown("Generating improvement suggestions...")
-                
+                # Prepare the PDF once and share it across every analysis
                 pdf_content = input_pdf_setup(uploaded_file)
-                response = analyze_resume(prompts["improvement"], pdf_content, input_text)
-                
-                # Show debug info if enabled
-                if show_debug:
-                    st.sidebar.json(str(response))
                 
-                # Clear the placeholder with processing message
-                progress_placeholder.empty()
+                local_score = None
+                if (analyze_all_btn or selected_analysis == "ats_score") and ats_score_mode != "model":
+                    local_score = local_ats_score(uploaded_file, pdf_content, job_description)
                 
-                # Hide loading indicator
-                end_processing()
+                # The local score answers the ATS tab on its own unless the model's review is also wanted
+                prompt_keys = [
+                    key for key in (prompts if analyze_all_btn else [selected_analysis])
+                    if not (key == "ats_score" and local_score is not None and ats_score_mode == "local")
+                ]
                 
-                # Display results
+                if resume_parsed:
+                    # Cached by the hash of the text, so repeated clicks parse once
+                    parsed_resume = parse_resume(resume_text_for(uploaded_file, pdf_content))
+                    debug("Parsed resume", parsed_resume.as_dict())
+                    pdf_content = compact_content(pdf_content, parsed_resume)
                 
-                results_container.markdown('<div class="results-header">⚡ Improvement Suggestions</div>', unsafe_allow_html=True)
-                results_container.write(response)
-                results_container.markdown('</div>', unsafe_allow_html=True)
+                # Fit the model inputs to the budget; the local score above still sees the whole resume
+                budgeted = apply_budget(
+                    pdf_content,
+                    job_description,
+                    input_budget,
+                    counter=functools.partial(count_tokens, model_name=model_name, registry=get_client_registry())
+                    if token_count_verify else None,
+                )
+                debug("Token budget", budgeted.as_dict())
                 
-        elif ats_score_btn:
-            with st.spinner(""):
-                # Show loading indicator
-                start_processing()
-                
-                progress_placeholder = results_container.empty()
-                progress_placeholder.markdown("Calculating ATS compatibility score...")
-                
-                pdf_content = input_pdf_setup(uploaded_file)
-                response = analyze_resume(prompts["ats_score"], pdf_content, input_text)
-                
-                # Show debug info if enabled
-                if show_debug:
-                    st.sidebar.json(str(response))
-                
-                # Clear the placeholder with processing message
-                progress_placeholder.empty()
-                
-                # Hide loading indicator
-                end_processing()
-                
-                # Display results
-                
-                results_container.markdown('<div class="results-header">🎯 ATS Compatibility Score</div>', unsafe_allow_html=True)
-                results_container.write(response)
-                results_container.markdown('</div>', unsafe_allow_html=True)
+                # Only job ids are kept in the session; later reruns look the jobs up again
+                st.session_state.analysis_submission = {
+                    "single": None if analyze_all_btn else selected_analysis,
+                    "jobs": submit_analyses(budgeted.pdf_content, budgeted.job_description, prompt_keys),
+                    "local_score": local_score,
+                    "trimmed": budgeted.describe(),
+                }
+        
+        if "analysis_submission" in st.session_state:
+            show_submission(st.session_state.analysis_submission)
+        
+        # Rate limiter queue depth and wait times
+        if show_debug and get_client_registry().limiter is not None:
+            debug("Rate limiter", get_client_registry().limiter.stats())
+        if show_debug and get_context_cache() is not None:
+            debug("Context cache", get_context_cache().stats())
+        if show_debug and get_render_pool() is not None:
+            debug("Render pool", get_render_pool().stats())
+        debug("Job queue", get_job_queue().stats())
+                    
     except Exception as e:
         # Ensure loading indicator is hidden even if an error occurs
         end_processing()
@@ -742,6 +775,9 @@ else:
         st.write(f"❌ An error occurred: {str(e)}")
         st.markdown('</div>', unsafe_allow_html=True)
 
+if show_debug:
+    show_debug_panel()
+
 # Add a sidebar with helpful information
 with st.sidebar:
     st.markdown('<div class="section-title">ℹ️ About This Tool</div>', unsafe_allow_html=True)
@@ -812,4 +848,4 @@ with st.expander("🔧 Setup Instructions"):
     but visual resume analysis capabilities will be limited.
     """)
 
-st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
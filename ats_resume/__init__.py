@@ -0,0 +1,148 @@
+"""Resume analysis core: PDF preparation, prompt library and Gemini client.
+
+Nothing here imports Streamlit, and the heavy dependencies (pdf2image, PyPDF2,
+google.generativeai) are imported on first use rather than at import time.
+"""
+from .budget import (
+    DEFAULT_JOB_DESCRIPTION_TOKENS,
+    DEFAULT_RESUME_TOKENS,
+    BudgetedInput,
+    TokenBudget,
+    Trim,
+    apply_budget,
+    split_sections,
+    token_budget_from_env,
+    trim_text,
+)
+from .client import (
+    DEFAULT_GENERATION_CONFIG,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MODEL,
+    ClientRegistry,
+    build_cached_parts,
+    build_content_parts,
+    build_resume_parts,
+    configure,
+    count_tokens,
+    estimate_request_tokens,
+    generate_analysis,
+    get_model,
+    get_registry,
+    stream_analysis,
+)
+from .context_cache import DEFAULT_CACHE_TTL, DEFAULT_MIN_CACHE_TOKENS, ContextCache
+from .errors import (
+    AnalysisError,
+    AtsResumeError,
+    MissingApiKeyError,
+    PdfProcessingError,
+    RateLimitTimeout,
+    RenderLimitError,
+    StructuredOutputError,
+)
+from .imaging import (
+    ImageOptions,
+    ImagePayload,
+    estimate_image_tokens,
+    image_options_from_env,
+    optimize_image,
+    payload_stats,
+)
+from .index import DEFAULT_INDEX_KIND, DEFAULT_TOP_K, INDEX_KINDS, ResumeIndex, SearchHit, open_index, unindexable_reason
+from .jobdesc import PreparedJobDescription, normalize_job_description, prepare_job_description
+from .jobs import (
+    DEFAULT_JOB_TTL,
+    DEFAULT_JOB_WORKERS,
+    DEFAULT_MAX_JOBS,
+    DONE,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    JobQueue,
+    JobRecord,
+)
+from .keywords import (
+    SYNONYMS,
+    KeywordScore,
+    KeywordScorer,
+    extract_keywords,
+    extract_terms,
+    score_matrix,
+    score_resume,
+)
+from .pdf import (
+    DEFAULT_DPI,
+    DEFAULT_MAX_PAGES,
+    DEFAULT_MAX_TEXT_CHARS,
+    DEFAULT_MODE,
+    DEFAULT_PAGES,
+    DEFAULT_RENDER_THREADS,
+    PDF_MODES,
+    extract_pdf_text,
+    iter_page_images,
+    iter_pdf_text,
+    normalize_page_text,
+    parse_page_selection,
+    pdf2image_available,
+    prepare_pdf_content,
+)
+from .pdf_cache import PdfCache, make_cache_key
+from .prompts import prompts, structured_prompts
+from .render_pool import DEFAULT_RENDER_WORKERS, RenderLimits, RenderPool, render_limits_from_env
+from .report import (
+    ANALYSIS_CALL_MODES,
+    DEFAULT_ANALYSIS_CALL_MODE,
+    build_report_prompt,
+    generate_report,
+    parse_report,
+    split_report,
+)
+from .ratelimit import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    MemoryBucketStore,
+    RateLimiter,
+    SqliteBucketStore,
+    call_with_retries,
+)
+from .response_cache import (
+    MemoryResponseCache,
+    ResponseCache,
+    SqliteResponseCache,
+    TieredResponseCache,
+    content_digest,
+    make_response_key,
+)
+from .resume_parser import (
+    Contact,
+    Education,
+    ParsedResume,
+    Position,
+    compact_content,
+    content_text,
+    find_date_range,
+    parse_resume,
+)
+from .semantic import HashingEmbedder, SemanticIndex, SentenceTransformerEmbedder, get_embedder
+from .structured import (
+    ANALYSIS_FIELDS,
+    AnalysisResult,
+    aggregate_results,
+    generate_structured_analysis,
+    parse_analysis,
+    response_schema,
+    structured_generation_config,
+)
+from .telemetry import (
+    Metrics,
+    SpanRecord,
+    collect_spans,
+    enable_tracing,
+    get_metrics,
+    record_span,
+    record_usage,
+    set_span_collector,
+    span,
+    start_metrics_server,
+)
+from .textlayer import RoutingDecision, TextLayerReport, assess_text_layer, choose_route
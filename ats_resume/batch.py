@@ -0,0 +1,567 @@
+"""Headless batch screening: run analyses for every resume against every job description.
+
+Example:
+    python -m ats_resume resumes/ job_descriptions/ -o results.jsonl --concurrency 8 --rpm 120
+"""
+import argparse
+import csv
+import functools
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .budget import DEFAULT_JOB_DESCRIPTION_TOKENS, DEFAULT_RESUME_TOKENS, TokenBudget, apply_budget
+from .client import (
+    DEFAULT_GENERATION_CONFIG,
+    DEFAULT_MODEL,
+    ClientRegistry,
+    configure,
+    count_tokens,
+    generate_analysis,
+)
+from .context_cache import DEFAULT_CACHE_TTL, DEFAULT_MIN_CACHE_TOKENS, ContextCache
+from .errors import MissingApiKeyError
+from .imaging import image_options_from_env, payload_stats
+from .index import DEFAULT_INDEX_KIND, DEFAULT_TOP_K, INDEX_KINDS, open_index, unindexable_reason
+from .jobdesc import prepare_job_description
+from .pdf import (
+    DEFAULT_DPI,
+    DEFAULT_MAX_PAGES,
+    DEFAULT_MAX_TEXT_CHARS,
+    DEFAULT_MODE,
+    DEFAULT_PAGES,
+    PDF_MODES,
+    extract_pdf_text,
+    prepare_pdf_content,
+)
+from .pdf_cache import PdfCache
+from .prompts import prompts
+from .ratelimit import PRIORITY_BATCH, RateLimiter, SqliteBucketStore
+from .render_pool import DEFAULT_RENDER_WORKERS, RenderPool, render_limits_from_env
+from .report import generate_report
+from .response_cache import MemoryResponseCache, SqliteResponseCache, TieredResponseCache
+from .resume_parser import compact_content, content_text, parse_resume
+from .structured import generate_structured_analysis
+from .telemetry import get_metrics
+
+INDEX_BATCH_SIZE = 256
+# Task analysis name for a combined report covering every requested analysis
+REPORT_TASK = "report"
+
+CSV_FIELDS = [
+    "task_id",
+    "resume",
+    "job_description",
+    "analysis",
+    "score",
+    "response",
+    "error",
+    "attempts",
+    "jd_tokens_saved",
+    "trimmed",
+    "experience_months",
+    "route",
+    "render_saved_seconds",
+    "payload_bytes",
+    "payload_tokens",
+    "prepare_seconds",
+    "analysis_seconds",
+    "total_seconds",
+]
+
+
+def list_files(directory, extensions):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.lower().endswith(extensions)
+    )
+
+
+def load_checkpoint(path):
+    """Return the set of task ids already completed"""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+class ResultWriter:
+    """Streams result records to a JSONL or CSV file, appending when resuming"""
+
+    def __init__(self, path, output_format):
+        self.output_format = output_format
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        if output_format == "csv":
+            self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if is_new:
+                self._writer.writeheader()
+
+    def write(self, record):
+        if self.output_format == "csv":
+            # Structured responses are written as JSON text
+            self._writer.writerow({
+                field: json.dumps(value, ensure_ascii=False) if isinstance(value, dict) else value
+                for field, value in ((field, record.get(field)) for field in CSV_FIELDS)
+            })
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class BatchScreener:
+    """Runs (resume, job description, analysis) tasks with bounded concurrency.
+
+    Model calls share one ``RateLimiter`` at batch priority, so a limiter store
+    shared with the web app lets interactive requests go first. With
+    ``structured`` the response is the analysis' validated JSON object and the
+    record also carries its ``score``. With ``report_keys`` each task is a
+    single combined-report call whose response maps each analysis to its
+    result. A ``ContextCache`` lets every analysis and job description for a
+    resume reuse one upload of it; tasks are ordered resume by resume. With a
+    ``RenderPool`` resumes are rendered in worker processes, so rendering
+    uses every core and a pathological PDF falls back to text. With a
+    ``TokenBudget`` oversized resume text and job descriptions are trimmed to
+    their most relevant sections, checked with ``count_tokens`` when
+    ``verify_tokens`` is set, and the record's ``trimmed`` says what was cut.
+    With ``parse_resumes`` text-layer resumes are sent as their parsed
+    sections and the record carries ``experience_months``.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL, generation_config=None, dpi=DEFAULT_DPI,
+                 pages=DEFAULT_PAGES, max_pages=DEFAULT_MAX_PAGES, rpm=60, tpm=None, max_retries=5,
+                 image_options=None, mode=DEFAULT_MODE, max_text_chars=DEFAULT_MAX_TEXT_CHARS,
+                 pdf_cache=None, response_cache=None, limiter=None, registry=None, preprocess_jd=True,
+                 structured=False, report_keys=None, context_cache=None, render_pool=None,
+                 token_budget=None, verify_tokens=False, parse_resumes=False):
+        self.model_name = model_name
+        self.generation_config = generation_config or DEFAULT_GENERATION_CONFIG
+        self.dpi = dpi
+        self.pages = pages
+        self.max_pages = max_pages
+        self.image_options = image_options
+        self.mode = mode
+        self.max_text_chars = max_text_chars
+        self.max_retries = max_retries
+        self.limiter = limiter if limiter is not None else RateLimiter(rpm=rpm, tpm=tpm)
+        self.registry = registry if registry is not None else ClientRegistry(limiter=self.limiter)
+        self.pdf_cache = pdf_cache if pdf_cache is not None else PdfCache()
+        self.response_cache = response_cache
+        self.preprocess_jd = preprocess_jd
+        self.structured = structured
+        self.report_keys = report_keys
+        self.context_cache = context_cache
+        self.render_pool = render_pool
+        self.token_budget = token_budget
+        self.verify_tokens = verify_tokens
+        self.parse_resumes = parse_resumes
+
+    def run_task(self, task):
+        """Prepare the resume and run one analysis, returning a result record"""
+        task_id, resume_path, jd_path, prompt_key = task
+        record = {
+            "task_id": task_id,
+            "resume": os.path.basename(resume_path),
+            "job_description": os.path.basename(jd_path),
+            "analysis": prompt_key,
+            "response": None,
+            "error": None,
+            "attempts": 0,
+        }
+        routing = []
+        started = time.perf_counter()
+        try:
+            with open(resume_path, "rb") as f:
+                pdf_content = prepare_pdf_content(
+                    f.read(),
+                    cache=self.pdf_cache,
+                    dpi=self.dpi,
+                    pages=self.pages,
+                    max_pages=self.max_pages,
+                    image_options=self.image_options,
+                    mode=self.mode,
+                    max_text_chars=self.max_text_chars,
+                    on_route=routing.append,
+                    render_pool=self.render_pool,
+                )
+            if routing:
+                record["route"] = routing[0].route
+                record["render_saved_seconds"] = round(routing[0].saved_seconds, 4)
+            if self.image_options is not None and isinstance(pdf_content, list):
+                stats = payload_stats([page for page in pdf_content if not isinstance(page, str)])
+                record["payload_bytes"] = stats["bytes"]
+                record["payload_tokens"] = stats["estimated_tokens"]
+            with open(jd_path, "r", encoding="utf-8") as f:
+                job_description = f.read()
+            if self.preprocess_jd:
+                # Cached by content hash, so each job description is processed once per run
+                prepared_jd = prepare_job_description(job_description)
+                job_description = prepared_jd.text
+                record["jd_tokens_saved"] = prepared_jd.tokens_saved
+            if self.parse_resumes and content_text(pdf_content) is not None:
+                parsed = parse_resume(content_text(pdf_content))
+                record["experience_months"] = parsed.experience_months
+                pdf_content = compact_content(pdf_content, parsed)
+            if self.token_budget is not None:
+                counter = None
+                if self.verify_tokens:
+                    counter = functools.partial(count_tokens, model_name=self.model_name, registry=self.registry)
+                budgeted = apply_budget(pdf_content, job_description, self.token_budget, counter)
+                pdf_content, job_description = budgeted.pdf_content, budgeted.job_description
+                if budgeted.trimmed:
+                    record["trimmed"] = budgeted.as_dict()
+            prepared = time.perf_counter()
+            record["prepare_seconds"] = round(prepared - started, 4)
+
+            def count_retry(attempt, delay, error):
+                record["attempts"] = attempt + 1
+
+            record["attempts"] = 1
+            options = dict(
+                model_name=self.model_name,
+                generation_config=self.generation_config,
+                cache=self.response_cache,
+                registry=self.registry,
+                priority=PRIORITY_BATCH,
+                max_retries=self.max_retries,
+                on_retry=count_retry,
+                context_cache=self.context_cache,
+            )
+            if prompt_key == REPORT_TASK:
+                report = generate_report(
+                    pdf_content, job_description, self.report_keys, structured=self.structured, **options
+                )
+                record["response"] = {
+                    key: response.as_dict() if self.structured else response for key, response in report.items()
+                }
+                if self.structured:
+                    record["score"] = next((result.score for result in report.values() if result.score is not None), None)
+            elif self.structured:
+                result = generate_structured_analysis(prompt_key, pdf_content, job_description, **options)
+                record["score"] = result.score
+                record["response"] = result.as_dict()
+            else:
+                record["response"] = generate_analysis(prompts[prompt_key], pdf_content, job_description, **options)
+            record["analysis_seconds"] = round(time.perf_counter() - prepared, 4)
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["total_seconds"] = round(time.perf_counter() - started, 4)
+        return record
+
+    def run(self, tasks, writer, checkpoint_path=None, concurrency=4, on_result=None):
+        """Execute tasks, streaming each record to ``writer`` as it completes"""
+        checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+        task_iter = iter(tasks)
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                # Keep at most ``concurrency * 2`` tasks queued so huge batches stay lazy
+                pending = set()
+                for task in task_iter:
+                    pending.add(executor.submit(self.run_task, task))
+                    if len(pending) >= concurrency * 2:
+                        break
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record = future.result()
+                        writer.write(record)
+                        # Only successful tasks are checkpointed so failures are retried on resume
+                        if checkpoint is not None and record["error"] is None:
+                            checkpoint.write(record["task_id"] + "\n")
+                            checkpoint.flush()
+                        if on_result is not None:
+                            on_result(record)
+                        next_task = next(task_iter, None)
+                        if next_task is not None:
+                            pending.add(executor.submit(self.run_task, next_task))
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+
+def _index_text(pdf_bytes, max_text_chars):
+    """``(text, None)`` for a resume worth indexing, or ``(None, reason)`` when its text layer is unusable"""
+    try:
+        text = extract_pdf_text(pdf_bytes, max_text_chars)
+    except Exception as e:
+        return None, f"text extraction failed: {e}"
+    reason = unindexable_reason(text)
+    return (None, reason) if reason else (text, None)
+
+
+def update_index(index, resume_paths, max_text_chars=DEFAULT_MAX_TEXT_CHARS):
+    """Bring ``index`` in line with ``resume_paths``: add new or changed resumes, drop missing ones.
+
+    Scanned resumes and others without a usable text layer would be ranked
+    on no text at all, so they are left out of the index (and dropped from
+    it if an earlier version was indexed). Returns (added, removed, skipped),
+    where ``skipped`` lists ``(name, reason)`` for each resume left out.
+    """
+    added = 0
+    names = set()
+    changed = []
+    skipped = []
+    for path in resume_paths:
+        name = os.path.basename(path)
+        with open(path, "rb") as f:
+            pdf_bytes = f.read()
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        if index.digest(name) != digest:
+            text, reason = _index_text(pdf_bytes, max_text_chars)
+            if text is None:
+                skipped.append((name, reason))
+                continue
+            changed.append((name, text, digest))
+            added += 1
+        names.add(name)
+        # Embedding indexes are much faster fed in batches
+        if len(changed) >= INDEX_BATCH_SIZE:
+            index.add_many(changed)
+            changed = []
+    index.add_many(changed)
+    removed = [name for name in index.names() if name not in names]
+    for name in removed:
+        index.remove(name)
+    index.flush()
+    return added, len(removed), skipped
+
+
+def shortlist_resumes(index, resume_paths, jd_paths, top_k=DEFAULT_TOP_K):
+    """Map each job description path to its ``top_k`` resume paths by index rank"""
+    paths_by_name = {os.path.basename(path): path for path in resume_paths}
+    job_descriptions = []
+    for jd_path in jd_paths:
+        with open(jd_path, "r", encoding="utf-8") as f:
+            job_descriptions.append(prepare_job_description(f.read()).text)
+    shortlists = {}
+    for jd_path, hits in zip(jd_paths, index.search_many(job_descriptions, top_k)):
+        shortlists[jd_path] = [paths_by_name[hit.name] for hit in hits if hit.name in paths_by_name]
+    return shortlists
+
+
+def build_tasks(resume_paths, jd_paths, prompt_keys, completed=(), shortlists=None):
+    """Yield (task_id, resume_path, jd_path, prompt_key) for every pending combination.
+
+    With ``shortlists`` ({jd_path: resume_paths}), each job description is only
+    paired with its shortlisted resumes.
+    """
+    for resume_path in resume_paths:
+        for jd_path in jd_paths:
+            if shortlists is not None and resume_path not in shortlists[jd_path]:
+                continue
+            for prompt_key in prompt_keys:
+                task_id = f"{os.path.basename(resume_path)}::{os.path.basename(jd_path)}::{prompt_key}"
+                if task_id not in completed:
+                    yield task_id, resume_path, jd_path, prompt_key
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a directory of resumes against a directory of job descriptions.")
+    parser.add_argument("resumes_dir", help="Directory of resume PDFs")
+    parser.add_argument("jds_dir", help="Directory of job description .txt/.md files")
+    parser.add_argument("-o", "--output", required=True, help="Output file (.jsonl or .csv)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Output format (default: from the output extension)")
+    parser.add_argument("--analyses", default="ats_score",
+                        help=f"Comma-separated analyses to run: {', '.join(prompts)} or 'all' (default: ats_score)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum model calls in flight (default: 4)")
+    parser.add_argument("--rpm", type=float, default=60, help="Requests-per-minute budget (default: 60)")
+    parser.add_argument("--tpm", type=float, help="Input tokens-per-minute budget (default: unlimited)")
+    parser.add_argument("--max-retries", type=int, default=5,
+                        help="Retries after a rate-limit or transient error (default: 5)")
+    parser.add_argument("--rate-limit-db", default=os.getenv("GEMINI_RATE_LIMIT_DB"),
+                        help="SQLite file holding rate limit state shared with other processes")
+    parser.add_argument("--checkpoint", help="Checkpoint file of completed tasks (default: <output>.checkpoint)")
+    parser.add_argument("--model", default=os.getenv("MODEL", DEFAULT_MODEL), help="Gemini model name")
+    parser.add_argument("--dpi", type=int, default=int(os.getenv("PDF_DPI", str(DEFAULT_DPI))))
+    parser.add_argument("--pages", default=os.getenv("PDF_PAGES", DEFAULT_PAGES),
+                        help="Pages to send: 'first', 'all' or a list like '1-3,5' (default: all)")
+    parser.add_argument("--mode", choices=PDF_MODES, default=os.getenv("PDF_MODE", DEFAULT_MODE),
+                        help="Send resumes as text, images or both; 'auto' decides per document (default: auto)")
+    parser.add_argument("--max-text-chars", type=int,
+                        default=int(os.getenv("PDF_MAX_TEXT_CHARS", str(DEFAULT_MAX_TEXT_CHARS))),
+                        help="Stop text extraction after this many characters (default: 200000)")
+    parser.add_argument("--max-pages", type=int, default=int(os.getenv("PDF_MAX_PAGES", str(DEFAULT_MAX_PAGES))),
+                        help="Maximum rendered pages per resume (default: 5)")
+    parser.add_argument("--pdf-cache-dir", default=os.getenv("PDF_CACHE_DIR"), help="On-disk cache for prepared resumes")
+    parser.add_argument("--pdf-cache-disk-mb", type=int, default=int(os.getenv("PDF_CACHE_DISK_MAX_MB", "1024")),
+                        help="Bound on the on-disk cache; least recently used files go first, 0 for none (default: 1024)")
+    parser.add_argument("--raw-jd", action="store_true",
+                        default=os.getenv("JD_PREPROCESS", "true").strip().lower() in ("0", "false", "no", "off"),
+                        help="Send job descriptions verbatim instead of stripping boilerplate first")
+    parser.add_argument("--structured", action="store_true",
+                        default=os.getenv("STRUCTURED_OUTPUT", "false").strip().lower() in ("1", "true", "yes", "on"),
+                        help="Request JSON matching each analysis' schema and write validated fields instead of markdown")
+    parser.add_argument("--combined", action="store_true",
+                        default=os.getenv("ANALYSIS_CALL_MODE", "separate").strip().lower() == "combined",
+                        help="Run the selected analyses as one report call per resume and job description")
+    parser.add_argument("--context-cache", action="store_true",
+                        default=os.getenv("CONTEXT_CACHE", "false").strip().lower() in ("1", "true", "yes", "on"),
+                        help="Upload each resume to Gemini's context cache once and reuse it for every call")
+    parser.add_argument("--resume-token-budget", type=int,
+                        default=int(os.getenv("RESUME_TOKEN_BUDGET", str(DEFAULT_RESUME_TOKENS))),
+                        help="Trim resume text over this many tokens to its most relevant sections; 0 disables (default: 6000)")
+    parser.add_argument("--jd-token-budget", type=int,
+                        default=int(os.getenv("JD_TOKEN_BUDGET", str(DEFAULT_JOB_DESCRIPTION_TOKENS))),
+                        help="Trim job descriptions over this many tokens the same way; 0 disables (default: 1500)")
+    parser.add_argument("--verify-tokens", action="store_true",
+                        default=os.getenv("TOKEN_COUNT_VERIFY", "false").strip().lower() in ("1", "true", "yes", "on"),
+                        help="Check inputs near their token budget with the count_tokens API")
+    parser.add_argument("--parsed-resume", action="store_true",
+                        default=os.getenv("RESUME_PARSED", "false").strip().lower() in ("1", "true", "yes", "on"),
+                        help="Send text-layer resumes as parsed sections (experience with dates, education, skills)")
+    parser.add_argument("--render-workers", type=int,
+                        default=int(os.getenv("PDF_RENDER_WORKERS", str(DEFAULT_RENDER_WORKERS))),
+                        help="Render resumes in this many worker processes under PDF_RENDER_* limits; 0 renders in-process (default: 2)")
+    parser.add_argument("--metrics-file", default=os.getenv("METRICS_FILE"),
+                        help="Write stage latency and token metrics here in Prometheus text format when the run ends")
+    parser.add_argument("--index", default=os.getenv("RESUME_INDEX_DIR"),
+                        help="Resume index directory; with --top-k only the best-ranked resumes are analysed")
+    parser.add_argument("--index-kind", choices=INDEX_KINDS, default=os.getenv("RESUME_INDEX_KIND", DEFAULT_INDEX_KIND),
+                        help="bm25 ranks by keyword overlap, semantic by embedding similarity (default: bm25)")
+    parser.add_argument("--embedder", default=os.getenv("RESUME_EMBEDDER"),
+                        help="Embedder for the semantic index: hashing[:<dimensions>] or st:<model> (default: hashing)")
+    parser.add_argument("--top-k", type=int, help=f"Resumes per job description to analyse (default with --index: {DEFAULT_TOP_K})")
+    parser.add_argument("--response-cache", default=os.getenv("RESPONSE_CACHE_PATH"), help="SQLite file for cached responses")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+    try:
+        configure(
+            os.getenv("GOOGLE_API_KEY"),
+            transport=os.getenv("GEMINI_TRANSPORT") or None,
+            api_endpoint=os.getenv("GEMINI_API_ENDPOINT") or None,
+        )
+    except MissingApiKeyError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    prompt_keys = list(prompts) if args.analyses == "all" else [key.strip() for key in args.analyses.split(",")]
+    unknown = [key for key in prompt_keys if key not in prompts]
+    if unknown:
+        print(f"Error: unknown analyses: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+
+    output_format = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+
+    resume_paths = list_files(args.resumes_dir, (".pdf",))
+    jd_paths = list_files(args.jds_dir, (".txt", ".md"))
+    completed = load_checkpoint(checkpoint_path)
+    # A combined report is one task per resume and job description
+    task_keys = [REPORT_TASK] if args.combined else prompt_keys
+
+    shortlists = None
+    if args.index:
+        index = open_index(args.index, args.index_kind, args.embedder)
+        added, removed, skipped = update_index(index, resume_paths, args.max_text_chars)
+        print(f"Index: {len(index)} resumes ({added} added or updated, {removed} removed)", file=sys.stderr)
+        if skipped:
+            print(f"Index: skipped {len(skipped)} resumes without a usable text layer; they are not shortlisted "
+                  f"and can be reviewed without --index:", file=sys.stderr)
+            for name, reason in skipped:
+                print(f"  {name}: {reason}", file=sys.stderr)
+        # Only the top-ranked resumes for each job description go to the model
+        shortlists = shortlist_resumes(index, resume_paths, jd_paths, args.top_k or DEFAULT_TOP_K)
+        total = sum(len(paths) for paths in shortlists.values()) * len(task_keys)
+    elif args.top_k:
+        print("Error: --top-k requires --index", file=sys.stderr)
+        return 1
+    else:
+        total = len(resume_paths) * len(jd_paths) * len(task_keys)
+    print(f"{total} tasks, {len(completed)} already completed", file=sys.stderr)
+
+    limiter = RateLimiter(
+        rpm=args.rpm,
+        tpm=args.tpm,
+        store=SqliteBucketStore(args.rate_limit_db) if args.rate_limit_db else None,
+    )
+    context_cache = None
+    if args.context_cache:
+        context_cache = ContextCache(
+            ttl=int(os.getenv("CONTEXT_CACHE_TTL", str(DEFAULT_CACHE_TTL))),
+            min_tokens=int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", str(DEFAULT_MIN_CACHE_TOKENS))),
+        )
+    render_pool = None
+    if args.render_workers > 0:
+        render_pool = RenderPool(max_workers=args.render_workers, limits=render_limits_from_env())
+    screener = BatchScreener(
+        model_name=args.model,
+        dpi=args.dpi,
+        pages=args.pages,
+        max_pages=args.max_pages,
+        image_options=image_options_from_env(),
+        mode=args.mode,
+        max_text_chars=args.max_text_chars,
+        max_retries=args.max_retries,
+        limiter=limiter,
+        preprocess_jd=not args.raw_jd,
+        structured=args.structured,
+        report_keys=prompt_keys if args.combined else None,
+        context_cache=context_cache,
+        render_pool=render_pool,
+        token_budget=TokenBudget(args.resume_token_budget or None, args.jd_token_budget or None),
+        verify_tokens=args.verify_tokens,
+        parse_resumes=args.parsed_resume,
+        registry=ClientRegistry(max_connections=args.concurrency, limiter=limiter),
+        pdf_cache=PdfCache(disk_dir=args.pdf_cache_dir, max_disk_bytes=args.pdf_cache_disk_mb * 1024 * 1024),
+        response_cache=TieredResponseCache(
+            MemoryResponseCache(),
+            SqliteResponseCache(args.response_cache) if args.response_cache else None,
+        ),
+    )
+
+    finished = {"ok": 0, "failed": 0}
+
+    def report(record):
+        finished["failed" if record["error"] else "ok"] += 1
+        status = "error" if record["error"] else "ok"
+        print(f"[{finished['ok'] + finished['failed']}] {record['task_id']} {status} "
+              f"{record['total_seconds']:.2f}s", file=sys.stderr)
+
+    writer = ResultWriter(args.output, output_format)
+    started = time.perf_counter()
+    try:
+        screener.run(
+            build_tasks(resume_paths, jd_paths, task_keys, completed, shortlists),
+            writer,
+            checkpoint_path=checkpoint_path,
+            concurrency=args.concurrency,
+            on_result=report,
+        )
+    finally:
+        writer.close()
+        if context_cache is not None:
+            # Stop paying for cache storage as soon as the run is over
+            context_cache.clear()
+        if render_pool is not None:
+            render_pool.shutdown()
+    print(f"Done: {finished['ok']} succeeded, {finished['failed']} failed in "
+          f"{time.perf_counter() - started:.1f}s", file=sys.stderr)
+    print(f"Rate limiter: {json.dumps(limiter.stats())}", file=sys.stderr)
+    if context_cache is not None:
+        print(f"Context cache: {json.dumps(context_cache.stats())}", file=sys.stderr)
+    if render_pool is not None:
+        print(f"Render pool: {json.dumps(render_pool.stats())}", file=sys.stderr)
+    print(f"Stage latency: {json.dumps(get_metrics().stage_summary())}", file=sys.stderr)
+    if args.metrics_file:
+        get_metrics().write(args.metrics_file)
+    return 0 if finished["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
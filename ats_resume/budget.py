@@ -0,0 +1,291 @@
+"""Input token budgets: trim oversized resume text and job descriptions before the call.
+
+A twelve-page academic CV or a job description pasted together with a whole
+handbook makes slow, expensive prompts. ``apply_budget`` estimates each
+input's tokens locally and, when one is over its budget, keeps its most
+useful sections: each section is ranked by its heading (experience, skills
+and requirements first) and by how much of the job description's keywords
+it covers, then sections are kept best first, in their original order,
+until the budget is spent. What was dropped comes back with the trimmed
+inputs so every response can say so. An optional ``counter``, such as
+``client.count_tokens`` bound to a model, checks the local estimate against
+the model's tokenizer. Page images are left alone; their size is set by the
+imaging options.
+"""
+import os
+import re
+from dataclasses import dataclass, replace
+
+from .errors import AtsResumeError
+from .jobdesc import (
+    BOILERPLATE_HEADINGS,
+    PREFERRED_HEADINGS,
+    REQUIREMENT_HEADINGS,
+    ROLE_HEADINGS,
+    _heading as job_description_heading,
+    estimate_text_tokens,
+)
+from .keywords import extract_keywords, extract_terms
+from .telemetry import span
+
+DEFAULT_RESUME_TOKENS = 6000
+DEFAULT_JOB_DESCRIPTION_TOKENS = 1500
+# A section that would be cut shorter than this is dropped rather than kept as a fragment
+MIN_SECTION_TOKENS = 40
+# Room left for the note naming the omitted sections, and how many it names
+NOTE_TOKENS = 30
+MAX_NOTE_SECTIONS = 8
+# Inputs estimated under this share of their budget are not worth a count_tokens call
+VERIFY_FRACTION = 0.5
+
+# Resume sections by how much the analyses rely on them; unlisted headings weigh 1
+RESUME_SECTION_WEIGHTS = (
+    (re.compile(r"\b(experience|employment|work history|career)\b", re.IGNORECASE), 3.0),
+    (re.compile(r"\b(skills|competenc\w*|technologies|tech stack|tools)\b", re.IGNORECASE), 3.0),
+    (re.compile(r"\b(summary|profile|objective)\b", re.IGNORECASE), 2.0),
+    (re.compile(r"\bprojects?\b", re.IGNORECASE), 2.0),
+    (re.compile(r"\b(education|certifications?|training|licen[cs]es?)\b", re.IGNORECASE), 1.5),
+    (re.compile(r"\b(publications?|presentations?|talks|patents?|references|interests|hobbies|awards|"
+                r"honou?rs|volunteer\w*|activities|memberships?)\b", re.IGNORECASE), 0.5),
+)
+# The name and contact details that open a resume
+LEAD_WEIGHT = 2.5
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    """Input token limits for one request; None leaves that input as it is"""
+
+    resume_tokens: int = DEFAULT_RESUME_TOKENS
+    job_description_tokens: int = DEFAULT_JOB_DESCRIPTION_TOKENS
+
+
+def token_budget_from_env():
+    """``TokenBudget`` from RESUME_TOKEN_BUDGET and JD_TOKEN_BUDGET; 0 means no limit"""
+    resume_tokens = int(os.getenv("RESUME_TOKEN_BUDGET", str(DEFAULT_RESUME_TOKENS)))
+    job_description_tokens = int(os.getenv("JD_TOKEN_BUDGET", str(DEFAULT_JOB_DESCRIPTION_TOKENS)))
+    return TokenBudget(resume_tokens or None, job_description_tokens or None)
+
+
+@dataclass(frozen=True)
+class Trim:
+    """What budgeting removed from one input. ``counted_tokens`` is the model's count, when checked."""
+
+    original_tokens: int
+    tokens: int
+    dropped: tuple = ()
+    shortened: tuple = ()
+    counted_tokens: int = None
+
+    @property
+    def trimmed(self):
+        return self.tokens < self.original_tokens
+
+    def as_dict(self):
+        return {
+            "original_tokens": self.original_tokens,
+            "tokens": self.tokens,
+            "dropped": list(self.dropped),
+            "shortened": list(self.shortened),
+            **({"counted_tokens": self.counted_tokens} if self.counted_tokens is not None else {}),
+        }
+
+    def describe(self, name):
+        text = f"{name} trimmed from ~{self.original_tokens:,} to ~{self.tokens:,} tokens"
+        details = [f"omitted {', '.join(self.dropped)}"] if self.dropped else []
+        if self.shortened:
+            details.append(f"shortened {', '.join(self.shortened)}")
+        return text + (f" ({'; '.join(details)})" if details else "")
+
+
+@dataclass(frozen=True)
+class BudgetedInput:
+    """Resume content and job description fitted to a ``TokenBudget``, with what was trimmed from each"""
+
+    pdf_content: object
+    job_description: str
+    resume_trim: Trim
+    job_description_trim: Trim
+
+    @property
+    def trimmed(self):
+        return self.resume_trim.trimmed or self.job_description_trim.trimmed
+
+    def as_dict(self):
+        return {"resume": self.resume_trim.as_dict(), "job_description": self.job_description_trim.as_dict()}
+
+    def describe(self):
+        """One line naming what was trimmed, or an empty string"""
+        parts = []
+        if self.resume_trim.trimmed:
+            parts.append(self.resume_trim.describe("Resume"))
+        if self.job_description_trim.trimmed:
+            parts.append(self.job_description_trim.describe("Job description"))
+        return "; ".join(parts)
+
+
+def resume_heading(line):
+    """Heading text if ``line`` looks like a resume section heading, else None"""
+    stripped = line.strip().lstrip("#").strip()
+    if not stripped or len(stripped.split()) > 5 or stripped[0] in "-*•" or stripped[-1] in ".,;":
+        return None
+    if stripped.endswith(":") or (stripped.isupper() and len(stripped) > 3):
+        return stripped.rstrip(":")
+    # "Work Experience", "Technical Skills": a short capitalized line naming a known section
+    if stripped[0].isupper() and any(pattern.search(stripped) for pattern, _ in RESUME_SECTION_WEIGHTS):
+        return stripped
+    return None
+
+
+def resume_section_weight(heading):
+    if heading is None:
+        return LEAD_WEIGHT
+    for pattern, weight in RESUME_SECTION_WEIGHTS:
+        if pattern.search(heading):
+            return weight
+    return 1.0
+
+
+def job_description_section_weight(heading):
+    if heading is None:
+        return 1.5
+    if BOILERPLATE_HEADINGS.search(heading) and not REQUIREMENT_HEADINGS.search(heading):
+        return 0.25
+    if PREFERRED_HEADINGS.search(heading):
+        return 2.0
+    if REQUIREMENT_HEADINGS.search(heading):
+        return 3.0
+    if ROLE_HEADINGS.search(heading):
+        return 2.0
+    return 1.0
+
+
+def split_sections(text, heading=resume_heading):
+    """``[(heading, text)]`` in document order; text before the first heading has heading None"""
+    sections = [(None, [])]
+    for line in text.split("\n"):
+        name = heading(line)
+        if name is not None:
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines)) for name, lines in sections if "".join(lines).strip()]
+
+
+def _truncate(text, max_tokens):
+    """Whole lines of ``text`` up to about ``max_tokens``; a single long line is cut at a word"""
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        tokens = estimate_text_tokens(line) + 1
+        if used + tokens > max_tokens:
+            if not kept:
+                kept.append(line[:max_tokens * 4].rsplit(" ", 1)[0])
+            break
+        kept.append(line)
+        used += tokens
+    return "\n".join(kept).rstrip()
+
+
+def trim_text(text, max_tokens, heading=resume_heading, weight=resume_section_weight, keywords=()):
+    """``(text, Trim)``: ``text`` cut to about ``max_tokens``, keeping its highest-ranked sections.
+
+    ``keywords`` are ``(term, surface, weight)`` from ``extract_keywords``;
+    sections covering more of them rank higher.
+    """
+    original = estimate_text_tokens(text)
+    if original <= max_tokens:
+        return text, Trim(original, original)
+    sections = split_sections(text, heading)
+    total_weight = sum(keyword_weight for _, _, keyword_weight in keywords) or 1.0
+
+    def rank(index):
+        name, body = sections[index]
+        terms = extract_terms(body)
+        coverage = sum(keyword_weight for term, _, keyword_weight in keywords if term in terms) / total_weight
+        return weight(name) * (1.0 + coverage)
+
+    order = sorted(range(len(sections)), key=rank, reverse=True)
+    remaining = max_tokens - NOTE_TOKENS
+    kept = {}
+    for index in order:
+        tokens = estimate_text_tokens(sections[index][1])
+        if tokens <= remaining:
+            kept[index] = sections[index][1]
+            remaining -= tokens
+    # The rest of the budget goes to the opening of the best section that did not fit whole
+    cut = next((index for index in order if index not in kept), None)
+    if cut is not None and remaining >= MIN_SECTION_TOKENS:
+        kept[cut] = _truncate(sections[cut][1], remaining)
+
+    labels = [name or "opening" for name, _ in sections]
+    # Repeated headings (one per job, say) are named once
+    dropped = tuple(dict.fromkeys(labels[index] for index in range(len(sections)) if index not in kept))
+    shortened = (labels[cut],) if cut in kept else ()
+    trimmed = "\n".join(kept[index] for index in sorted(kept))
+    # Tell the model the input is partial, so it doesn't report the missing sections as gaps
+    omitted = ", ".join(dropped[:MAX_NOTE_SECTIONS] + tuple(f"{label} (shortened)" for label in shortened))
+    if len(dropped) > MAX_NOTE_SECTIONS:
+        omitted += f" and {len(dropped) - MAX_NOTE_SECTIONS} more"
+    trimmed += f"\n\n[Trimmed to fit the input budget: {omitted}]"
+    return trimmed, Trim(original, estimate_text_tokens(trimmed), dropped, shortened)
+
+
+def _fit(text, max_tokens, heading, weight, keywords, counter):
+    if max_tokens is None:
+        tokens = estimate_text_tokens(text)
+        return text, Trim(tokens, tokens)
+    fitted, trim = trim_text(text, max_tokens, heading, weight, keywords)
+    if counter is None or trim.tokens < VERIFY_FRACTION * max_tokens:
+        return fitted, trim
+    try:
+        counted = counter(fitted)
+    except AtsResumeError:
+        # Verification is optional: keep the local estimate
+        return fitted, trim
+    if counted > max_tokens:
+        # The local estimate ran low for this text: tighten by the measured ratio and trim again
+        target = int(max_tokens * estimate_text_tokens(fitted) / counted)
+        fitted, tightened = trim_text(text, target, heading, weight, keywords)
+        trim = replace(tightened, original_tokens=trim.original_tokens)
+        try:
+            counted = counter(fitted)
+        except AtsResumeError:
+            return fitted, trim
+    return fitted, replace(trim, counted_tokens=counted)
+
+
+def apply_budget(pdf_content, job_description, budget=None, counter=None):
+    """Fit the job description and the resume's text to ``budget`` (default ``TokenBudget()``).
+
+    The job description is trimmed first and its keywords then rank the
+    resume's sections. ``counter(text)`` returns the model's token count for
+    ``text``; when given, an input estimated near or over its budget is
+    counted, and trimmed again if the count is over. Returns a ``BudgetedInput``.
+    """
+    budget = budget or TokenBudget()
+    with span("token_budget") as attributes:
+        job_description, jd_trim = _fit(
+            job_description, budget.job_description_tokens, job_description_heading,
+            job_description_section_weight, (), counter,
+        )
+        keywords = extract_keywords(job_description)
+        resume_trims = []
+
+        def fit_resume(text):
+            fitted, trim = _fit(text, budget.resume_tokens, resume_heading, resume_section_weight, keywords, counter)
+            resume_trims.append(trim)
+            return fitted
+
+        if isinstance(pdf_content, str):
+            pdf_content = fit_resume(pdf_content)
+        elif isinstance(pdf_content, (list, tuple)):
+            pdf_content = [fit_resume(item) if isinstance(item, str) else item for item in pdf_content]
+        resume_trim = resume_trims[0] if resume_trims else Trim(0, 0)
+        attributes.update(
+            resume_tokens=resume_trim.tokens,
+            resume_tokens_trimmed=resume_trim.original_tokens - resume_trim.tokens,
+            jd_tokens=jd_trim.tokens,
+            jd_tokens_trimmed=jd_trim.original_tokens - jd_trim.tokens,
+        )
+    return BudgetedInput(pdf_content, job_description, resume_trim, jd_trim)
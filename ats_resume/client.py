@@ -0,0 +1,395 @@
+"""Gemini client: configuration, request assembly and response caching"""
+import itertools
+import json
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from .context_cache import is_missing_cache_error
+from .errors import AnalysisError, MissingApiKeyError
+from .imaging import ImagePayload, estimate_image_tokens
+from .ratelimit import DEFAULT_MAX_RETRIES, PRIORITY_INTERACTIVE, call_with_retries
+from .response_cache import content_digest, make_response_key
+from .telemetry import FIRST_TOKEN_SECONDS, get_metrics, record_span, record_usage, span
+from .utils import is_image
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+DEFAULT_GENERATION_CONFIG = {"temperature": 0.2, "top_p": 0.95, "top_k": 64, "max_output_tokens": 2048}
+DEFAULT_MAX_CONNECTIONS = 8
+
+_configured = False
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def configure(api_key, transport=None, api_endpoint=None):
+    """Configure the Gemini SDK with ``api_key``. Raises ``MissingApiKeyError`` if empty.
+
+    ``transport`` ("grpc" or "rest") and ``api_endpoint`` are passed through to
+    the SDK, e.g. to point it at a local stub server.
+    """
+    global _configured
+    if not api_key:
+        raise MissingApiKeyError("GOOGLE_API_KEY environment variable not found!")
+    import google.generativeai as genai
+
+    options = {}
+    if transport:
+        options["transport"] = transport
+    if api_endpoint:
+        options["client_options"] = {"api_endpoint": api_endpoint}
+    genai.configure(api_key=api_key, **options)
+    _configured = True
+    # Models built against the previous configuration must not be reused
+    if _registry is not None:
+        _registry.clear()
+
+
+def is_configured():
+    return _configured
+
+
+class ClientRegistry:
+    """Shares ``GenerativeModel`` instances across calls and caps calls in flight.
+
+    Models are keyed by (model_name, generation_config). All of them go through
+    the SDK's process-wide service client, so transport and connections are
+    reused. At most ``max_connections`` requests run at once; extra callers wait.
+    An optional ``RateLimiter`` is applied to every call made through it.
+    """
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, limiter=None):
+        self.max_connections = max_connections
+        self.limiter = limiter
+        self._models = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def get_model(self, model_name=DEFAULT_MODEL, generation_config=None):
+        generation_config = generation_config or DEFAULT_GENERATION_CONFIG
+        key = (model_name, json.dumps(generation_config, sort_keys=True))
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                import google.generativeai as genai
+
+                model = genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+                self._models[key] = model
+            return model
+
+    def get_cached_model(self, cached_content, generation_config=None):
+        """``GenerativeModel`` bound to a ``CachedContent``.
+
+        Not kept in the registry: there is one per cached resume, and building
+        one from a cached content object makes no API call.
+        """
+        import google.generativeai as genai
+
+        return genai.GenerativeModel.from_cached_content(
+            cached_content, generation_config=generation_config or DEFAULT_GENERATION_CONFIG
+        )
+
+    @contextmanager
+    def connection(self):
+        """Hold one of the ``max_connections`` request slots"""
+        with self._slots:
+            yield
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+def get_registry(max_connections=None):
+    """Process-wide ``ClientRegistry``, created on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry(max_connections or DEFAULT_MAX_CONNECTIONS)
+        return _registry
+
+
+def get_model(model_name=DEFAULT_MODEL, generation_config=None):
+    """Shared ``GenerativeModel`` for the given model and generation config"""
+    return get_registry().get_model(model_name, generation_config)
+
+
+def build_resume_parts(pdf_content):
+    """Request parts for the resume alone: image pages, text, or text followed by pages"""
+    if isinstance(pdf_content, (list, tuple)):
+        parts = []
+        for item in pdf_content:
+            if isinstance(item, str):
+                parts.append(f"Resume Content:\n{item}")
+            elif isinstance(item, ImagePayload):
+                parts.append(item.to_part())
+            else:
+                parts.append(item)
+        return parts
+    if is_image(pdf_content):
+        return [pdf_content]
+    return [f"Resume Content:\n{pdf_content}"]
+
+
+def build_content_parts(prompt, pdf_content, job_description):
+    """Assemble the request parts for image pages, text, or text followed by pages"""
+    user_prompt = f"Job Description: {job_description}\n\n"
+    if isinstance(pdf_content, str):
+        return [prompt, f"{user_prompt}Resume Content:\n{pdf_content}"]
+    return [prompt, user_prompt, *build_resume_parts(pdf_content)]
+
+
+def build_cached_parts(prompt, job_description):
+    """Request parts when the resume is already in the model's cached content"""
+    return [prompt, f"Job Description: {job_description}\n\nThe resume is provided above."]
+
+
+def estimate_request_tokens(parts):
+    """Rough input token count for request parts (about four characters per token)"""
+    tokens = 0
+    for part in parts:
+        if isinstance(part, str):
+            tokens += len(part) // 4 + 1
+        elif isinstance(part, dict):
+            tokens += estimate_image_tokens(768, 768)
+        elif is_image(part):
+            tokens += estimate_image_tokens(part.width, part.height)
+    return tokens
+
+
+def count_tokens(contents, model_name=DEFAULT_MODEL, registry=None):
+    """Input tokens in ``contents`` by the model's own tokenizer (one count_tokens API call).
+
+    Raises ``MissingApiKeyError`` if ``configure`` has not been called and
+    ``AnalysisError`` if the call fails.
+    """
+    if not _configured:
+        raise MissingApiKeyError("GOOGLE_API_KEY environment variable not found!")
+    registry = registry or get_registry()
+    try:
+        with span("count_tokens", model=model_name), registry.connection():
+            return registry.get_model(model_name).count_tokens(contents).total_tokens
+    except Exception as e:
+        raise AnalysisError(f"{type(e).__name__}: {e}") from e
+
+
+def _prepare_request(registry, model_name, generation_config, prompt, pdf_content, job_description,
+                     context_cache):
+    """(model, parts, cache name): the resume goes by cached content reference when ``context_cache`` has it.
+
+    The cache name is the cached content's resource name, or None when the resume is sent inline.
+    """
+    if context_cache is not None:
+        resume_parts = build_resume_parts(pdf_content)
+        cached_content = context_cache.get(model_name, pdf_content, resume_parts, estimate_request_tokens(resume_parts))
+        if cached_content is not None:
+            return (
+                registry.get_cached_model(cached_content, generation_config),
+                build_cached_parts(prompt, job_description),
+                cached_content.name,
+            )
+    return (
+        registry.get_model(model_name, generation_config),
+        build_content_parts(prompt, pdf_content, job_description),
+        None,
+    )
+
+
+def _response_cache_key(prompt, pdf_content, job_description, model_name, generation_config):
+    return make_response_key(
+        prompt,
+        model_name,
+        generation_config,
+        content_digest(pdf_content),
+        content_digest(job_description),
+    )
+
+
+def _is_valid(validate, text):
+    if validate is None:
+        return True
+    try:
+        validate(text)
+    except Exception:
+        return False
+    return True
+
+
+def generate_analysis(prompt, pdf_content, job_description, model_name=DEFAULT_MODEL,
+                      generation_config=None, cache=None, registry=None,
+                      priority=PRIORITY_INTERACTIVE, max_retries=DEFAULT_MAX_RETRIES, on_retry=None,
+                      context_cache=None, validate=None):
+    """Send resume and job description to Gemini and return the response text.
+
+    ``cache`` is an optional ``ResponseCache``. ``validate(text)`` raises if a
+    reply is unusable, such as truncated JSON; that error propagates and the
+    reply is not cached, and a cached reply that fails it is fetched again. With a ``ContextCache`` the
+    resume is uploaded once and later calls reference it, falling back to
+    sending it inline if the cache is too small or has gone. ``registry`` defaults to the
+    process-wide ``ClientRegistry``, whose rate limiter (if any) admits the call
+    at ``priority``. Quota and transient errors are retried up to ``max_retries``
+    times with backoff, calling ``on_retry(attempt, delay, error)``. Raises
+    ``MissingApiKeyError`` if ``configure`` has not been called and
+    ``AnalysisError`` if the API call fails.
+    """
+    if not _configured:
+        raise MissingApiKeyError("GOOGLE_API_KEY environment variable not found!")
+    generation_config = generation_config or DEFAULT_GENERATION_CONFIG
+
+    # Return a previous response for the same prompt, model, config and inputs
+    cache_key = None
+    if cache is not None:
+        cache_key = _response_cache_key(prompt, pdf_content, job_description, model_name, generation_config)
+        cached_response = cache.get(cache_key)
+        if cached_response is not None and _is_valid(validate, cached_response):
+            return cached_response
+
+    registry = registry or get_registry()
+    # Cached tokens still count towards the quota, so the limiter sees the full request
+    tokens = estimate_request_tokens(build_content_parts(prompt, pdf_content, job_description))
+
+    def send(model, parts):
+        def call():
+            with registry.connection():
+                return model.generate_content(parts)
+
+        return call_with_retries(
+            call,
+            limiter=registry.limiter,
+            tokens=tokens,
+            priority=priority,
+            max_retries=max_retries,
+            on_retry=on_retry,
+        )
+
+    try:
+        with span("model_call", model=model_name) as attributes:
+            model, parts, cache_name = _prepare_request(
+                registry, model_name, generation_config, prompt, pdf_content, job_description, context_cache
+            )
+            attributes["context_cache"] = cache_name is not None
+            try:
+                response = send(model, parts)
+            except Exception as e:
+                if not is_missing_cache_error(e, cache_name):
+                    raise
+                # The cached content expired or was deleted server-side: send the resume inline
+                context_cache.invalidate(model_name, pdf_content)
+                response = send(
+                    registry.get_model(model_name, generation_config),
+                    build_content_parts(prompt, pdf_content, job_description),
+                )
+            text = response.text
+            attributes.update(record_usage(response, model_name))
+    except Exception as e:
+        raise AnalysisError(f"{type(e).__name__}: {e}") from e
+
+    if validate is not None:
+        validate(text)
+    if cache is not None:
+        cache.set(cache_key, text)
+    return text
+
+
+def stream_analysis(prompt, pdf_content, job_description, model_name=DEFAULT_MODEL,
+                    generation_config=None, cache=None, on_complete=None, registry=None,
+                    priority=PRIORITY_INTERACTIVE, max_retries=DEFAULT_MAX_RETRIES, on_retry=None,
+                    context_cache=None):
+    """Yield the response text chunk by chunk as Gemini generates it.
+
+    A cached response is yielded as a single chunk. Errors before the first
+    chunk are retried as in ``generate_analysis``. When the stream finishes,
+    ``on_complete`` receives a dict with ``ttft_seconds`` (time to first chunk),
+    ``total_seconds`` and ``cached``. The full text is cached only if the
+    stream completes. Raises the same errors as ``generate_analysis``.
+    """
+    if not _configured:
+        raise MissingApiKeyError("GOOGLE_API_KEY environment variable not found!")
+    generation_config = generation_config or DEFAULT_GENERATION_CONFIG
+    started = time.perf_counter()
+
+    cache_key = None
+    if cache is not None:
+        cache_key = _response_cache_key(prompt, pdf_content, job_description, model_name, generation_config)
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            yield cached_response
+            if on_complete is not None:
+                elapsed = time.perf_counter() - started
+                on_complete({"ttft_seconds": elapsed, "total_seconds": elapsed, "cached": True})
+            return
+
+    chunks = []
+    ttft = None
+    final_chunk = None
+    registry = registry or get_registry()
+    tokens = estimate_request_tokens(build_content_parts(prompt, pdf_content, job_description))
+
+    def start(model, parts):
+        """``(slot, chunks)``: the stream and the connection slot it holds until ``slot`` is closed"""
+        def open_stream():
+            # Each attempt takes its own slot, so none is held through the backoff between retries
+            slot = ExitStack()
+            slot.enter_context(registry.connection())
+            try:
+                # Pull the first chunk here so errors raised on the first read are retried too
+                stream = iter(model.generate_content(parts, stream=True))
+                first = next(stream, None)
+            except BaseException:
+                slot.close()
+                raise
+            return slot, itertools.chain([first] if first is not None else [], stream)
+
+        return call_with_retries(
+            open_stream,
+            limiter=registry.limiter,
+            tokens=tokens,
+            priority=priority,
+            max_retries=max_retries,
+            on_retry=on_retry,
+        )
+
+    try:
+        model, parts, cache_name = _prepare_request(
+            registry, model_name, generation_config, prompt, pdf_content, job_description, context_cache
+        )
+        try:
+            slot, response = start(model, parts)
+        except Exception as e:
+            if not is_missing_cache_error(e, cache_name):
+                raise
+            context_cache.invalidate(model_name, pdf_content)
+            slot, response = start(
+                registry.get_model(model_name, generation_config),
+                build_content_parts(prompt, pdf_content, job_description),
+            )
+        # The slot is held while the stream is consumed
+        with slot:
+            for chunk in response:
+                # Usage metadata comes on the final chunk, which may carry no text
+                final_chunk = chunk
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. only safety metadata)
+                    continue
+                if not text:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                    get_metrics().observe(FIRST_TOKEN_SECONDS, ttft, model=model_name)
+                chunks.append(text)
+                yield text
+    except Exception as e:
+        record_span("model_stream", time.perf_counter() - started, error=type(e).__name__, model=model_name)
+        raise AnalysisError(f"{type(e).__name__}: {e}") from e
+
+    total = time.perf_counter() - started
+    # The final chunk carries the usage metadata for the whole response
+    record_span("model_stream", total, model=model_name, context_cache=cache_name is not None,
+                ttft_ms=round((ttft if ttft is not None else total) * 1000, 1),
+                **record_usage(final_chunk, model_name))
+    if cache is not None:
+        cache.set(cache_key, "".join(chunks))
+    if on_complete is not None:
+        on_complete({"ttft_seconds": ttft if ttft is not None else total, "total_seconds": total, "cached": False})
@@ -0,0 +1,187 @@
+"""Gemini context caching for resume content shared by several analyses.
+
+Every analysis of a resume sends the same pages or text. With a
+``ContextCache`` the resume is uploaded once as a cached content resource and
+later calls reference it by name, so requests no longer carry the heavy part
+and the model does not re-read it. Entries are keyed by model and content
+digest, extended while in use, and deleted when evicted or cleared.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from .response_cache import content_digest
+
+DEFAULT_CACHE_TTL = 900
+# Gemini rejects cached content below a model-specific minimum size
+DEFAULT_MIN_CACHE_TOKENS = 4096
+DEFAULT_MAX_CACHE_ENTRIES = 64
+# An entry this close to expiry is not handed out; the server may drop it mid-call
+EXPIRY_MARGIN_SECONDS = 30
+
+
+def is_missing_cache_error(error, name):
+    """True when a call failed because the cached content ``name`` no longer exists.
+
+    A NotFound for anything else, such as the model, is a real failure. The
+    error must name the resource (``cachedContents/<id>`` or its id), or be the
+    API's "CachedContent not found" error, which is only raised for the one
+    cached content a request references.
+    """
+    if not name:
+        return False
+    message = str(error)
+    lowered = message.lower()
+    if "cachedcontent not found" in lowered:
+        return True
+    if name not in message and name.rsplit("/", 1)[-1] not in message:
+        return False
+    try:
+        from google.api_core import exceptions as google_exceptions
+        if isinstance(error, (google_exceptions.NotFound, google_exceptions.PermissionDenied)):
+            return True
+    except ImportError:
+        pass
+    return "not found" in lowered
+
+
+class ContextCache:
+    """Uploads resume content once per (model, content) and hands out its cached content.
+
+    ``get`` returns None when the content is too small to cache (under
+    ``min_tokens``) or the upload fails; callers then send the content inline.
+    A failed upload is not retried for ``ttl`` seconds. At most
+    ``max_entries`` caches are kept; the least recently used is deleted first.
+    Each use extends a cache whose remaining lifetime is under half of ``ttl``.
+    """
+
+    def __init__(self, ttl=DEFAULT_CACHE_TTL, min_tokens=DEFAULT_MIN_CACHE_TOKENS,
+                 max_entries=DEFAULT_MAX_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._rejected = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    @contextmanager
+    def _key_lock(self, key):
+        """Hold the lock for ``key``; it is dropped once no caller holds or waits for it"""
+        with self._lock:
+            lock, users = self._key_locks.get(key) or (threading.Lock(), 0)
+            self._key_locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                users = self._key_locks[key][1] - 1
+                if users:
+                    self._key_locks[key] = (lock, users)
+                else:
+                    del self._key_locks[key]
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def get(self, model_name, pdf_content, parts, tokens):
+        """Cached content holding ``parts`` (the resume parts of ``pdf_content``), or None"""
+        if tokens < self.min_tokens:
+            self._count("too_small")
+            return None
+        key = (model_name, content_digest(pdf_content))
+        # Concurrent analyses of one resume wait for a single upload
+        with self._key_lock(key):
+            now = time.time()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                rejected_until = self._rejected.get(key, 0)
+            if entry is not None:
+                handle, expires = entry
+                if expires - now > EXPIRY_MARGIN_SECONDS:
+                    if expires - now < self.ttl / 2:
+                        self._extend(key, handle, now)
+                    self._count("hits")
+                    return handle
+                self._drop(key)
+            if rejected_until > now:
+                self._count("skipped")
+                return None
+            return self._create(key, model_name, parts, now)
+
+    def _create(self, key, model_name, parts, now):
+        from google.generativeai import caching
+
+        try:
+            handle = caching.CachedContent.create(
+                model=model_name,
+                display_name=f"resume-{key[1][:16]}",
+                contents=[{"role": "user", "parts": parts}],
+                ttl=self.ttl,
+            )
+        except Exception:
+            # Too small for this model, unsupported model or quota: send inline for a while
+            with self._lock:
+                if len(self._rejected) >= self.max_entries:
+                    self._rejected = {k: until for k, until in self._rejected.items() if until > now}
+                self._rejected[key] = now + self.ttl
+                self._counts["errors"] += 1
+            return None
+        evicted = []
+        with self._lock:
+            self._entries[key] = (handle, now + self.ttl)
+            self._rejected.pop(key, None)
+            self._counts["created"] += 1
+            while len(self._entries) > self.max_entries:
+                old_key, (old_handle, _) = self._entries.popitem(last=False)
+                evicted.append(old_handle)
+                self._counts["evicted"] += 1
+        for old_handle in evicted:
+            self._delete(old_handle)
+        return handle
+
+    def _extend(self, key, handle, now):
+        try:
+            handle.update(ttl=self.ttl)
+        except Exception:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = (handle, now + self.ttl)
+            self._counts["extended"] += 1
+
+    def _drop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    @staticmethod
+    def _delete(handle):
+        try:
+            handle.delete()
+        except Exception:
+            # Already expired or deleted; the server drops it at expiry either way
+            pass
+
+    def invalidate(self, model_name, pdf_content):
+        """Forget the cache for this content, e.g. after the server reported it missing"""
+        self._drop((model_name, content_digest(pdf_content)))
+        self._count("invalidated")
+
+    def clear(self):
+        """Delete every cache this instance created"""
+        with self._lock:
+            handles = [handle for handle, _ in self._entries.values()]
+            self._entries.clear()
+            self._rejected.clear()
+        for handle in handles:
+            self._delete(handle)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), **self._counts}
@@ -0,0 +1,26 @@
+class AtsResumeError(Exception):
+    """Base class for errors raised by the analysis core"""
+
+
+class PdfProcessingError(AtsResumeError):
+    """The uploaded PDF could not be rendered or its text extracted"""
+
+
+class MissingApiKeyError(AtsResumeError):
+    """No Google API key is configured"""
+
+
+class AnalysisError(AtsResumeError):
+    """The Gemini API call failed"""
+
+
+class RateLimitTimeout(AtsResumeError):
+    """A caller waited longer than its timeout for rate limit capacity"""
+
+
+class StructuredOutputError(AnalysisError):
+    """A structured (JSON) reply did not match the analysis' response schema"""
+
+
+class RenderLimitError(PdfProcessingError):
+    """Rendering a PDF exceeded the render pool's time, page or memory limits"""
@@ -0,0 +1,148 @@
+"""Image payload preparation: downscale, grayscale, crop and re-encode pages before upload"""
+import hashlib
+import io
+import math
+import os
+from dataclasses import dataclass
+
+from .telemetry import span
+
+# Gemini bills an image that fits in 384x384 as one tile; larger images are
+# split into 768x768 tiles. Each tile costs this many input tokens.
+TOKENS_PER_TILE = 258
+SMALL_IMAGE_SIZE = 384
+TILE_SIZE = 768
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+@dataclass(frozen=True)
+class ImageOptions:
+    """How rendered pages are prepared before upload.
+
+    ``max_pixels`` downscales each page so width * height stays within the
+    budget (None keeps the rendered size). ``crop_margins`` trims near-white
+    borders. ``image_format`` is JPEG, WEBP or PNG; ``quality`` applies to the
+    lossy formats.
+    """
+
+    max_pixels: int = 1536 * 1536
+    grayscale: bool = False
+    crop_margins: bool = True
+    image_format: str = "JPEG"
+    quality: int = 85
+
+
+@dataclass(frozen=True)
+class ImagePayload:
+    """An encoded page ready to send to the model"""
+
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+
+    @property
+    def byte_size(self):
+        return len(self.data)
+
+    @property
+    def estimated_tokens(self):
+        return estimate_image_tokens(self.width, self.height)
+
+    def digest(self):
+        return hashlib.sha256(self.data).hexdigest()
+
+    def to_part(self):
+        """Inline blob in the form ``generate_content`` accepts"""
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+def _env_flag(name, default):
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def image_options_from_env():
+    """Build ``ImageOptions`` from IMAGE_* environment variables, or None when IMAGE_OPTIMIZE is off"""
+    if not _env_flag("IMAGE_OPTIMIZE", "true"):
+        return None
+    defaults = ImageOptions()
+    max_pixels = int(os.getenv("IMAGE_MAX_PIXELS", str(defaults.max_pixels)))
+    return ImageOptions(
+        max_pixels=max_pixels or None,
+        grayscale=_env_flag("IMAGE_GRAYSCALE", "false"),
+        crop_margins=_env_flag("IMAGE_CROP_MARGINS", "true"),
+        image_format=os.getenv("IMAGE_FORMAT", defaults.image_format).upper(),
+        quality=int(os.getenv("IMAGE_QUALITY", str(defaults.quality))),
+    )
+
+
+def estimate_image_tokens(width, height):
+    """Estimate the input tokens Gemini charges for an image of this size"""
+    if width <= SMALL_IMAGE_SIZE and height <= SMALL_IMAGE_SIZE:
+        return TOKENS_PER_TILE
+    tiles = math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE)
+    return tiles * TOKENS_PER_TILE
+
+
+def crop_margins(image, threshold=245, padding=16):
+    """Trim near-white borders, keeping ``padding`` pixels around the content"""
+    from PIL import ImageOps
+
+    # Invert a grayscale copy so content is bright and margins are black
+    inverted = ImageOps.invert(image.convert("L")).point(lambda value: 255 if value > 255 - threshold else 0)
+    bbox = inverted.getbbox()
+    if bbox is None:
+        return image
+    left, top, right, bottom = bbox
+    return image.crop((
+        max(0, left - padding),
+        max(0, top - padding),
+        min(image.width, right + padding),
+        min(image.height, bottom + padding),
+    ))
+
+
+def optimize_image(image, options=None):
+    """Apply ``options`` to a PIL image and return an encoded ``ImagePayload``"""
+    from PIL import Image
+
+    options = options or ImageOptions()
+    image_format = options.image_format.upper()
+    if image_format not in _MIME_TYPES:
+        raise ValueError(f"Unsupported image format: {options.image_format}")
+
+    with span("payload_encode", format=image_format) as attributes:
+        if options.crop_margins:
+            image = crop_margins(image)
+        if options.grayscale:
+            image = image.convert("L")
+        elif image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        if options.max_pixels and image.width * image.height > options.max_pixels:
+            scale = math.sqrt(options.max_pixels / (image.width * image.height))
+            size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+            image = image.resize(size, Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        if image_format == "PNG":
+            image.save(buffer, format="PNG")
+        else:
+            image.save(buffer, format=image_format, quality=options.quality)
+        attributes["bytes"] = buffer.tell()
+    return ImagePayload(
+        data=buffer.getvalue(),
+        mime_type=_MIME_TYPES[image_format],
+        width=image.width,
+        height=image.height,
+    )
+
+
+def payload_stats(payloads):
+    """Total bytes and estimated tokens for a list of payloads"""
+    return {
+        "pages": len(payloads),
+        "bytes": sum(payload.byte_size for payload in payloads),
+        "estimated_tokens": sum(payload.estimated_tokens for payload in payloads),
+    }
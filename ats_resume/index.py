@@ -0,0 +1,339 @@
+"""On-disk BM25 index over resume text, for ranking a corpus against a job description.
+
+The index is a directory of immutable segments plus a JSON manifest. Each
+segment stores its postings as two flat NumPy arrays (document ids and term
+frequencies) with a term -> (start, count) table, and is memory-mapped when
+opened. Adding documents writes a new segment on ``flush``; removing one
+marks it deleted until ``compact`` rewrites the segments without it, which
+``flush`` does by itself once there are too many segments or deleted
+documents.
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+from collections import Counter
+from dataclasses import dataclass
+
+from .keywords import extract_keywords, iter_terms
+from .textlayer import BAD_GARBAGE_RATIO, MIN_COVERAGE, assess_text_layer
+
+DEFAULT_TOP_K = 10
+INDEX_KINDS = ("bm25", "semantic")
+DEFAULT_INDEX_KIND = "bm25"
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Query terms come from the job description's weighted keywords
+QUERY_MAX_TERMS = 64
+# flush compacts once there are more segments than this, or this share of documents is deleted
+COMPACT_MAX_SEGMENTS = 16
+COMPACT_DELETED_FRACTION = 0.25
+
+_MANIFEST = "manifest.json"
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One ranked resume; ``title`` is the display name given when it was added, if any"""
+
+    name: str
+    score: float
+    doc_id: int
+    title: str = None
+
+
+def unindexable_reason(text):
+    """Why an extracted text layer is not worth indexing, or None if it is.
+
+    Sparse text still carries keywords worth ranking on; only no text (a
+    scan) or a text layer of unreadable glyphs is left out.
+    """
+    # Density is not judged here, so the page count does not matter
+    report = assess_text_layer(text, 1)
+    if report.char_count == 0:
+        return "no text layer (likely scanned)"
+    if report.garbage_ratio > BAD_GARBAGE_RATIO or report.coverage < MIN_COVERAGE:
+        return "text layer is mostly unreadable glyphs"
+    return None
+
+
+def _atomic_write(path, write):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class _Segment:
+    """Memory-mapped postings for one batch of added documents"""
+
+    def __init__(self, directory, segment_id):
+        import numpy as np
+
+        self.segment_id = segment_id
+        prefix = os.path.join(directory, f"seg-{segment_id:06d}")
+        self.doc_ids = np.load(f"{prefix}.docs.npy", mmap_mode="r")
+        self.tfs = np.load(f"{prefix}.tfs.npy", mmap_mode="r")
+        with open(f"{prefix}.terms.json", "r", encoding="utf-8") as f:
+            self.terms = json.load(f)
+
+    def postings(self, term):
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        start, count = entry
+        return self.doc_ids[start:start + count], self.tfs[start:start + count]
+
+    @staticmethod
+    def write(directory, segment_id, postings):
+        """Write ``postings`` ({term: [(doc_id, tf), ...]}) as a new segment"""
+        import numpy as np
+
+        terms = {}
+        doc_ids, tfs = [], []
+        for term in sorted(postings):
+            entries = postings[term]
+            terms[term] = (len(doc_ids), len(entries))
+            for doc_id, tf in entries:
+                doc_ids.append(doc_id)
+                tfs.append(tf)
+        prefix = os.path.join(directory, f"seg-{segment_id:06d}")
+        _atomic_write(f"{prefix}.docs.npy", lambda f: np.save(f, np.asarray(doc_ids, dtype=np.int32)))
+        _atomic_write(f"{prefix}.tfs.npy", lambda f: np.save(f, np.minimum(np.asarray(tfs, dtype=np.int64), 65535).astype(np.uint16)))
+        _atomic_write(f"{prefix}.terms.json", lambda f: f.write(json.dumps(terms).encode("utf-8")))
+
+    @staticmethod
+    def delete(directory, segment_id):
+        prefix = os.path.join(directory, f"seg-{segment_id:06d}")
+        for suffix in (".docs.npy", ".tfs.npy", ".terms.json"):
+            try:
+                os.remove(prefix + suffix)
+            except FileNotFoundError:
+                pass
+
+
+class ResumeIndex:
+    """Persistent BM25 index of resume text keyed by name (e.g. the file name).
+
+    ``add`` and ``remove`` are buffered in memory and become durable on
+    ``flush``; ``search`` flushes pending changes first. Re-adding a name
+    replaces its previous text. One process should write to an index
+    directory at a time; any number may read it.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._segments = []
+        self._docs = {}
+        self._names = {}
+        self._deleted = set()
+        self._next_doc_id = 0
+        self._next_segment_id = 0
+        self._pending = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        path = os.path.join(self.directory, _MANIFEST)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self._next_doc_id = manifest["next_doc_id"]
+        self._next_segment_id = manifest["next_segment_id"]
+        self._deleted = set(manifest["deleted"])
+        self._docs = {int(doc_id): tuple(doc) for doc_id, doc in manifest["docs"].items()}
+        self._names = {doc[0]: doc_id for doc_id, doc in self._docs.items() if doc_id not in self._deleted}
+        self._segments = [_Segment(self.directory, segment_id) for segment_id in manifest["segments"]]
+
+    def _write_manifest(self):
+        manifest = {
+            "next_doc_id": self._next_doc_id,
+            "next_segment_id": self._next_segment_id,
+            "segments": [segment.segment_id for segment in self._segments],
+            "deleted": sorted(self._deleted),
+            "docs": {str(doc_id): list(doc) for doc_id, doc in self._docs.items()},
+        }
+        _atomic_write(
+            os.path.join(self.directory, _MANIFEST),
+            lambda f: f.write(json.dumps(manifest).encode("utf-8")),
+        )
+
+    def __len__(self):
+        with self._lock:
+            return len(self._names)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._names
+
+    def names(self):
+        with self._lock:
+            return sorted(self._names)
+
+    def digest(self, name):
+        """Content digest recorded when ``name`` was added, or None"""
+        with self._lock:
+            doc_id = self._names.get(name)
+            return self._docs[doc_id][2] if doc_id is not None else None
+
+    def _title(self, doc_id):
+        doc = self._docs[doc_id]
+        # Manifests written before titles were kept have three fields
+        return doc[3] if len(doc) > 3 else None
+
+    def add(self, name, text, digest=None, title=None):
+        """Index ``text`` under ``name``, replacing any earlier version; ``title`` is shown in search hits"""
+        counts = Counter(term for term, _ in iter_terms(text))
+        with self._lock:
+            self.remove(name)
+            doc_id = self._next_doc_id
+            self._next_doc_id += 1
+            self._docs[doc_id] = (name, sum(counts.values()), digest, title)
+            self._names[name] = doc_id
+            self._pending[doc_id] = counts
+            self._dirty = True
+            return doc_id
+
+    def add_many(self, documents):
+        """Index ``(name, text, digest)`` tuples"""
+        for name, text, digest in documents:
+            self.add(name, text, digest)
+
+    def remove(self, name):
+        """Drop ``name`` from the index; returns True if it was present"""
+        with self._lock:
+            doc_id = self._names.pop(name, None)
+            if doc_id is None:
+                return False
+            if self._pending.pop(doc_id, None) is not None:
+                del self._docs[doc_id]
+            else:
+                self._deleted.add(doc_id)
+            self._dirty = True
+            return True
+
+    def _needs_compaction(self):
+        if len(self._segments) > COMPACT_MAX_SEGMENTS:
+            return True
+        return bool(self._docs) and len(self._deleted) / len(self._docs) > COMPACT_DELETED_FRACTION
+
+    def flush(self):
+        """Write pending documents as a new segment and persist the manifest.
+
+        Compacts when the segments or deleted documents pass their thresholds,
+        so an index updated one resume at a time keeps searches fast.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            if self._pending:
+                postings = {}
+                for doc_id, counts in sorted(self._pending.items()):
+                    for term, tf in counts.items():
+                        postings.setdefault(term, []).append((doc_id, tf))
+                segment_id = self._next_segment_id
+                self._next_segment_id += 1
+                _Segment.write(self.directory, segment_id, postings)
+                self._segments.append(_Segment(self.directory, segment_id))
+                self._pending = {}
+            self._dirty = False
+            if self._needs_compaction():
+                self._compact()
+            else:
+                self._write_manifest()
+
+    def compact(self):
+        """Merge all segments into one, dropping deleted documents"""
+        with self._lock:
+            self.flush()
+            if len(self._segments) > 1 or self._deleted:
+                self._compact()
+
+    def _compact(self):
+        with self._lock:
+            postings = {}
+            for segment in self._segments:
+                for term in segment.terms:
+                    doc_ids, tfs = segment.postings(term)
+                    entries = postings.setdefault(term, [])
+                    for doc_id, tf in zip(doc_ids.tolist(), tfs.tolist()):
+                        if doc_id not in self._deleted:
+                            entries.append((doc_id, tf))
+            postings = {term: entries for term, entries in postings.items() if entries}
+            old_segments = [segment.segment_id for segment in self._segments]
+            segment_id = self._next_segment_id
+            self._next_segment_id += 1
+            _Segment.write(self.directory, segment_id, postings)
+            self._segments = [_Segment(self.directory, segment_id)]
+            for doc_id in self._deleted:
+                self._docs.pop(doc_id, None)
+            self._deleted = set()
+            self._write_manifest()
+            # Only drop the old files once the manifest no longer points at them
+            for old_segment_id in old_segments:
+                _Segment.delete(self.directory, old_segment_id)
+
+    def search(self, job_description, k=DEFAULT_TOP_K):
+        """Top ``k`` resumes for a job description by BM25, best first"""
+        import numpy as np
+
+        with self._lock:
+            self.flush()
+            if not self._names:
+                return []
+            lengths = np.zeros(self._next_doc_id, dtype=np.float32)
+            live = np.zeros(self._next_doc_id, dtype=bool)
+            for name, doc_id in self._names.items():
+                lengths[doc_id] = self._docs[doc_id][1]
+                live[doc_id] = True
+            doc_count = len(self._names)
+            average_length = max(1.0, float(lengths[live].mean()))
+            norms = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)
+
+            scores = np.zeros(self._next_doc_id, dtype=np.float32)
+            for term, _, weight in extract_keywords(job_description, QUERY_MAX_TERMS):
+                postings = [segment.postings(term) for segment in self._segments]
+                postings = [entry for entry in postings if entry is not None]
+                if not postings:
+                    continue
+                # Deleted documents still count towards df until the next compact
+                df = min(doc_count, sum(len(doc_ids) for doc_ids, _ in postings))
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for doc_ids, tfs in postings:
+                    tfs = np.asarray(tfs, dtype=np.float32)
+                    scores[doc_ids] += weight * idf * tfs * (BM25_K1 + 1) / (tfs + norms[doc_ids])
+
+            scores[~live] = 0
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            ranked = sorted(candidates.tolist(), key=lambda doc_id: -scores[doc_id])
+            return [SearchHit(self._docs[doc_id][0], round(float(scores[doc_id]), 4), doc_id, self._title(doc_id))
+                    for doc_id in ranked]
+
+    def search_many(self, job_descriptions, k=DEFAULT_TOP_K):
+        return [self.search(job_description, k) for job_description in job_descriptions]
+
+
+def open_index(directory, kind=DEFAULT_INDEX_KIND, embedder=None):
+    """Open a ``ResumeIndex`` (``bm25``) or ``SemanticIndex`` (``semantic``) at ``directory``.
+
+    ``embedder`` is an embedder spec for the semantic index, e.g. ``hashing``
+    or ``st:all-MiniLM-L6-v2``.
+    """
+    if kind == "bm25":
+        return ResumeIndex(directory)
+    if kind == "semantic":
+        from .semantic import DEFAULT_EMBEDDER, SemanticIndex, get_embedder
+        return SemanticIndex(directory, get_embedder(embedder or DEFAULT_EMBEDDER))
+    raise ValueError(f"Unknown index kind {kind!r}; expected one of {', '.join(INDEX_KINDS)}")
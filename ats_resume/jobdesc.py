@@ -0,0 +1,187 @@
+"""Job description preprocessing: normalize, drop boilerplate and pull out the requirements.
+
+Pasted job descriptions carry company blurbs, benefits and EEO statements
+that say nothing about the candidate match but are billed as prompt tokens on
+every analysis. ``prepare_job_description`` returns a compact version once
+per distinct text (keyed by content hash) for every prompt and batch task to
+reuse.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+# Sections under these headings are dropped
+BOILERPLATE_HEADINGS = re.compile(
+    # "About Acme" or "About us", but not "About the role" or "About you"
+    r"(^about\b(?!\s+(the\s+)?(role|job|position|opportunity|you)\b)|\b(who we are|our (story|mission|values|culture)|"
+    r"benefits|perks|what we offer|why (join|work)|compensation|salary|pay range|"
+    r"equal (employment )?opportunity|eeo|diversity|accommodations?|how to apply|application process|privacy)\b)",
+    re.IGNORECASE,
+)
+# Sections under these headings hold the requirements
+REQUIREMENT_HEADINGS = re.compile(
+    r"\b(requirements?|qualifications?|what you('ll)? (need|bring)|you (have|bring)|must[- ]haves?|skills|"
+    r"experience|who you are|about you)\b",
+    re.IGNORECASE,
+)
+ROLE_HEADINGS = re.compile(
+    r"\b(responsibilities|duties|about the (role|job|position)|(the|your) role|what you('ll)? do|overview)\b",
+    re.IGNORECASE,
+)
+PREFERRED_HEADINGS = re.compile(r"\b(nice[- ]to[- ]haves?|preferred|bonus|plus|desired)\b", re.IGNORECASE)
+# Individual lines that are boilerplate wherever they appear
+BOILERPLATE_LINES = re.compile(
+    r"(equal opportunity employer|without regard to (race|age|gender)|reasonable accommodation|"
+    r"e-verify|protected (veteran|characteristic)|apply (now|today)|click apply|recruitment agenc|"
+    r"privacy (notice|policy))",
+    re.IGNORECASE,
+)
+REQUIREMENT_LINE = re.compile(
+    r"(\d+\+? years|experience (with|in)|proficien|knowledge of|familiar(ity)? with|degree in|"
+    r"must have|required|ability to)",
+    re.IGNORECASE,
+)
+
+_BULLET = re.compile(r"^\s*(?:[-*•▪◦●‣∙·–—]|\d+[.)])\s*")
+_SPACES = re.compile(r"[ \t ]+")
+# Keep at least this share of the text; stripping more means the headings were misread
+MIN_KEPT_FRACTION = 0.15
+CACHE_MAX_ENTRIES = 512
+
+
+@dataclass(frozen=True)
+class PreparedJobDescription:
+    """Compact job description plus the requirements pulled out of it"""
+
+    text: str
+    requirements: tuple
+    preferred: tuple
+    digest: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def tokens_saved(self):
+        return self.original_tokens - self.tokens
+
+    def as_dict(self):
+        return {
+            "original_tokens": self.original_tokens,
+            "tokens": self.tokens,
+            "tokens_saved": self.tokens_saved,
+            "requirements": len(self.requirements),
+            "preferred": len(self.preferred),
+        }
+
+
+def estimate_text_tokens(text):
+    """Rough token count, about four characters per token"""
+    return len(text) // 4 + 1 if text else 0
+
+
+def normalize_job_description(text):
+    """Unicode-normalize, unify bullets, collapse whitespace and drop repeated lines"""
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n")
+    lines = []
+    seen = set()
+    for line in text.split("\n"):
+        line = _SPACES.sub(" ", line).strip()
+        if _BULLET.match(line):
+            line = "- " + _BULLET.sub("", line)
+        key = line.lower()
+        # Pasted postings often repeat a block; keep blank lines for paragraph breaks
+        if line and key in seen:
+            continue
+        if line:
+            seen.add(key)
+        elif lines and not lines[-1]:
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _heading(line):
+    """Heading text if ``line`` looks like a section heading, else None"""
+    stripped = line.strip().lstrip("#").strip()
+    if not stripped or stripped.startswith("- ") or len(stripped.split()) > 8:
+        return None
+    if stripped.endswith(":") or line.lstrip().startswith("#") or (stripped.isupper() and len(stripped) > 3):
+        return stripped.rstrip(":")
+    # A short unpunctuated line naming a known section, e.g. "About the role"
+    if len(stripped.split()) <= 6 and stripped[-1] not in ".,;!?" and any(
+        pattern.search(stripped)
+        for pattern in (BOILERPLATE_HEADINGS, REQUIREMENT_HEADINGS, PREFERRED_HEADINGS, ROLE_HEADINGS)
+    ):
+        return stripped
+    return None
+
+
+def _prepare(normalized, digest, original_tokens):
+    kept = []
+    requirements = []
+    preferred = []
+    section = None
+    for line in normalized.split("\n"):
+        heading = _heading(line)
+        if heading is not None:
+            if BOILERPLATE_HEADINGS.search(heading) and not REQUIREMENT_HEADINGS.search(heading):
+                section = "boilerplate"
+                continue
+            if PREFERRED_HEADINGS.search(heading):
+                section = "preferred"
+            elif REQUIREMENT_HEADINGS.search(heading):
+                section = "requirements"
+            else:
+                section = None
+            kept.append(line)
+            continue
+        if section == "boilerplate" or BOILERPLATE_LINES.search(line):
+            continue
+        kept.append(line)
+        if not line:
+            continue
+        item = line[2:] if line.startswith("- ") else line
+        if section == "preferred":
+            preferred.append(item)
+        elif section == "requirements" or (line.startswith("- ") and REQUIREMENT_LINE.search(line)):
+            requirements.append(item)
+
+    text = re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+    if len(text) < MIN_KEPT_FRACTION * len(normalized):
+        text = normalized
+    return PreparedJobDescription(
+        text=text,
+        requirements=tuple(requirements),
+        preferred=tuple(preferred),
+        digest=digest,
+        original_tokens=original_tokens,
+        tokens=estimate_text_tokens(text),
+    )
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def prepare_job_description(text):
+    """Compact, deduplicated job description, cached by the hash of its normalized text"""
+    original_tokens = estimate_text_tokens(text)
+    normalized = normalize_job_description(text)
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    with _cache_lock:
+        prepared = _cache.get(digest)
+        if prepared is not None:
+            _cache.move_to_end(digest)
+    if prepared is None:
+        prepared = _prepare(normalized, digest, original_tokens)
+        with _cache_lock:
+            _cache[digest] = prepared
+            while len(_cache) > CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+    if prepared.original_tokens != original_tokens:
+        # Same content pasted with different whitespace: report savings against this copy
+        prepared = replace(prepared, original_tokens=original_tokens)
+    return prepared
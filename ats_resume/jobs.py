@@ -0,0 +1,209 @@
+"""Background job queue for model calls.
+
+The web app submits each analysis as a job and keeps only its id, so a
+Streamlit rerun never discards or repeats work in flight: the next run looks
+the job up again and shows its progress or result. Jobs run on a fixed pool
+of worker threads shared by every session, which also caps the number of
+model calls the server makes at once. Submitting a job with the key of a live
+job returns the existing id instead of starting the work again. A job runs
+in a copy of the submitter's context, so context variables such as the
+tracing parent carry over, and the spans it finishes are kept on its record.
+"""
+import contextvars
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+
+from .telemetry import collect_spans
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_JOB_WORKERS = 8
+# Finished jobs are kept this long so a returning session can still show them
+DEFAULT_JOB_TTL = 3600
+DEFAULT_MAX_JOBS = 1000
+
+
+@dataclass(frozen=True)
+class JobRecord:
+    """Snapshot of a job. ``partial`` holds streamed text so far; ``info`` extra values reported by the job.
+
+    ``spans`` are the ``SpanRecord`` objects finished while the job ran, set when it finishes.
+    """
+
+    job_id: str
+    key: str
+    status: str
+    submitted: float
+    started: float = None
+    finished: float = None
+    partial: str = ""
+    result: object = None
+    error: str = None
+    error_type: str = None
+    details: str = None
+    info: dict = field(default_factory=dict)
+    spans: tuple = ()
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def wait_seconds(self):
+        """Time spent queued, so far if the job has not started"""
+        return (self.started or time.time()) - self.submitted
+
+    @property
+    def run_seconds(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def as_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "run_seconds": round(self.run_seconds, 3),
+            "partial_chars": len(self.partial),
+            "error": self.error,
+            **self.info,
+        }
+
+
+class JobQueue:
+    """Runs submitted callables on ``max_workers`` threads and keeps their records.
+
+    Each callable is called as ``fn(*args, on_progress=..., **kwargs)``;
+    ``on_progress(partial=None, **info)`` publishes streamed text or extra
+    values while it runs. Its return value becomes the job's ``result`` and an
+    exception marks it failed. Finished jobs are dropped after ``ttl`` seconds
+    or when more than ``max_jobs`` records are held, oldest first.
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, ttl=DEFAULT_JOB_TTL, max_jobs=DEFAULT_MAX_JOBS):
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._keys = {}
+        self._changed = threading.Condition()
+        self._counts = Counter()
+
+    def submit(self, fn, *args, key=None, **kwargs):
+        """Queue ``fn`` and return its job id, or the id of the live job already holding ``key``"""
+        with self._changed:
+            self._purge(time.time())
+            if key is not None:
+                existing = self._jobs.get(self._keys.get(key))
+                if existing is not None and existing.status != FAILED:
+                    self._counts["deduplicated"] += 1
+                    return existing.job_id
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = JobRecord(job_id, key, QUEUED, time.time())
+            if key is not None:
+                self._keys[key] = job_id
+            self._counts["submitted"] += 1
+        # Worker threads start with an empty context; run the job in the submitter's
+        self._executor.submit(contextvars.copy_context().run, self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _update(self, job_id, **changes):
+        with self._changed:
+            record = self._jobs.get(job_id)
+            if record is None:
+                return
+            if "info" in changes:
+                changes["info"] = {**record.info, **changes["info"]}
+            self._jobs[job_id] = replace(record, **changes)
+            self._changed.notify_all()
+
+    def _run(self, job_id, fn, args, kwargs):
+        self._update(job_id, status=RUNNING, started=time.time())
+
+        def on_progress(partial=None, **info):
+            changes = {"info": info} if info else {}
+            if partial is not None:
+                changes["partial"] = partial
+            if changes:
+                self._update(job_id, **changes)
+
+        with collect_spans() as spans:
+            try:
+                result = fn(*args, on_progress=on_progress, **kwargs)
+            except Exception as e:
+                # Report the underlying SDK error rather than the wrapper
+                self._update(job_id, status=FAILED, finished=time.time(), error=str(e),
+                             error_type=type(e.__cause__ or e).__name__, details=traceback.format_exc(),
+                             spans=tuple(spans))
+                self._count(FAILED)
+                return
+        self._update(job_id, status=DONE, finished=time.time(), result=result, spans=tuple(spans))
+        self._count(DONE)
+
+    def _count(self, name):
+        with self._changed:
+            self._counts[name] += 1
+
+    def _purge(self, now):
+        expired = [job_id for job_id, record in self._jobs.items()
+                   if record.done and now - record.finished > self.ttl]
+        # Over the limit: drop the oldest finished jobs too; running ones are always kept
+        overflow = max(0, len(self._jobs) - len(expired) - self.max_jobs)
+        if overflow:
+            finished = [job_id for job_id, record in self._jobs.items() if record.done and job_id not in expired]
+            expired.extend(finished[:overflow])
+        for job_id in expired:
+            record = self._jobs.pop(job_id)
+            if self._keys.get(record.key) == job_id:
+                del self._keys[record.key]
+
+    def get(self, job_id):
+        """The job's current ``JobRecord``, or None if it is unknown or has expired"""
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job finishes or ``timeout`` passes; returns its latest record"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while True:
+                record = self._jobs.get(job_id)
+                if record is None or record.done:
+                    return record
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return record
+                self._changed.wait(remaining)
+
+    def position(self, job_id):
+        """Number of queued jobs submitted before this one; 0 once it runs"""
+        with self._changed:
+            record = self._jobs.get(job_id)
+            if record is None or record.status != QUEUED:
+                return 0
+            return sum(1 for other in self._jobs.values()
+                       if other.status == QUEUED and other.submitted < record.submitted)
+
+    def stats(self):
+        with self._changed:
+            statuses = Counter(record.status for record in self._jobs.values())
+            return {
+                "workers": self.max_workers,
+                "queued": statuses[QUEUED],
+                "running": statuses[RUNNING],
+                "held": len(self._jobs),
+                **self._counts,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,315 @@
+"""Local ATS keyword scoring: match resume terms against a job description without a model call"""
+import functools
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+DEFAULT_MAX_KEYWORDS = 40
+
+# Aliases and spelled-out forms map to one canonical skill name
+SYNONYMS = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "amazon web services": "aws",
+    "google cloud": "gcp",
+    "google cloud platform": "gcp",
+    "microsoft azure": "azure",
+    "reactjs": "react",
+    "react.js": "react",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "cicd": "ci/cd",
+    "continuous integration": "ci/cd",
+    "continuous delivery": "ci/cd",
+    "sklearn": "scikit-learn",
+    "cpp": "c++",
+    "c sharp": "c#",
+    "dotnet": ".net",
+    "restful": "rest",
+    "rest api": "rest",
+    "rest apis": "rest",
+    "oop": "object-oriented programming",
+    "object oriented programming": "object-oriented programming",
+    "mssql": "sql server",
+    "ux": "user experience",
+    "ui": "user interface",
+    "qa": "quality assurance",
+    "pm": "project management",
+    "bi": "business intelligence",
+    "etl": "data pipelines",
+    "llm": "large language models",
+    "llms": "large language models",
+}
+
+# Multi-word skills matched as a single term
+PHRASES = {
+    "machine learning", "deep learning", "artificial intelligence", "natural language processing",
+    "computer vision", "data science", "data analysis", "data engineering", "data pipelines",
+    "data visualization", "data modeling", "big data", "business intelligence", "project management",
+    "product management", "agile methodologies", "unit testing", "test automation", "version control",
+    "sql server", "power bi", "spring boot", "ruby on rails", "user experience", "user interface",
+    "quality assurance", "large language models", "distributed systems", "system design",
+    "object-oriented programming", "stakeholder management", "customer service", "financial modeling",
+    "supply chain", "github actions", "google analytics", "a/b testing", "infrastructure as code",
+}
+
+# Single-word skills, kept verbatim rather than stemmed
+SKILLS = {
+    "python", "java", "javascript", "typescript", "go", "rust", "scala", "kotlin", "swift", "ruby", "php",
+    "c", "c++", "c#", ".net", "r", "matlab", "sql", "html", "css", "graphql", "rest", "microservices",
+    "react", "angular", "vue", "node.js", "django", "flask", "fastapi", "spring", "pandas", "numpy",
+    "scikit-learn", "tensorflow", "pytorch", "spark", "hadoop", "kafka", "airflow", "dbt", "snowflake",
+    "tableau", "looker", "excel", "postgresql", "mysql", "mongodb", "redis", "elasticsearch", "aws", "gcp",
+    "azure", "docker", "kubernetes", "terraform", "ansible", "jenkins", "ci/cd", "git", "linux", "bash",
+    "agile", "scrum", "kanban", "jira", "figma", "salesforce", "sap", "seo",
+}
+
+_PHRASE_KEYS = PHRASES | {key for key in SYNONYMS if " " in key}
+_KNOWN_SKILLS = SKILLS | PHRASES | set(SYNONYMS.values())
+_MAX_PHRASE_WORDS = max(len(phrase.split()) for phrase in _PHRASE_KEYS)
+_PHRASE_FIRST_WORDS = {phrase.split()[0] for phrase in _PHRASE_KEYS}
+
+# Common English words plus job-ad filler that says nothing about skills
+STOPWORDS = frozenset("""
+a about above across after again all also am an and any are as at be because been before being
+below between both but by can could did do does doing done down during each either etc even every
+few for from further get had has have having he her here hers him his how i if in into is it its
+itself just may me might more most much must my no nor not now of off on once only or other our
+ours out over own per same shall she should so some such than that the their them then there these
+they this those through to too under until up upon us very via was we were what when where which
+while who whom why will with within without would you your yours
+ability able apply applicant candidate candidates company competitive day degree environment
+equal excellent experience experienced familiarity familiar good great help ideal include including
+join knowledge looking new opportunity plus preferred proficiency proficient required requirement
+requirements responsibilities responsible role skill skills strong team teams understanding using
+work working year years well highly related relevant demonstrated proven solid least like make
+position job jobs based benefits salary employer employee employees offer world ensure need needs
+nice bonus etc e.g i.e
+""".split())
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./\-]*")
+_REQUIREMENT_LINE = re.compile(r"\b(requir\w*|must|qualifications?|essential|need to have)\b", re.IGNORECASE)
+
+
+def _stem(word):
+    """Light suffix stripping so plural and -ing/-ed forms of plain words match"""
+    if not word.isalpha() or len(word) <= 4:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+@functools.lru_cache(maxsize=65536)
+def _normalize_word(word):
+    """Canonical term for a single word, or None if it carries no skill signal"""
+    if len(word) < 2 and word not in ("c", "r"):
+        return None
+    if word in STOPWORDS or not any(char.isalpha() for char in word):
+        return None
+    term = SYNONYMS.get(word, word)
+    if term not in _KNOWN_SKILLS:
+        term = _stem(term)
+    return None if term in STOPWORDS else term
+
+
+def _words(text):
+    # Trailing dots, dashes and slashes are sentence punctuation, not part of a skill name
+    return [token.rstrip("./-") for token in _TOKEN_PATTERN.findall(text.lower())]
+
+
+def iter_terms(text):
+    """Yield ``(term, surface)`` for each normalized term in ``text``.
+
+    Known multi-word skills are matched greedily, longest first; other words
+    are lowercased, mapped through ``SYNONYMS``, stemmed and filtered against
+    ``STOPWORDS``. ``surface`` is the text as written, for display.
+    """
+    words = _words(text)
+    i = 0
+    while i < len(words):
+        # Only words that can start a phrase pay for the phrase lookups
+        longest = min(_MAX_PHRASE_WORDS, len(words) - i) if words[i] in _PHRASE_FIRST_WORDS else 1
+        for size in range(longest, 1, -1):
+            phrase = " ".join(words[i:i + size])
+            if phrase in _PHRASE_KEYS:
+                yield SYNONYMS.get(phrase, phrase), phrase
+                i += size
+                break
+        else:
+            word = words[i]
+            i += 1
+            term = _normalize_word(word)
+            if term is not None:
+                yield term, word
+
+
+@functools.lru_cache(maxsize=1024)
+def extract_terms(text):
+    """Set of normalized terms in ``text`` (cached, since resumes are scored repeatedly)"""
+    return frozenset(term for term, _ in iter_terms(text))
+
+
+def extract_keywords(job_description, max_keywords=DEFAULT_MAX_KEYWORDS):
+    """Weighted keywords for a job description, highest weight first.
+
+    Weight grows with how often a term appears, and doubles for known skills
+    and for terms that appear in requirement lines or under a requirements
+    heading. Returns a list of ``(term, surface, weight)``.
+    """
+    counts = Counter()
+    surfaces = {}
+    boosted = set()
+    in_requirements = False
+    for line in job_description.splitlines():
+        stripped = line.strip()
+        is_heading = len(stripped.split()) <= 4 and (stripped.endswith(":") or stripped.isupper())
+        if is_heading:
+            in_requirements = bool(_REQUIREMENT_LINE.search(stripped))
+        is_requirement = in_requirements or bool(_REQUIREMENT_LINE.search(line))
+        for term, surface in iter_terms(line):
+            counts[term] += 1
+            surfaces.setdefault(term, surface)
+            if is_requirement:
+                boosted.add(term)
+
+    keywords = []
+    for term, count in counts.items():
+        weight = 1.0 + math.log(count)
+        if term in _KNOWN_SKILLS:
+            weight *= 2.0
+        if term in boosted:
+            weight *= 2.0
+        keywords.append((term, surfaces[term], weight))
+    keywords.sort(key=lambda keyword: (-keyword[2], keyword[0]))
+    return keywords[:max_keywords]
+
+
+@dataclass(frozen=True)
+class KeywordScore:
+    """Weighted keyword overlap between one resume and one job description"""
+
+    score: int
+    found: tuple
+    missing: tuple
+
+    def to_markdown(self):
+        """Render in the same numbered layout as the ``ats_score`` prompt"""
+        return (
+            f"1. ATS Match Score: {self.score}%\n"
+            f"2. Keywords Found: {', '.join(self.found) or 'none'}\n"
+            f"3. Keywords Missing: {', '.join(self.missing) or 'none'}\n"
+        )
+
+
+class KeywordScorer:
+    """Scores resumes against one job description.
+
+    The job description is analysed once; each resume then costs one term
+    extraction and a set intersection. ``score_many`` scores a whole batch
+    with a single matrix product.
+    """
+
+    def __init__(self, job_description, max_keywords=DEFAULT_MAX_KEYWORDS):
+        self.keywords = extract_keywords(job_description, max_keywords)
+        self.terms = tuple(term for term, _, _ in self.keywords)
+        self._surfaces = tuple(surface for _, surface, _ in self.keywords)
+        self._columns = {term: column for column, term in enumerate(self.terms)}
+        self._weights = [weight for _, _, weight in self.keywords]
+        self._total_weight = sum(self._weights)
+
+    def _result(self, present):
+        if not self._total_weight:
+            return KeywordScore(0, (), ())
+        score = sum(weight for weight, hit in zip(self._weights, present) if hit) / self._total_weight
+        return KeywordScore(
+            score=round(score * 100),
+            found=tuple(surface for surface, hit in zip(self._surfaces, present) if hit),
+            missing=tuple(surface for surface, hit in zip(self._surfaces, present) if not hit),
+        )
+
+    def score(self, resume_text):
+        matched = extract_terms(resume_text) & self._columns.keys()
+        return self._result([term in matched for term in self.terms])
+
+    def presence_matrix(self, resume_texts):
+        """Boolean array with one row per resume and one column per keyword"""
+        import numpy as np
+
+        matrix = np.zeros((len(resume_texts), len(self.terms)), dtype=bool)
+        for row, text in enumerate(resume_texts):
+            columns = [self._columns[term] for term in extract_terms(text) & self._columns.keys()]
+            matrix[row, columns] = True
+        return matrix
+
+    def score_many(self, resume_texts):
+        """Score a list of resumes; returns a list of ``KeywordScore``"""
+        import numpy as np
+
+        matrix = self.presence_matrix(resume_texts)
+        if not self._total_weight:
+            return [KeywordScore(0, (), ()) for _ in resume_texts]
+        scores = matrix @ np.asarray(self._weights) / self._total_weight
+        return [
+            KeywordScore(
+                score=round(float(score) * 100),
+                found=tuple(self._surfaces[column] for column in np.flatnonzero(row)),
+                missing=tuple(self._surfaces[column] for column in np.flatnonzero(~row)),
+            )
+            for score, row in zip(scores, matrix)
+        ]
+
+
+def score_resume(resume_text, job_description, max_keywords=DEFAULT_MAX_KEYWORDS):
+    """Keyword match score for one resume/job description pair"""
+    return KeywordScorer(job_description, max_keywords).score(resume_text)
+
+
+def score_matrix(resume_texts, job_descriptions, max_keywords=DEFAULT_MAX_KEYWORDS):
+    """Scores (0..100) for every resume against every job description.
+
+    Returns a float array of shape ``(len(resume_texts), len(job_descriptions))``,
+    computed as one product of a resume-term presence matrix and a job
+    description weight matrix over a shared vocabulary.
+    """
+    import numpy as np
+
+    keyword_lists = [extract_keywords(jd, max_keywords) for jd in job_descriptions]
+    vocabulary = {}
+    for keywords in keyword_lists:
+        for term, _, _ in keywords:
+            vocabulary.setdefault(term, len(vocabulary))
+
+    weights = np.zeros((len(vocabulary), len(job_descriptions)), dtype=np.float32)
+    for column, keywords in enumerate(keyword_lists):
+        for term, _, weight in keywords:
+            weights[vocabulary[term], column] = weight
+
+    presence = np.zeros((len(resume_texts), len(vocabulary)), dtype=np.float32)
+    for row, text in enumerate(resume_texts):
+        presence[row, [vocabulary[term] for term in extract_terms(text) & vocabulary.keys()]] = 1.0
+
+    totals = weights.sum(axis=0)
+    return np.divide(presence @ weights, totals, out=np.zeros((len(resume_texts), len(job_descriptions)),
+                                                             dtype=np.float32), where=totals > 0) * 100
@@ -0,0 +1,316 @@
+"""PDF preparation: render the resume to an image or extract its text layer"""
+import io
+import re
+import threading
+import time
+
+from .errors import PdfProcessingError, RenderLimitError
+from .imaging import ImageOptions, optimize_image
+from .pdf_cache import make_cache_key
+from .telemetry import span
+from .textlayer import ROUTE_BOTH, ROUTE_IMAGE, ROUTE_TEXT, RoutingDecision, assess_text_layer, choose_route
+
+DEFAULT_DPI = 200
+DEFAULT_PAGES = "all"
+DEFAULT_MAX_PAGES = 5
+DEFAULT_RENDER_THREADS = 2
+# Stop text extraction after this many characters; a long CV is well under 100k
+DEFAULT_MAX_TEXT_CHARS = 200_000
+# "auto" routes each document by text layer quality; "image", "text" and "both" force a route
+DEFAULT_MODE = "auto"
+PDF_MODES = ("auto", ROUTE_IMAGE, ROUTE_TEXT, ROUTE_BOTH)
+# Pages sent without image options are still encoded as they arrive, losslessly and at full size
+UNCHANGED_PAGE = ImageOptions(max_pixels=None, crop_margins=False, image_format="PNG")
+
+_pdf2image_available = None
+
+# Moving average of poppler render time per page, used to estimate time saved by skipping rendering
+_render_seconds_per_page = 0.25
+_render_stats_lock = threading.Lock()
+
+
+def pdf2image_available():
+    """True if pdf2image can be imported (checked once, on first use)"""
+    global _pdf2image_available
+    if _pdf2image_available is None:
+        try:
+            import pdf2image  # noqa: F401
+            _pdf2image_available = True
+        except ImportError:
+            _pdf2image_available = False
+    return _pdf2image_available
+
+
+_HYPHENATED_BREAK = re.compile(r"(\w)-\n[ \t]*(?=[a-z])")
+_INLINE_SPACE = re.compile(r"[ \t\u00a0]+")
+_SPACE_AROUND_NEWLINE = re.compile(r" *\n *")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_TRAILING_FRAGMENT = re.compile(r"(\S*\w)-\s*$")
+
+
+def normalize_page_text(text):
+    """Collapse runs of spaces and blank lines and rejoin words hyphenated across lines"""
+    text = _HYPHENATED_BREAK.sub(r"\1", text)
+    text = _INLINE_SPACE.sub(" ", text)
+    text = _SPACE_AROUND_NEWLINE.sub("\n", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def _iter_reader_text(pdf_reader, max_chars=None):
+    # Only emitted text, plus the newline that joins it to the next page, counts against the cap
+    remaining = max_chars
+    carry = ""
+    for page in pdf_reader.pages:
+        text = normalize_page_text(page.extract_text() or "")
+        if not text:
+            # A blank page keeps any carried fragment for the next page with text
+            continue
+        if carry:
+            # Rejoin a word hyphenated across the page break
+            text = carry + text if text[:1].islower() else f"{carry}-\n{text}"
+            carry = ""
+        match = _TRAILING_FRAGMENT.search(text)
+        if match:
+            carry = match.group(1)
+            text = text[:match.start()].rstrip()
+        if not text:
+            continue
+        if remaining is not None:
+            if remaining <= 0:
+                return
+            if len(text) >= remaining:
+                yield text[:remaining]
+                return
+            remaining -= len(text) + 1
+        yield text
+    if carry and (remaining is None or remaining > 0):
+        yield carry[:remaining] if remaining is not None else carry
+
+
+def iter_pdf_text(pdf_bytes, max_chars=None):
+    """Yield normalized text one page at a time, stopping after ``max_chars`` characters"""
+    import PyPDF2
+
+    yield from _iter_reader_text(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)), max_chars)
+
+
+def extract_pdf_text(pdf_bytes, max_chars=DEFAULT_MAX_TEXT_CHARS):
+    """Extract the text layer of every page with PyPDF2"""
+    return extract_pdf_text_with_page_count(pdf_bytes, max_chars)[0]
+
+
+def extract_pdf_text_with_page_count(pdf_bytes, max_chars=DEFAULT_MAX_TEXT_CHARS):
+    """Extract the text layer and return it with the document's page count"""
+    import PyPDF2
+
+    with span("text_extract") as attributes:
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        text = "\n".join(_iter_reader_text(pdf_reader, max_chars))
+        attributes.update(pages=len(pdf_reader.pages), chars=len(text))
+    return text, len(pdf_reader.pages)
+
+
+def estimated_render_seconds(page_count):
+    """Expected poppler time for ``page_count`` pages, from recent renders"""
+    return _render_seconds_per_page * page_count
+
+
+def _record_render_time(seconds, page_count):
+    global _render_seconds_per_page
+    with _render_stats_lock:
+        _render_seconds_per_page = 0.8 * _render_seconds_per_page + 0.2 * (seconds / page_count)
+
+
+def parse_page_selection(selection, page_count, max_pages=DEFAULT_MAX_PAGES):
+    """Turn a page selection into 1-based page numbers, capped at ``max_pages``.
+
+    ``selection`` is ``"first"``, ``"all"`` or a list of pages and ranges such as
+    ``"1-3,5"``. Pages past the end of the document are ignored.
+    """
+    selection = (selection or DEFAULT_PAGES).strip().lower()
+    if selection == "first":
+        pages = [1]
+    elif selection == "all":
+        pages = list(range(1, page_count + 1))
+    else:
+        pages = []
+        for part in selection.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                start, end = part.split("-", 1)
+                pages.extend(range(int(start), int(end) + 1))
+            else:
+                pages.append(int(part))
+        pages = sorted(set(pages))
+    pages = [page for page in pages if 1 <= page <= page_count]
+    if max_pages:
+        pages = pages[:max_pages]
+    return pages
+
+
+def _page_runs(page_numbers, run_length):
+    """Group sorted page numbers into consecutive runs of at most ``run_length``"""
+    run = []
+    for page in page_numbers:
+        if run and (page != run[-1] + 1 or len(run) >= run_length):
+            yield run
+            run = []
+        run.append(page)
+    if run:
+        yield run
+
+
+def iter_page_images(pdf_bytes, page_numbers, dpi=DEFAULT_DPI, cache=None,
+                     thread_count=DEFAULT_RENDER_THREADS):
+    """Yield rendered pages one at a time, in order.
+
+    Only the requested pages are rendered, ``thread_count`` pages per poppler
+    call, so at most that many uncached pages are held in memory at once.
+    """
+    pending = []
+    for page in page_numbers:
+        key = make_cache_key(pdf_bytes, mode="image", dpi=dpi, page=page)
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            # Flush uncached pages first so output stays in page order
+            yield from _render_pages(pdf_bytes, pending, dpi, cache, thread_count)
+            pending = []
+            yield cached
+        else:
+            pending.append(page)
+    yield from _render_pages(pdf_bytes, pending, dpi, cache, thread_count)
+
+
+def _render_pages(pdf_bytes, page_numbers, dpi, cache, thread_count):
+    import pdf2image
+
+    for run in _page_runs(page_numbers, max(1, thread_count)):
+        started = time.perf_counter()
+        with span("rasterize", pages=len(run), dpi=dpi):
+            images = pdf2image.convert_from_bytes(
+                pdf_bytes,
+                dpi=dpi,
+                first_page=run[0],
+                last_page=run[-1],
+                thread_count=min(thread_count, len(run)),
+            )
+        _record_render_time(time.perf_counter() - started, len(run))
+        for page, image in zip(run, images):
+            if cache is not None:
+                cache.put(make_cache_key(pdf_bytes, mode="image", dpi=dpi, page=page), image)
+            yield image
+
+
+def pdf_page_count(pdf_bytes):
+    """Number of pages, read from the PDF info without rendering"""
+    import pdf2image
+
+    return int(pdf2image.pdfinfo_from_bytes(pdf_bytes)["Pages"])
+
+
+def _cached_text(pdf_bytes, cache, max_chars=DEFAULT_MAX_TEXT_CHARS):
+    """Extracted text and page count, cached together so a hit doesn't parse the PDF"""
+    text_key = make_cache_key(pdf_bytes, mode="text", pages="all", max_chars=max_chars, fields="text,pages")
+    cached = cache.get(text_key) if cache is not None else None
+    if isinstance(cached, dict):
+        return cached["text"], cached["pages"]
+    text_content, page_count = extract_pdf_text_with_page_count(pdf_bytes, max_chars)
+    if cache is not None:
+        cache.put(text_key, {"text": text_content, "pages": page_count})
+    return text_content, page_count
+
+
+def prepare_pdf_content(pdf_bytes, cache=None, dpi=DEFAULT_DPI, pages=DEFAULT_PAGES,
+                        max_pages=DEFAULT_MAX_PAGES, thread_count=DEFAULT_RENDER_THREADS,
+                        image_options=None, mode=DEFAULT_MODE, max_text_chars=DEFAULT_MAX_TEXT_CHARS,
+                        on_route=None, on_warning=None, render_pool=None):
+    """Prepare a PDF for the model as page images, extracted text, or both.
+
+    In ``"auto"`` mode the text layer is scored first: clean born-digital PDFs
+    go text-only and skip rendering, scanned ones are rendered, and borderline
+    ones send both. ``"image"`` renders and falls back to text on failure;
+    ``"text"`` and ``"both"`` force those routes.
+
+    Returns a list of ``ImagePayload`` pages (one per selected page, at most
+    ``max_pages``), a string, or for the "both" route a list of the text
+    followed by the pages. Each page is encoded as it is rendered, so at most
+    ``thread_count`` uncached PIL pages are in memory at once;
+    ``image_options`` sets the encoding, and without it pages are kept
+    unchanged as PNG. ``pages`` is a selection as accepted by
+    ``parse_page_selection``. Extracted text is capped at ``max_text_chars``. ``cache`` is an optional ``PdfCache``.
+    ``on_route`` receives the ``RoutingDecision``; ``on_warning`` receives a
+    message when rendering fails and the text fallback is used. With a
+    ``RenderPool`` pages are rendered in its worker processes under its
+    limits instead of in the calling thread. Raises ``PdfProcessingError`` if
+    no content can be prepared.
+    """
+    if mode not in PDF_MODES:
+        raise ValueError(f"Unknown PDF mode: {mode}")
+
+    text_content = None
+    page_count = None
+    if mode == ROUTE_TEXT or not pdf2image_available():
+        decision = RoutingDecision(ROUTE_TEXT, "configured" if mode == ROUTE_TEXT else "pdf2image unavailable")
+    elif mode == "auto":
+        started = time.perf_counter()
+        try:
+            text_content, page_count = _cached_text(pdf_bytes, cache, max_text_chars)
+            report = assess_text_layer(text_content, page_count)
+            route, reason = choose_route(report)
+        except Exception as e:
+            report = None
+            route, reason = ROUTE_IMAGE, f"text extraction failed: {e}"
+        decision = RoutingDecision(route, reason, report, text_seconds=time.perf_counter() - started)
+    else:
+        decision = RoutingDecision(mode, "configured")
+
+    if decision.route in (ROUTE_IMAGE, ROUTE_BOTH):
+        # Convert PDF pages to images using pdf2image
+        started = time.perf_counter()
+        try:
+            if render_pool is not None:
+                page_count = page_count or render_pool.page_count(pdf_bytes)
+                page_numbers = parse_page_selection(pages, page_count, max_pages)
+                images = render_pool.render_pages(pdf_bytes, page_numbers, dpi, thread_count, page_count, cache)
+            else:
+                page_numbers = parse_page_selection(pages, page_count or pdf_page_count(pdf_bytes), max_pages)
+                images = iter_page_images(pdf_bytes, page_numbers, dpi, cache, thread_count)
+            images = [optimize_image(image, image_options or UNCHANGED_PAGE) for image in images]
+            decision.render_seconds = time.perf_counter() - started
+            if images:
+                if decision.route == ROUTE_BOTH:
+                    if text_content is None:
+                        try:
+                            text_content, page_count = _cached_text(pdf_bytes, cache, max_text_chars)
+                        except Exception:
+                            text_content = ""
+                    images = [text_content, *images] if text_content.strip() else images
+                if on_route is not None:
+                    on_route(decision)
+                return images
+            decision.route, decision.reason = ROUTE_TEXT, "rendering failed"
+        except RenderLimitError as e:
+            if on_warning is not None:
+                on_warning(f"Rendering stopped: {str(e)}. Using the text layer instead.")
+            decision.route, decision.reason = ROUTE_TEXT, "render limit exceeded"
+        except Exception as e:
+            if on_warning is not None:
+                on_warning(f"pdf2image failed: {str(e)}. Trying alternate method...")
+            decision.route, decision.reason = ROUTE_TEXT, "rendering failed"
+    elif decision.report is not None:
+        # Rendering was skipped because the text layer is good enough
+        decision.saved_seconds = estimated_render_seconds(
+            len(parse_page_selection(pages, page_count, max_pages))
+        )
+
+    # Fallback: Extract text from PDF
+    if text_content is None:
+        try:
+            text_content, page_count = _cached_text(pdf_bytes, cache, max_text_chars)
+        except Exception as e:
+            raise PdfProcessingError(str(e)) from e
+    if on_route is not None:
+        on_route(decision)
+    return text_content
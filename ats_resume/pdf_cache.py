@@ -0,0 +1,222 @@
+import hashlib
+import io
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .utils import is_image
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 1024 * 1024 * 1024
+# Disk eviction frees down to this share of the bound, so a full cache isn't rescanned on every write
+_DISK_LOW_WATER = 0.9
+_DISK_SUFFIXES = (".png", ".txt", ".json")
+
+
+def make_cache_key(pdf_bytes, **settings):
+    """Build a content-addressed key from the PDF bytes and rendering settings"""
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    settings_blob = json.dumps(settings, sort_keys=True, default=str)
+    settings_digest = hashlib.sha256(settings_blob.encode("utf-8")).hexdigest()[:16]
+    return f"{digest}-{settings_digest}"
+
+
+def _entry_size(value):
+    """Approximate in-memory size of a cached value in bytes"""
+    if is_image(value):
+        return value.width * value.height * len(value.getbands())
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        # Unpicklable values can't be sized, so they count as too large to keep
+        return float("inf")
+
+
+class PdfCache:
+    """LRU cache for prepared PDF content (rendered page images or extracted text).
+
+    Entries live in memory up to ``max_bytes``; least recently used entries are
+    evicted first. When ``disk_dir`` is set, entries are also written to disk so
+    that reruns and other worker processes can reuse them: images as PNG,
+    strings as text and other JSON-serializable values as JSON. The directory is
+    kept under ``max_disk_bytes`` (0 for no bound) by deleting the files least
+    recently written or read; a read refreshes a file's modification time, so
+    processes sharing the directory see each other's use.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_size = sum(size for _, size, _ in self._disk_files())
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store ``value`` (a PIL image, a string or another JSON-serializable value) under ``key``"""
+        with self._lock:
+            self._store(key, value)
+        self._write_disk(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _store(self, key, value):
+        size = _entry_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._size -= _entry_size(self._entries.pop(key))
+        self._entries[key] = value
+        self._size += size
+        while self._size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= _entry_size(evicted)
+
+    def _disk_path(self, key, suffix):
+        return os.path.join(self.disk_dir, f"{key}{suffix}")
+
+    def _disk_files(self):
+        """``(mtime, size, path)`` for each entry file in ``disk_dir``"""
+        files = []
+        try:
+            with os.scandir(self.disk_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(_DISK_SUFFIXES):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            # Evicted by another process while scanning
+                            continue
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return files
+
+    def _evict_disk(self):
+        """Delete the least recently used files until the directory is under its low-water mark"""
+        files = sorted(self._disk_files())
+        size = sum(file_size for _, file_size, _ in files)
+        target = self.max_disk_bytes * _DISK_LOW_WATER
+        for _, file_size, path in files:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= file_size
+        self._disk_size = size
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            image_path = self._disk_path(key, ".png")
+            if os.path.exists(image_path):
+                from PIL import Image
+                with open(image_path, "rb") as f:
+                    image = Image.open(io.BytesIO(f.read()))
+                    image.load()
+                self._touch(image_path)
+                return image
+            text_path = self._disk_path(key, ".txt")
+            if os.path.exists(text_path):
+                with open(text_path, "r", encoding="utf-8") as f:
+                    text = f.read()
+                self._touch(text_path)
+                return text
+            json_path = self._disk_path(key, ".json")
+            if os.path.exists(json_path):
+                with open(json_path, "r", encoding="utf-8") as f:
+                    value = json.load(f)
+                self._touch(json_path)
+                return value
+        except (OSError, ValueError):
+            # A corrupt or half-written entry is treated as a miss
+            return None
+        return None
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        if is_image(value):
+            suffix = ".png"
+            buffer = io.BytesIO()
+            value.save(buffer, format="PNG")
+            data = buffer.getvalue()
+        elif isinstance(value, str):
+            suffix = ".txt"
+            data = value.encode("utf-8")
+        else:
+            try:
+                data = json.dumps(value).encode("utf-8")
+            except (TypeError, ValueError):
+                # Kept in memory only
+                return
+            suffix = ".json"
+        # Write to a temp file and rename so concurrent readers never see partial data
+        path = self._disk_path(key, suffix)
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # Rewriting an entry replaces its file, so only the difference in size is new
+            try:
+                replaced_size = os.stat(path).st_size
+            except OSError:
+                replaced_size = 0
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except OSError:
+            return
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        if self.max_disk_bytes:
+            with self._disk_lock:
+                self._disk_size += len(data) - replaced_size
+                if self._disk_size > self.max_disk_bytes:
+                    self._evict_disk()
@@ -0,0 +1,301 @@
+"""Rate limiting and retries for Gemini calls.
+
+``RateLimiter`` enforces requests-per-minute and tokens-per-minute budgets
+with token buckets, serves waiting callers in priority order (interactive
+before batch), and backs off when the API reports quota errors. Bucket state
+lives in memory or, with ``SqliteBucketStore``, in a SQLite file shared by
+every worker process on the host.
+"""
+import heapq
+import itertools
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from .errors import RateLimitTimeout
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+_RETRY_IN_PATTERN = re.compile(r"retry (?:in|after) (\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+_RATE_LIMIT_MESSAGE_PATTERN = re.compile(r"\b429\b|quota|resource.exhausted", re.IGNORECASE)
+
+
+class MemoryBucketStore:
+    """Token bucket state for a single process"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def try_consume(self, costs, capacities, rates):
+        """Take ``costs`` from every bucket at once, or return seconds until that is possible"""
+        now = time.time()
+        with self._lock:
+            levels = {}
+            for name in costs:
+                tokens, updated = self._buckets.get(name, (capacities[name], now))
+                levels[name] = min(capacities[name], tokens + (now - updated) * rates[name])
+            wait = _wait_for(costs, levels, rates)
+            if wait <= 0:
+                for name, cost in costs.items():
+                    levels[name] -= cost
+            for name, tokens in levels.items():
+                self._buckets[name] = (tokens, now)
+            return wait
+
+
+class SqliteBucketStore:
+    """Token bucket state in a SQLite file, shared by all processes that open it"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def try_consume(self, costs, capacities, rates):
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock so the read-modify-write is atomic across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                levels = {}
+                for name in costs:
+                    row = self._conn.execute(
+                        "SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)
+                    ).fetchone()
+                    tokens, updated = row if row is not None else (capacities[name], now)
+                    levels[name] = min(capacities[name], tokens + (now - updated) * rates[name])
+                wait = _wait_for(costs, levels, rates)
+                if wait <= 0:
+                    for name, cost in costs.items():
+                        levels[name] -= cost
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    [(name, tokens, now) for name, tokens in levels.items()],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return wait
+
+    def close(self):
+        self._conn.close()
+
+
+def _wait_for(costs, levels, rates):
+    """Seconds until every bucket holds its cost (0 if they already do)"""
+    wait = 0.0
+    for name, cost in costs.items():
+        missing = cost - levels[name]
+        if missing > 0:
+            wait = max(wait, missing / rates[name])
+    return wait
+
+
+class RateLimiter:
+    """Requests- and tokens-per-minute limiter with a priority queue of waiting callers.
+
+    Lower ``priority`` values are served first. After a quota error,
+    ``throttle`` pauses every caller and halves the effective rate; each
+    successful call then restores 5% of the configured rate.
+    """
+
+    def __init__(self, rpm=None, tpm=None, store=None, min_rate_fraction=0.25, name="gemini"):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.store = store or MemoryBucketStore()
+        self.min_rate_fraction = min_rate_fraction
+        self.name = name
+        self._rate_fraction = 1.0
+        self._paused_until = 0.0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._waits = deque(maxlen=1000)
+        self.granted = 0
+        self.throttled = 0
+
+    def _budgets(self, tokens):
+        costs, capacities, rates = {}, {}, {}
+        if self.rpm:
+            name = f"{self.name}:requests"
+            capacities[name] = float(self.rpm)
+            rates[name] = self.rpm * self._rate_fraction / 60.0
+            costs[name] = 1.0
+        if self.tpm:
+            name = f"{self.name}:tokens"
+            capacities[name] = float(self.tpm)
+            rates[name] = self.tpm * self._rate_fraction / 60.0
+            # A request larger than the whole budget would otherwise wait forever
+            costs[name] = float(min(tokens, self.tpm))
+        return costs, capacities, rates
+
+    def acquire(self, tokens=0, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """Block until the request fits the budgets; returns the seconds waited"""
+        started = time.monotonic()
+        ticket = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            # A new head may need to run ahead of a caller already waiting for refill
+            self._cond.notify_all()
+            try:
+                while True:
+                    wait = None
+                    if self._queue[0] == ticket:
+                        wait = self._paused_until - time.monotonic()
+                        if wait <= 0:
+                            costs, capacities, rates = self._budgets(tokens)
+                            wait = self.store.try_consume(costs, capacities, rates) if costs else 0.0
+                            if wait <= 0:
+                                break
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - started)
+                        if remaining <= 0:
+                            raise RateLimitTimeout(f"Waited {timeout:.1f}s for rate limit capacity")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+            waited = time.monotonic() - started
+            self._waits.append(waited)
+            self.granted += 1
+            return waited
+
+    def throttle(self, pause_seconds):
+        """Back off after a quota error: pause all callers and halve the rate"""
+        with self._cond:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + pause_seconds)
+            self._rate_fraction = max(self.min_rate_fraction, self._rate_fraction / 2)
+
+    def record_success(self):
+        with self._cond:
+            self._rate_fraction = min(1.0, self._rate_fraction + 0.05)
+
+    def stats(self):
+        """Queue depth, wait times and current rate, for the debug panel and logs"""
+        with self._cond:
+            waits = sorted(self._waits)
+            by_priority = {}
+            for priority, _ in self._queue:
+                by_priority[priority] = by_priority.get(priority, 0) + 1
+            return {
+                "queue_depth": len(self._queue),
+                "queue_by_priority": by_priority,
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "rate_fraction": round(self._rate_fraction, 2),
+                "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+                "wait_seconds_p50": round(waits[len(waits) // 2], 3) if waits else 0.0,
+                "wait_seconds_p95": round(waits[int(len(waits) * 0.95) - 1], 3) if waits else 0.0,
+            }
+
+
+def _status_code(error):
+    """HTTP status carried by an API or HTTP client error, or None"""
+    for status in (getattr(error, "code", None), getattr(error, "status_code", None),
+                   getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(status, int) and not isinstance(status, bool):
+            return status
+    return None
+
+
+def is_rate_limit_error(error):
+    """True for quota / HTTP 429 errors from the Gemini API.
+
+    The exception type and status code decide; the message is only read for
+    errors that carry neither.
+    """
+    try:
+        from google.api_core import exceptions as google_exceptions
+        if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+            return True
+    except ImportError:
+        pass
+    status = _status_code(error)
+    if status is not None:
+        return status == 429
+    return _RATE_LIMIT_MESSAGE_PATTERN.search(str(error)) is not None
+
+
+def is_retryable_error(error):
+    """Quota errors and transient server or network failures"""
+    if is_rate_limit_error(error) or isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        from google.api_core import exceptions as google_exceptions
+        return isinstance(error, (
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.InternalServerError,
+            google_exceptions.DeadlineExceeded,
+        ))
+    except ImportError:
+        return False
+
+
+def retry_after_hint(error):
+    """Seconds the API asked us to wait, from RetryInfo details or the message"""
+    for detail in getattr(error, "details", None) or ():
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            seconds = getattr(delay, "seconds", 0) + getattr(delay, "nanos", 0) / 1e9
+            if seconds > 0:
+                return seconds
+    match = _RETRY_IN_PATTERN.search(str(error))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+    """Exponential backoff with jitter: half the cap plus a random half"""
+    cap = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return cap / 2 + random.uniform(0, cap / 2)
+
+
+def call_with_retries(fn, limiter=None, tokens=0, priority=PRIORITY_INTERACTIVE,
+                      max_retries=DEFAULT_MAX_RETRIES, on_retry=None):
+    """Call ``fn`` under ``limiter``, retrying retryable errors with jittered backoff.
+
+    Retry-after hints from the API take precedence over the computed delay.
+    ``on_retry(attempt, delay, error)`` is called before each retry.
+    """
+    for attempt in itertools.count(1):
+        if limiter is not None:
+            limiter.acquire(tokens, priority)
+        try:
+            result = fn()
+        except Exception as e:
+            if attempt > max_retries or not is_retryable_error(e):
+                raise
+            delay = retry_after_hint(e)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            if on_retry is not None:
+                on_retry(attempt, delay, e)
+            if limiter is not None and is_rate_limit_error(e):
+                # The pause applies to every caller; acquire() waits it out
+                limiter.throttle(delay)
+            else:
+                time.sleep(delay)
+            continue
+        if limiter is not None:
+            limiter.record_success()
+        return result
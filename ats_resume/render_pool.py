@@ -0,0 +1,363 @@
+"""PDF rendering in a bounded process pool with per-document time, size and memory limits.
+
+Poppler runs in worker processes, so a pathological PDF (huge pages,
+thousands of pages) cannot block a Streamlit session or push the server out
+of memory. A render that times out or crashes its worker raises
+``RenderLimitError``; ``prepare_pdf_content`` then falls back to the text
+layer. One pool serves the web app and batch runs alike.
+
+Each worker is its own process with a pipe, rather than a
+``ProcessPoolExecutor``: a render's time limit starts when a worker picks it
+up, not while it waits in line, and a render that hangs costs only its own
+worker, which is killed and replaced, instead of failing every render in
+flight.
+"""
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from .errors import RenderLimitError
+from .pdf import _page_runs, _record_render_time
+from .pdf_cache import make_cache_key
+from .telemetry import span
+
+DEFAULT_RENDER_WORKERS = 2
+# Extra time past poppler's own timeout before the worker interrupts itself, and before the pool kills it
+_DEADLINE_GRACE_SECONDS = 1
+_TIMEOUT_GRACE_SECONDS = 5
+# How long shutdown waits for an idle worker to exit before killing it
+_EXIT_SECONDS = 5
+
+
+@dataclass(frozen=True)
+class RenderLimits:
+    """Limits applied to each document rendered in the pool.
+
+    ``timeout_seconds`` bounds one render call, from when a worker starts it. Documents with more than
+    ``max_document_pages`` pages are not rendered at all. Pages are rendered
+    at a lower DPI when needed so none exceeds ``max_page_pixels``.
+    ``max_memory_mb`` caps each worker's address space (including poppler);
+    0 disables the cap.
+    """
+
+    timeout_seconds: float = 60
+    max_document_pages: int = 100
+    max_page_pixels: int = 25_000_000
+    max_memory_mb: int = 2048
+
+
+def render_limits_from_env():
+    """Build ``RenderLimits`` from PDF_RENDER_* environment variables"""
+    defaults = RenderLimits()
+    return RenderLimits(
+        timeout_seconds=float(os.getenv("PDF_RENDER_TIMEOUT", str(defaults.timeout_seconds))),
+        max_document_pages=int(os.getenv("PDF_MAX_DOCUMENT_PAGES", str(defaults.max_document_pages))),
+        max_page_pixels=int(os.getenv("PDF_MAX_PAGE_PIXELS", str(defaults.max_page_pixels))),
+        max_memory_mb=int(os.getenv("PDF_RENDER_MAX_MEMORY_MB", str(defaults.max_memory_mb))),
+    )
+
+
+def _init_worker(max_memory_mb):
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows; the timeout still applies
+        return
+    limit = max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+class _DeadlineExceeded(Exception):
+    """Raised in a worker when a job runs past its deadline"""
+
+
+def _expire(signum, frame):
+    raise _DeadlineExceeded()
+
+
+def _call_with_deadline(fn, args, timeout):
+    """``fn(*args)``, interrupted with ``_DeadlineExceeded`` ``timeout`` seconds after it starts.
+
+    Poppler's own timeout normally fires first; the alarm also covers the
+    PDF parsing around it. Without SIGALRM (Windows) only the pool's kill applies.
+    """
+    if not timeout or not hasattr(signal, "setitimer"):
+        return fn(*args)
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout + _DEADLINE_GRACE_SECONDS)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _worker_main(conn, max_memory_mb):
+    """Run ``(fn, args, timeout)`` jobs from ``conn`` until it closes, sending back ``(ok, result)``"""
+    _init_worker(max_memory_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        fn, args, timeout = job
+        try:
+            reply = (True, _call_with_deadline(fn, args, timeout))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # An exception that does not pickle is sent as its message
+            conn.send((False, RenderLimitError(f"rendering failed: {e!r}")))
+
+
+def _page_count_job(pdf_bytes, timeout):
+    import pdf2image
+
+    return int(pdf2image.pdfinfo_from_bytes(pdf_bytes, timeout=timeout)["Pages"])
+
+
+def _fit_dpi(pdf_bytes, page_numbers, dpi, max_page_pixels):
+    """Largest DPI up to ``dpi`` at which every selected page stays within ``max_page_pixels``"""
+    import io
+
+    import PyPDF2
+
+    try:
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        largest = max(float(reader.pages[page - 1].mediabox.width) * float(reader.pages[page - 1].mediabox.height)
+                      for page in page_numbers)
+    except Exception:
+        # Unreadable page boxes: let poppler decide and rely on the memory cap
+        return dpi
+    pixels = largest * (dpi / 72) ** 2
+    if pixels <= max_page_pixels:
+        return dpi
+    return max(1, math.floor(dpi * math.sqrt(max_page_pixels / pixels)))
+
+
+def _render_job(pdf_bytes, page_runs, dpi, thread_count, timeout):
+    """Render runs of consecutive pages at ``dpi``; returns (images, seconds)"""
+    import pdf2image
+
+    started = time.perf_counter()
+    images = []
+    try:
+        for run in page_runs:
+            images.extend(pdf2image.convert_from_bytes(
+                pdf_bytes,
+                dpi=dpi,
+                first_page=run[0],
+                last_page=run[-1],
+                thread_count=min(thread_count, len(run)),
+                timeout=max(1, math.ceil(timeout - (time.perf_counter() - started))),
+            ))
+    except MemoryError:
+        raise RenderLimitError("rendering exceeded the memory limit") from None
+    return images, time.perf_counter() - started
+
+
+class _Worker:
+    """One worker process and the pipe jobs are sent over"""
+
+    def __init__(self, context, max_memory_mb):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, max_memory_mb), daemon=True)
+        self.process.start()
+        child.close()
+
+    def call(self, fn, args, timeout, wait):
+        """``(ok, result)`` of ``fn(*args)``; None if no reply came within ``wait`` seconds.
+
+        Raises ``EOFError`` or ``OSError`` if the worker died.
+        """
+        self.conn.send((fn, args, timeout))
+        if not self.conn.poll(wait):
+            return None
+        return self.conn.recv()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(_EXIT_SECONDS)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class RenderPool:
+    """Worker processes that render PDF pages under ``RenderLimits``.
+
+    At most ``max_workers`` documents render at once; further requests wait
+    their turn, and the time limit starts when a worker takes the request.
+    Workers are started on first use and reused. A render that outlives its
+    timeout is interrupted inside its worker; if the worker does not answer
+    soon after, or crashes, only that worker is killed and replaced.
+    """
+
+    def __init__(self, max_workers=DEFAULT_RENDER_WORKERS, limits=None):
+        self.max_workers = max_workers
+        self.limits = limits or RenderLimits()
+        self._context = None
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(max(1, max_workers))
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def _take_worker(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            if self._context is None:
+                # Forking a threaded server is unsafe; start workers from a clean process
+                methods = multiprocessing.get_all_start_methods()
+                self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            context = self._context
+        return _Worker(context, self.limits.max_memory_mb)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _timed_out(self):
+        self._count("timeouts")
+        return RenderLimitError(f"rendering took longer than {self.limits.timeout_seconds:g}s")
+
+    def _run(self, fn, *args, timeout=None):
+        timeout = self.limits.timeout_seconds if timeout is None else timeout
+        # Waiting for a free worker is not part of the time limit
+        with self._slots:
+            worker = self._take_worker()
+            reply = None
+            try:
+                reply = worker.call(fn, args, timeout, timeout + _TIMEOUT_GRACE_SECONDS)
+            except (EOFError, OSError):
+                self._count("crashes")
+                raise RenderLimitError("the render worker crashed, most likely out of memory") from None
+            finally:
+                # A worker that answered goes back to the pool; any other outcome leaves it in an unknown state
+                if reply is not None:
+                    with self._lock:
+                        self._idle.append(worker)
+                else:
+                    worker.kill()
+            if reply is None:
+                # Stuck where the alarm can't reach it: only this worker was stopped
+                raise self._timed_out()
+        ok, result = reply
+        if ok:
+            return result
+        if isinstance(result, _DeadlineExceeded):
+            raise self._timed_out()
+        raise result
+
+    def page_count(self, pdf_bytes):
+        """Number of pages, read with pdfinfo in a worker"""
+        return self._run(_page_count_job, pdf_bytes, self.limits.timeout_seconds)
+
+    def fit_dpi(self, pdf_bytes, page_numbers, dpi):
+        """Largest DPI up to ``dpi`` at which none of ``page_numbers`` exceeds ``max_page_pixels``"""
+        return _fit_dpi(pdf_bytes, page_numbers, dpi, self.limits.max_page_pixels)
+
+    def render(self, pdf_bytes, page_numbers, dpi, thread_count, page_count, timeout=None):
+        """Render ``page_numbers`` at ``dpi`` in a worker; returns (images, seconds).
+
+        Pass a DPI from ``fit_dpi`` to respect ``max_page_pixels``. ``timeout``
+        defaults to the limit for a whole document.
+        """
+        if self.limits.max_document_pages and page_count > self.limits.max_document_pages:
+            self._count("rejected")
+            raise RenderLimitError(
+                f"{page_count} pages is over the {self.limits.max_document_pages}-page rendering limit"
+            )
+        return self._run(
+            _render_job,
+            pdf_bytes,
+            list(_page_runs(page_numbers, max(1, thread_count))),
+            dpi,
+            thread_count,
+            self.limits.timeout_seconds if timeout is None else timeout,
+            timeout=timeout,
+        )
+
+    def render_pages(self, pdf_bytes, page_numbers, dpi, thread_count, page_count, cache=None):
+        """Yield pages in order, taking cached pages from ``cache`` and rendering the rest.
+
+        Uncached pages are rendered ``thread_count`` at a time, so no more than
+        that are held at once, and the chunks share the document's time limit.
+        Pages are rendered, and cached, at the DPI ``fit_dpi`` allows, so a
+        lowered DPI is never stored under the requested one.
+        """
+        dpi = self.fit_dpi(pdf_bytes, page_numbers, dpi)
+        chunk_size = max(1, thread_count)
+        remaining = self.limits.timeout_seconds
+        counted = False
+        pending = []
+
+        def flush():
+            nonlocal remaining, counted
+            if remaining <= 0:
+                raise self._timed_out()
+            # Includes time queued for a worker, which is part of what the caller waits for
+            with span("rasterize", pages=len(pending), dpi=dpi, pool=True):
+                rendered, seconds = self.render(pdf_bytes, pending, dpi, thread_count, page_count, timeout=remaining)
+            remaining -= seconds
+            _record_render_time(seconds, len(pending))
+            if not counted:
+                self._count("documents")
+                counted = True
+            for page, image in zip(pending, rendered):
+                if cache is not None:
+                    cache.put(make_cache_key(pdf_bytes, mode="image", dpi=dpi, page=page), image)
+            return rendered
+
+        for page in page_numbers:
+            cached = cache.get(make_cache_key(pdf_bytes, mode="image", dpi=dpi, page=page)) \
+                if cache is not None else None
+            if cached is None:
+                pending.append(page)
+                if len(pending) < chunk_size:
+                    continue
+            # Flush uncached pages first so output stays in page order
+            if pending:
+                yield from flush()
+                pending = []
+            if cached is not None:
+                yield cached
+        if pending:
+            yield from flush()
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.max_workers, **self._counts}
+
+    def shutdown(self):
+        """Wait for running renders, then stop the workers"""
+        for _ in range(max(1, self.max_workers)):
+            self._slots.acquire()
+        try:
+            with self._lock:
+                workers, self._idle = self._idle, []
+            for worker in workers:
+                worker.close()
+        finally:
+            for _ in range(max(1, self.max_workers)):
+                self._slots.release()
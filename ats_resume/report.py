@@ -0,0 +1,138 @@
+"""Combined report: several analyses from a single model call.
+
+The four analyses send the same resume pages and job description, so separate
+calls pay for that input once per analysis. A report sends it once with a
+composite prompt and splits the reply into one section per analysis. Any
+section missing from the reply is fetched with its own call, so callers
+always get every analysis they asked for.
+"""
+import re
+
+from .client import DEFAULT_GENERATION_CONFIG, generate_analysis
+from .errors import StructuredOutputError
+from .prompts import prompts, report_prompt, structured_prompts, structured_report_prompt
+from .structured import (
+    STRUCTURED_MAX_OUTPUT_TOKENS,
+    generate_structured_analysis,
+    load_json_reply,
+    response_schema,
+    result_from_data,
+)
+
+# "separate" runs one call per analysis, "combined" one report call for all of them
+ANALYSIS_CALL_MODES = ("separate", "combined")
+DEFAULT_ANALYSIS_CALL_MODE = "separate"
+# Largest output budget for a report; Gemini 2.0 Flash stops at 8192
+REPORT_MAX_OUTPUT_TOKENS = 8192
+
+# A marker line, tolerating markdown emphasis or heading marks around it
+_MARKER = re.compile(r"^[ \t#*_]*<<<(\w+)>>>[ \t*_:]*$", re.MULTILINE)
+
+
+def section_marker(prompt_key):
+    return f"<<<{prompt_key}>>>"
+
+
+def build_report_prompt(prompt_keys=None, structured=False):
+    """Composite prompt covering ``prompt_keys`` (all analyses by default)"""
+    prompt_keys = list(prompt_keys or prompts)
+    if structured:
+        return structured_report_prompt + "".join(
+            f"\n    Task {key}:{structured_prompts[key]}" for key in prompt_keys
+        )
+    return report_prompt + "".join(f"\n{section_marker(key)}\n{prompts[key]}" for key in prompt_keys)
+
+
+def report_schema(prompt_keys=None):
+    """Response schema with one analysis schema per top-level field"""
+    prompt_keys = list(prompt_keys or prompts)
+    return {
+        "type": "object",
+        "properties": {key: response_schema(key) for key in prompt_keys},
+        "required": prompt_keys,
+    }
+
+
+def report_generation_config(prompt_keys=None, structured=False, generation_config=None):
+    """``generation_config`` with an output budget scaled to the number of sections"""
+    prompt_keys = list(prompt_keys or prompts)
+    config = dict(generation_config or DEFAULT_GENERATION_CONFIG)
+    per_section = config.get("max_output_tokens", REPORT_MAX_OUTPUT_TOKENS // len(prompt_keys))
+    if structured:
+        per_section = min(per_section, STRUCTURED_MAX_OUTPUT_TOKENS)
+        config["response_mime_type"] = "application/json"
+        config["response_schema"] = report_schema(prompt_keys)
+    config["max_output_tokens"] = min(REPORT_MAX_OUTPUT_TOKENS, per_section * len(prompt_keys))
+    return config
+
+
+def split_report(text, prompt_keys=None):
+    """Map each analysis to its section of a free-form report; absent sections are left out"""
+    prompt_keys = set(prompt_keys or prompts)
+    sections = {}
+    matches = list(_MARKER.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        key = match.group(1)
+        if key not in prompt_keys or key in sections:
+            continue
+        body = text[match.end():following.start() if following is not None else len(text)].strip()
+        if body:
+            sections[key] = body
+    return sections
+
+
+def parse_report(text, prompt_keys=None):
+    """Map each analysis to its ``AnalysisResult`` from a structured report; invalid sections are left out"""
+    data = load_json_reply(text)
+    results = {}
+    for key in prompt_keys or prompts:
+        try:
+            results[key] = result_from_data(key, data.get(key))
+        except StructuredOutputError:
+            continue
+    return results
+
+
+def generate_report(pdf_content, job_description, prompt_keys=None, structured=False,
+                    generation_config=None, on_fallback=None, **kwargs):
+    """Run ``prompt_keys`` (all analyses by default) in one call and return {prompt_key: response}.
+
+    Responses are text, or ``AnalysisResult`` objects when ``structured``.
+    Sections missing from the reply are fetched with separate calls, reporting
+    their keys to ``on_fallback``. Other arguments are passed to
+    ``generate_analysis``, so the report is cached like any other response;
+    a structured report is only cached if it is a JSON object.
+    """
+    prompt_keys = list(prompt_keys or prompts)
+    try:
+        text = generate_analysis(
+            build_report_prompt(prompt_keys, structured),
+            pdf_content,
+            job_description,
+            generation_config=report_generation_config(prompt_keys, structured, generation_config),
+            validate=load_json_reply if structured else None,
+            **kwargs,
+        )
+    except StructuredOutputError:
+        # Unreadable JSON is not cached; every section is fetched on its own
+        text = None
+    if text is None:
+        sections = {}
+    elif structured:
+        sections = parse_report(text, prompt_keys)
+    else:
+        sections = split_report(text, prompt_keys)
+
+    missing = [key for key in prompt_keys if key not in sections]
+    if missing and on_fallback is not None:
+        on_fallback(missing)
+    for key in missing:
+        if structured:
+            sections[key] = generate_structured_analysis(
+                key, pdf_content, job_description, generation_config=generation_config, **kwargs
+            )
+        else:
+            sections[key] = generate_analysis(
+                prompts[key], pdf_content, job_description, generation_config=generation_config, **kwargs
+            )
+    return {key: sections[key] for key in prompt_keys}
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .imaging import ImagePayload
+from .utils import is_image
+
+
+def normalize_prompt(prompt):
+    """Collapse indentation and whitespace so cosmetic prompt edits keep the same key"""
+    return " ".join(prompt.split())
+
+
+def content_digest(content):
+    """Stable digest of resume or job description content (PIL images or text)"""
+    hasher = hashlib.sha256()
+    if isinstance(content, (list, tuple)):
+        for part in content:
+            hasher.update(content_digest(part).encode("utf-8"))
+    elif isinstance(content, ImagePayload):
+        hasher.update(content.mime_type.encode("utf-8"))
+        hasher.update(content.data)
+    elif is_image(content):
+        hasher.update(f"{content.mode}:{content.width}x{content.height}".encode("utf-8"))
+        hasher.update(content.tobytes())
+    else:
+        hasher.update(str(content).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def make_response_key(prompt, model_name, generation_config, resume_digest, jd_digest):
+    """Build the cache key for a model response"""
+    payload = json.dumps(
+        {
+            "prompt": normalize_prompt(prompt),
+            "model": model_name,
+            "generation_config": generation_config,
+            "resume": resume_digest,
+            "job_description": jd_digest,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Interface for response caches. Subclasses implement ``_get`` and ``_set``."""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._set(key, value)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _expired(self, created_at):
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value):
+        raise NotImplementedError
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU cache with optional TTL"""
+
+    def __init__(self, max_entries=512, ttl=None):
+        super().__init__(ttl=ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created_at = entry
+            if self._expired(created_at):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SqliteResponseCache(ResponseCache):
+    """Persistent cache backed by a SQLite file, shared between processes"""
+
+    def __init__(self, path, max_entries=10000, ttl=None):
+        super().__init__(ttl=ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+
+    def _get(self, key):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._expired(created_at):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            return value
+
+    def _set(self, key, value):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            # Evict least recently used rows beyond the size bound
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+class TieredResponseCache(ResponseCache):
+    """Memory tier in front of an optional persistent tier"""
+
+    def __init__(self, memory, persistent=None):
+        super().__init__()
+        self.memory = memory
+        self.persistent = persistent
+
+    def _get(self, key):
+        value = self.memory.get(key)
+        if value is None and self.persistent is not None:
+            value = self.persistent.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def _set(self, key, value):
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            self.persistent.set(key, value)
+
+    def stats(self):
+        stats = super().stats()
+        stats["memory"] = self.memory.stats()
+        if self.persistent is not None:
+            stats["persistent"] = self.persistent.stats()
+        return stats
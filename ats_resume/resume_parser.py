@@ -0,0 +1,486 @@
+"""Section-aware resume parser: contact, summary, experience, education and skills.
+
+Every analysis otherwise sends the raw text or page images and leaves the
+model to rediscover the sections, dates and skills. ``parse_resume`` splits
+the extracted text into sections once (a heading is a line that is exactly
+a known section name, so body lines mentioning "tools" stay body text),
+pulls out date ranges and the months they cover, and returns a compact
+``ParsedResume``. It is cached by document hash, serializes to plain dicts
+(``as_dict``/``from_dict``) and renders a short text form (``to_text``) that
+is far cheaper to send than the pages. The records use ``__slots__``, since batch runs hold one per resume.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+
+CONTACT = "contact"
+SUMMARY = "summary"
+EXPERIENCE = "experience"
+EDUCATION = "education"
+SKILLS = "skills"
+OTHER = "other"
+
+# Section names by kind. A heading is a line holding one of these names and nothing else,
+# optionally followed by a colon; ordinary lines that merely mention "tools" or "experience" are body text.
+SECTION_NAMES = (
+    (CONTACT, re.compile(r"contact( information| details)?|personal (details|information)", re.IGNORECASE)),
+    (SUMMARY, re.compile(r"((professional|career|personal) )?(summary|profile)|(career )?objective|about me",
+                         re.IGNORECASE)),
+    (EXPERIENCE, re.compile(r"((professional|work|relevant|employment) )?experience|employment( history)?|"
+                            r"work history|career history", re.IGNORECASE)),
+    (EDUCATION, re.compile(r"education( (and|&) (training|certifications))?|academic background|qualifications",
+                           re.IGNORECASE)),
+    (SKILLS, re.compile(r"((technical|core|key|professional) )?(skills|competencies)|"
+                        r"skills (and|&) (tools|technologies|expertise)|technologies|tech stack", re.IGNORECASE)),
+    (OTHER, re.compile(r"((selected|personal|key) )?projects|certifications?( (and|&) licen[cs]es)?|licen[cs]es|"
+                       r"publications|presentations|patents|awards( (and|&) honou?rs)?|honou?rs|achievements|"
+                       r"interests|hobbies|volunteer(ing| work| experience)?|references|activities|"
+                       r"training|courses|memberships", re.IGNORECASE)),
+)
+_HEADING_LINE = re.compile(r"^\s*#*\s*(?P<name>[A-Za-z][A-Za-z&/ ]{1,40}?)\s*(?::\s*(?P<rest>.*))?$")
+
+_MONTHS = {
+    name: number
+    for number, names in enumerate(
+        (("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",), ("jun", "june"),
+         ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"), ("oct", "october"),
+         ("nov", "november"), ("dec", "december")),
+        start=1,
+    )
+    for name in names
+}
+_DATE = (
+    r"(?:(?P<{0}month>" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\.?\s+(?P<{0}year>(?:19|20)\d\d)"
+    r"|(?P<{0}numeric_month>0?[1-9]|1[0-2])[/.](?P<{0}numeric_year>(?:19|20)\d\d)"
+    r"|(?P<{0}iso_year>(?:19|20)\d\d)-(?P<{0}iso_month>0[1-9]|1[0-2])"
+    r"|(?P<{0}bare_year>(?:19|20)\d\d))"
+)
+DATE_RANGE = re.compile(
+    r"\b" + _DATE.format("start_") + r"\s*(?:-|–|—|to|until)\s*"
+    r"(?:(?P<current>present|current|now|today|ongoing)\b|" + _DATE.format("end_") + r")",
+    re.IGNORECASE,
+)
+_YEAR = re.compile(r"\b(?:19|20)\d\d\b")
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE = re.compile(r"(?<![\w/])\+?\d[\d ().-]{7,}\d(?![\w/])")
+# Fewer digits than this is a date or a year range, not a phone number
+MIN_PHONE_DIGITS = 9
+LINK = re.compile(r"\b(?:https?://)?(?:www\.)?(?:linkedin\.com|github\.com|gitlab\.com)/[\w\-./]+|https?://\S+",
+                  re.IGNORECASE)
+DEGREES = (
+    (re.compile(r"\b(ph\.?\s?d|doctor(ate)? of)\b", re.IGNORECASE), "doctorate"),
+    (re.compile(r"\b(master('?s)?|m\.?sc?|m\.?eng|mba|m\.?a)\b", re.IGNORECASE), "master"),
+    (re.compile(r"\b(bachelor('?s)?|b\.?sc?|b\.?eng|b\.?tech|b\.?a)\b", re.IGNORECASE), "bachelor"),
+    (re.compile(r"\b(associate('?s)? degree|diploma|certificate)\b", re.IGNORECASE), "diploma"),
+)
+_BULLET = re.compile(r"^\s*(?:[-*•▪◦●‣∙·–—]|\d+[.)])\s*")
+_SKILL_SEPARATORS = re.compile(r"\s*(?:[,;|•·]|\s-\s)\s*")
+_LABEL = re.compile(r"^[^:]{1,30}:\s*")
+# Skill items longer than this are sentences, not skills
+MAX_SKILL_WORDS = 4
+CACHE_MAX_ENTRIES = 512
+
+
+class _Record:
+    """Pickling for the frozen, slotted records below, which have no ``__dict__`` to restore"""
+
+    __slots__ = ()
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+
+@dataclass(frozen=True)
+class Contact(_Record):
+    __slots__ = ("name", "email", "phone", "links")
+
+    name: str
+    email: str
+    phone: str
+    links: tuple
+
+    def as_dict(self):
+        return {"name": self.name, "email": self.email, "phone": self.phone, "links": list(self.links)}
+
+
+@dataclass(frozen=True)
+class Position(_Record):
+    """One experience entry. Dates are ``YYYY-MM``; ``end`` is None while ``current``."""
+
+    __slots__ = ("heading", "start", "end", "current", "months", "details")
+
+    heading: str
+    start: str
+    end: str
+    current: bool
+    months: int
+    details: tuple
+
+    def as_dict(self):
+        return {
+            "heading": self.heading,
+            "start": self.start,
+            "end": self.end,
+            "current": self.current,
+            "months": self.months,
+            "details": list(self.details),
+        }
+
+
+@dataclass(frozen=True)
+class Education(_Record):
+    """One education line with its degree level (``bachelor``, ``master``...) and year, when found"""
+
+    __slots__ = ("text", "degree", "year")
+
+    text: str
+    degree: str
+    year: int
+
+    def as_dict(self):
+        return {"text": self.text, "degree": self.degree, "year": self.year}
+
+
+@dataclass(frozen=True)
+class ParsedResume(_Record):
+    """Compact, serializable view of a resume. ``other`` holds ``(heading, text)`` for unrecognized sections."""
+
+    __slots__ = ("digest", "contact", "summary", "experience", "education", "skills", "other", "experience_months")
+
+    digest: str
+    contact: Contact
+    summary: str
+    experience: tuple
+    education: tuple
+    skills: tuple
+    other: tuple
+    experience_months: int
+
+    @property
+    def experience_years(self):
+        return round(self.experience_months / 12, 1)
+
+    @property
+    def has_sections(self):
+        """Whether any section beyond the opening was recognized"""
+        return bool(self.experience or self.education or self.skills or self.summary or self.other)
+
+    def as_dict(self):
+        return {
+            "digest": self.digest,
+            "contact": self.contact.as_dict(),
+            "summary": self.summary,
+            "experience": [position.as_dict() for position in self.experience],
+            "education": [entry.as_dict() for entry in self.education],
+            "skills": list(self.skills),
+            "other": [list(section) for section in self.other],
+            "experience_months": self.experience_months,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        contact = data["contact"]
+        return cls(
+            digest=data["digest"],
+            contact=Contact(contact["name"], contact["email"], contact["phone"], tuple(contact["links"])),
+            summary=data["summary"],
+            experience=tuple(
+                Position(**{**position, "details": tuple(position["details"])}) for position in data["experience"]
+            ),
+            education=tuple(Education(**entry) for entry in data["education"]),
+            skills=tuple(data["skills"]),
+            other=tuple(tuple(section) for section in data["other"]),
+            experience_months=data["experience_months"],
+        )
+
+    def to_text(self):
+        """The resume as short labelled sections, for prompts in place of the full text or pages"""
+        lines = []
+        if self.contact.name:
+            lines.append(f"Name: {self.contact.name}")
+        if self.summary:
+            lines.extend(["", "SUMMARY", self.summary])
+        if self.experience:
+            lines.extend(["", f"EXPERIENCE (about {self.experience_years:g} years in total)"])
+            for position in self.experience:
+                end = "present" if position.current else position.end
+                lines.append(f"{position.heading} | {position.start} to {end} ({position.months} months)")
+                lines.extend(f"- {detail}" for detail in position.details)
+        if self.education:
+            lines.extend(["", "EDUCATION"])
+            lines.extend(f"- {entry.text}" for entry in self.education)
+        if self.skills:
+            lines.extend(["", "SKILLS", ", ".join(self.skills)])
+        for heading, text in self.other:
+            lines.extend(["", heading.upper(), text])
+        return "\n".join(lines).strip()
+
+
+def section_heading(line):
+    """``(heading, kind, rest)`` if ``line`` is a known section name, optionally followed by ``:`` and text.
+
+    ``rest`` is the text after the colon, which belongs to the section's body.
+    """
+    match = _HEADING_LINE.match(line)
+    if match is None:
+        return None
+    name = " ".join(match.group("name").split())
+    for kind, pattern in SECTION_NAMES:
+        if pattern.fullmatch(name):
+            return name, kind, (match.group("rest") or "").strip()
+    return None
+
+
+def split_resume_sections(text):
+    """``[(heading, kind, body)]`` in document order; the opening has heading None and kind ``CONTACT``"""
+    sections = [(None, CONTACT, [])]
+    for line in text.split("\n"):
+        found = section_heading(line)
+        if found is not None:
+            heading, kind, rest = found
+            sections.append((heading, kind, [rest] if rest else []))
+        else:
+            sections[-1][2].append(line)
+    return [(heading, kind, "\n".join(lines).strip()) for heading, kind, lines in sections if "".join(lines).strip()]
+
+
+def _month_index(match, prefix, end):
+    """Months since year 0 for the date in ``match``; a bare year means its first or last month"""
+    groups = match.groupdict()
+    if groups[f"{prefix}month"]:
+        return int(groups[f"{prefix}year"]) * 12 + _MONTHS[groups[f"{prefix}month"].lower()] - 1
+    if groups[f"{prefix}numeric_month"]:
+        return int(groups[f"{prefix}numeric_year"]) * 12 + int(groups[f"{prefix}numeric_month"]) - 1
+    if groups[f"{prefix}iso_year"]:
+        return int(groups[f"{prefix}iso_year"]) * 12 + int(groups[f"{prefix}iso_month"]) - 1
+    return int(groups[f"{prefix}bare_year"]) * 12 + (11 if end else 0)
+
+
+def _format_month(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def find_date_range(text, today=None):
+    """``(start, end, current, match)`` for the first date range in ``text`` as month indexes, or None"""
+    match = DATE_RANGE.search(text)
+    if match is None:
+        return None
+    start = _month_index(match, "start_", end=False)
+    if match.group("current"):
+        today = today or date.today()
+        return start, today.year * 12 + today.month - 1, True, match
+    return start, _month_index(match, "end_", end=True), False, match
+
+
+def _strip_bullet(line):
+    return _BULLET.sub("", line).strip()
+
+
+def _is_bullet(line):
+    return bool(_BULLET.match(line))
+
+
+def parse_experience(text, today=None):
+    """``(positions, spans, preamble)`` for an experience section body.
+
+    A line with a date range starts a ``Position``; ``spans`` are their
+    ``(start, end)`` month indexes and ``preamble`` the lines before the first one.
+    """
+    positions = []
+    preamble = []
+    previous = None
+    current = None
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        found = None if _is_bullet(line) else find_date_range(stripped, today)
+        if found is not None:
+            start, end, is_current, match = found
+            heading = (stripped[:match.start()] + stripped[match.end():]).strip(" |,()-–—@\t")
+            if not heading and previous is not None:
+                # Dates on a line of their own: the title is on the line above
+                heading = previous
+                lines_above = current["details"] if current is not None else preamble
+                if lines_above and _strip_bullet(lines_above[-1]) == previous:
+                    lines_above.pop()
+            current = {
+                "heading": heading,
+                "start": _format_month(start),
+                "end": None if is_current else _format_month(end),
+                "current": is_current,
+                "months": max(1, end - start + 1),
+                "details": [],
+                "span": (start, end),
+            }
+            positions.append(current)
+        elif current is not None:
+            current["details"].append(_strip_bullet(stripped))
+        else:
+            preamble.append(stripped)
+        previous = _strip_bullet(stripped)
+    records = tuple(
+        Position(p["heading"], p["start"], p["end"], p["current"], p["months"], tuple(p["details"]))
+        for p in positions
+    )
+    return records, [p["span"] for p in positions], tuple(preamble)
+
+
+def total_months(spans):
+    """Months covered by ``(start, end)`` month ranges, counting overlapping jobs once"""
+    total = 0
+    last_end = None
+    for start, end in sorted(spans):
+        if last_end is not None and start <= last_end:
+            if end > last_end:
+                total += end - last_end
+                last_end = end
+            continue
+        total += end - start + 1
+        last_end = end
+    return total
+
+
+def parse_education(text):
+    """``Education`` records from an education section body, one per degree or dated line"""
+    entries = []
+    for line in text.split("\n"):
+        stripped = _strip_bullet(line)
+        if not stripped:
+            continue
+        degree = next((level for pattern, level in DEGREES if pattern.search(stripped)), None)
+        years = _YEAR.findall(stripped)
+        if degree is None and not years and entries:
+            # A continuation line (institution, honours) of the entry above
+            previous = entries[-1]
+            entries[-1] = Education(f"{previous.text}, {stripped}", previous.degree, previous.year)
+            continue
+        entries.append(Education(stripped, degree, int(years[-1]) if years else None))
+    return tuple(entries)
+
+
+def parse_skills(text):
+    """``(skills, rest)`` for a skills section body.
+
+    Lines are split on commas, bullets and pipes, without category labels
+    such as "Tools:"; items too long to be a skill name are returned in ``rest``.
+    """
+    skills = OrderedDict()
+    rest = []
+    for line in text.split("\n"):
+        stripped = _LABEL.sub("", _strip_bullet(line))
+        for item in _SKILL_SEPARATORS.split(stripped):
+            item = item.strip(" .")
+            if not item:
+                continue
+            if len(item.split()) <= MAX_SKILL_WORDS:
+                skills.setdefault(item.lower(), item)
+            else:
+                rest.append(item)
+    return tuple(skills.values()), tuple(rest)
+
+
+def parse_contact(text):
+    email = EMAIL.search(text)
+    phone = next((match for match in PHONE.finditer(text)
+                  if sum(char.isdigit() for char in match.group(0)) >= MIN_PHONE_DIGITS), None)
+    links = tuple(dict.fromkeys(match.rstrip(".,;") for match in LINK.findall(text)))
+    name = None
+    for line in text.split("\n"):
+        stripped = line.strip()
+        # The name is the first short line that is not an address, number or link
+        if stripped and len(stripped.split()) <= 5 and not any(char.isdigit() for char in stripped) \
+                and "@" not in stripped and "/" not in stripped:
+            name = stripped
+            break
+    return Contact(name, email.group(0) if email else None, phone.group(0).strip() if phone else None, links)
+
+
+def _parse(text, digest, today):
+    contact_text = []
+    summary = []
+    experience = []
+    spans = []
+    education = []
+    skills = []
+    other = []
+    for heading, kind, body in split_resume_sections(text):
+        if kind == CONTACT:
+            contact_text.append(body)
+        elif kind == SUMMARY:
+            summary.append(body)
+        elif kind == EDUCATION:
+            education.extend(parse_education(body))
+        elif kind == EXPERIENCE:
+            positions, position_spans, preamble = parse_experience(body, today)
+            experience.extend(positions)
+            spans.extend(position_spans)
+            # Lines the parser can't place in an entry are kept as text, so the compact form loses nothing
+            if preamble:
+                other.append((heading, "\n".join(preamble)))
+        elif kind == SKILLS:
+            names, rest = parse_skills(body)
+            skills.extend(names)
+            if rest:
+                other.append((heading, "\n".join(rest)))
+        else:
+            other.append((heading, body))
+    return ParsedResume(
+        digest=digest,
+        contact=parse_contact("\n".join(contact_text)),
+        summary="\n".join(summary),
+        experience=tuple(experience),
+        education=tuple(education),
+        skills=tuple(OrderedDict((skill.lower(), skill) for skill in skills).values()),
+        other=tuple(other),
+        experience_months=total_months(spans),
+    )
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def parse_resume(text, digest=None, today=None):
+    """``ParsedResume`` for resume ``text``, cached by ``digest`` (default: the hash of the text).
+
+    ``today`` (a ``date``) ends ranges that run to the present; it defaults to
+    the current date and is part of the cache key.
+    """
+    today = today or date.today()
+    digest = digest or hashlib.sha256(text.encode("utf-8")).hexdigest()
+    key = (digest, today.year, today.month)
+    with _cache_lock:
+        parsed = _cache.get(key)
+        if parsed is not None:
+            _cache.move_to_end(key)
+            return parsed
+    parsed = _parse(text, digest, today)
+    with _cache_lock:
+        _cache[key] = parsed
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return parsed
+
+
+def content_text(pdf_content):
+    """The text part of prepared resume content, or None when it is page images alone"""
+    if isinstance(pdf_content, str):
+        return pdf_content
+    if isinstance(pdf_content, (list, tuple)) and pdf_content and isinstance(pdf_content[0], str):
+        return pdf_content[0]
+    return None
+
+
+def compact_content(pdf_content, parsed):
+    """``parsed.to_text()`` in place of prepared content that has a text layer; page images alone are kept"""
+    if content_text(pdf_content) is None or not parsed.has_sections:
+        return pdf_content
+    return parsed.to_text()
@@ -0,0 +1,372 @@
+"""CPU-only embedding index for shortlisting resumes that paraphrase a job description.
+
+``HashingEmbedder`` turns text into fixed-size vectors by feature hashing
+normalized terms and character n-grams, so related spellings and word forms
+land near each other without a model download. ``SentenceTransformerEmbedder``
+uses a small local sentence-transformers model instead when that package is
+installed. ``SemanticIndex`` keeps one vector per resume in a flat float32
+file that is memory-mapped on open and searched with batched matrix products.
+It has the same interface as ``ResumeIndex`` so either can shortlist resumes.
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import zlib
+from collections import Counter
+
+from .errors import AtsResumeError
+from .index import DEFAULT_TOP_K, SearchHit
+from .keywords import iter_terms
+
+DEFAULT_DIMENSIONS = 512
+DEFAULT_EMBEDDER = "hashing"
+# Rows of the matrix scored per block, to bound the size of the score matrix
+SEARCH_BLOCK_ROWS = 32768
+# Rewrite the vector file once this share of rows belongs to removed resumes
+COMPACT_DELETED_FRACTION = 0.25
+
+_MANIFEST = "manifest.json"
+_VECTORS = "vectors.f32"
+_DF = "df.npy"
+
+
+class HashingEmbedder:
+    """Signed feature hashing of terms and character n-grams with sublinear term frequency.
+
+    Terms come from the keyword tokenizer (synonyms mapped, stopwords
+    dropped); the character n-grams of each term give partial credit to
+    related forms such as "analytics" and "analysis".
+    """
+
+    uses_idf = True
+
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS, ngram=4, ngram_weight=0.5):
+        self.dimensions = dimensions
+        self.ngram = ngram
+        self.ngram_weight = ngram_weight
+        self.name = f"hashing-{dimensions}-{ngram}"
+        self._slots = {}
+
+    def _term_slots(self, term):
+        """Hashed (column, signed weight) pairs for a term and its character n-grams, cached per term"""
+        slots = self._slots.get(term)
+        if slots is None:
+            padded = f" {term} "
+            features = [(term, 1.0)] + [
+                ("#" + padded[start:start + self.ngram], self.ngram_weight)
+                for start in range(len(padded) - self.ngram + 1)
+            ]
+            slots = []
+            for feature, weight in features:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                # The low bit picks the sign so colliding features tend to cancel rather than pile up
+                slots.append(((digest >> 1) % self.dimensions, weight if digest & 1 else -weight))
+            if len(self._slots) < 200_000:
+                self._slots[term] = slots
+        return slots
+
+    def embed_many(self, texts):
+        """L2-normalized float32 vectors, one row per text"""
+        import numpy as np
+
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            columns, values = [], []
+            for term, count in Counter(term for term, _ in iter_terms(text)).items():
+                scale = 1.0 + math.log(count)
+                for column, weight in self._term_slots(term):
+                    columns.append(column)
+                    values.append(weight * scale)
+            np.add.at(vectors[row], columns, values)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings from a local sentence-transformers model (imported on first use)"""
+
+    uses_idf = False
+
+    def __init__(self, model_name="all-MiniLM-L6-v2"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise AtsResumeError("sentence-transformers is not installed; use the hashing embedder") from e
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def embed_many(self, texts):
+        import numpy as np
+
+        return np.asarray(self._model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+
+
+def get_embedder(spec=DEFAULT_EMBEDDER):
+    """Build an embedder from ``hashing``, ``hashing:<dimensions>`` or ``st:<model name>``"""
+    kind, _, argument = spec.partition(":")
+    if kind == "hashing":
+        return HashingEmbedder(int(argument) if argument else DEFAULT_DIMENSIONS)
+    if kind == "st":
+        return SentenceTransformerEmbedder(argument or "all-MiniLM-L6-v2")
+    raise AtsResumeError(f"Unknown embedder {spec!r}")
+
+
+def _atomic_write_text(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def top_k(scores, k):
+    """Row-wise indices of the ``k`` largest scores, best first"""
+    import numpy as np
+
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class SemanticIndex:
+    """Persistent matrix of resume embeddings with batched top-K cosine search.
+
+    With a ``directory`` the vectors are kept in a flat float32 file (appended
+    on ``flush`` and memory-mapped when ``mmap`` is true); without one the
+    index lives in memory only. Removed resumes are zeroed and the file is
+    rewritten once enough rows are dead.
+    """
+
+    def __init__(self, directory=None, embedder=None, mmap=True):
+        self.directory = directory
+        self.embedder = embedder or HashingEmbedder()
+        self.mmap = mmap
+        self._lock = threading.RLock()
+        self._rows = []
+        self._names = {}
+        self._digests = {}
+        self._titles = {}
+        self._matrix = None
+        self._df = None
+        self._pending = []
+        self._removed_rows = []
+        self._dirty = False
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        import numpy as np
+
+        if not os.path.exists(self._path(_MANIFEST)):
+            return
+        with open(self._path(_MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["embedder"] != self.embedder.name:
+            raise AtsResumeError(
+                f"Index at {self.directory} was built with {manifest['embedder']}, not {self.embedder.name}"
+            )
+        self._rows = [row[0] if row else None for row in manifest["rows"]]
+        self._digests = {row[0]: row[1] for row in manifest["rows"] if row}
+        self._titles = {row[0]: row[2] for row in manifest["rows"] if row and len(row) > 2 and row[2]}
+        self._names = {name: row for row, name in enumerate(self._rows) if name is not None}
+        if self._rows:
+            shape = (len(self._rows), self.embedder.dimensions)
+            if self.mmap:
+                self._matrix = np.memmap(self._path(_VECTORS), dtype=np.float32, mode="r", shape=shape)
+            else:
+                self._matrix = np.fromfile(self._path(_VECTORS), dtype=np.float32,
+                                           count=shape[0] * shape[1]).reshape(shape)
+        self._df = np.load(self._path(_DF)) if os.path.exists(self._path(_DF)) else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._names)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._names
+
+    def names(self):
+        with self._lock:
+            return sorted(self._names)
+
+    def digest(self, name):
+        with self._lock:
+            return self._digests.get(name) if name in self._names else None
+
+    def add(self, name, text, digest=None, title=None):
+        """Embed ``text`` under ``name``, replacing any earlier version; ``title`` is shown in search hits"""
+        with self._lock:
+            self.add_many([(name, text, digest)])
+            if title is not None:
+                self._titles[name] = title
+
+    def add_many(self, documents):
+        """Embed ``(name, text, digest)`` tuples in one batch"""
+        documents = list(documents)
+        vectors = self.embedder.embed_many([text for _, text, _ in documents])
+        with self._lock:
+            for (name, _, digest), vector in zip(documents, vectors):
+                self.remove(name)
+                self._names[name] = len(self._rows)
+                self._rows.append(name)
+                self._digests[name] = digest
+                self._pending.append(vector)
+            self._dirty = True
+
+    def remove(self, name):
+        """Drop ``name``; returns True if it was present"""
+        with self._lock:
+            row = self._names.pop(name, None)
+            if row is None:
+                return False
+            self._rows[row] = None
+            self._removed_rows.append(row)
+            self._digests.pop(name, None)
+            self._titles.pop(name, None)
+            self._dirty = True
+            return True
+
+    def _pending_matrix(self, first_row):
+        import numpy as np
+
+        matrix = np.vstack(self._pending).astype(np.float32)
+        # Rows added and removed again before the flush are stored as zeros
+        dead = [row - first_row for row in range(first_row, len(self._rows)) if self._rows[row] is None]
+        matrix[dead] = 0.0
+        return matrix
+
+    def _rewrite(self):
+        """Rebuild the whole matrix without removed rows"""
+        import numpy as np
+
+        parts = [np.array(self._matrix, dtype=np.float32)] if self._matrix is not None else []
+        if self._pending:
+            parts.append(self._pending_matrix(len(self._rows) - len(self._pending)))
+        matrix = np.vstack(parts) if parts else np.zeros((0, self.embedder.dimensions), dtype=np.float32)
+        keep = [row for row, name in enumerate(self._rows) if name is not None]
+        matrix = matrix[keep]
+        self._rows = [self._rows[row] for row in keep]
+        self._names = {name: row for row, name in enumerate(self._rows)}
+        self._df = (matrix != 0).sum(axis=0).astype(np.int64)
+        if self.directory:
+            self._matrix = None
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                matrix.tofile(f)
+            os.replace(tmp_path, self._path(_VECTORS))
+        return matrix
+
+    def _append(self):
+        """Zero removed rows in place and append new vectors to the end of the file"""
+        import numpy as np
+
+        persisted = len(self._rows) - len(self._pending)
+        removed = sorted(row for row in self._removed_rows if row < persisted)
+        if removed:
+            writable = np.memmap(self._path(_VECTORS), dtype=np.float32, mode="r+",
+                                 shape=(persisted, self.embedder.dimensions))
+            self._df -= (writable[removed] != 0).sum(axis=0)
+            writable[removed] = 0.0
+            writable.flush()
+            del writable
+        if self._pending:
+            pending = self._pending_matrix(persisted)
+            self._df += (pending != 0).sum(axis=0)
+            with open(self._path(_VECTORS), "r+b") as f:
+                # Drop rows a crashed flush may have appended without recording them
+                f.truncate(persisted * self.embedder.dimensions * 4)
+                f.seek(0, os.SEEK_END)
+                pending.tofile(f)
+
+    def flush(self):
+        """Make pending adds and removals durable and searchable"""
+        import numpy as np
+
+        with self._lock:
+            if not self._dirty:
+                return
+            dead = len(self._rows) - len(self._names)
+            if (not self.directory or self._matrix is None or self._df is None
+                    or dead / len(self._rows) > COMPACT_DELETED_FRACTION):
+                matrix = self._rewrite()
+            else:
+                self._matrix = None
+                self._append()
+                matrix = None
+            self._pending = []
+            self._removed_rows = []
+            self._dirty = False
+            if not self.directory:
+                self._matrix = matrix
+                return
+
+            with open(self._path(_DF) + ".tmp", "wb") as f:
+                np.save(f, self._df)
+            os.replace(self._path(_DF) + ".tmp", self._path(_DF))
+            _atomic_write_text(self._path(_MANIFEST), json.dumps({
+                "embedder": self.embedder.name,
+                "rows": [[name, self._digests.get(name), self._titles.get(name)] if name is not None else None
+                         for name in self._rows],
+            }))
+            shape = (len(self._rows), self.embedder.dimensions)
+            if not self._rows:
+                self._matrix = None
+            elif self.mmap:
+                self._matrix = np.memmap(self._path(_VECTORS), dtype=np.float32, mode="r", shape=shape)
+            else:
+                self._matrix = np.fromfile(self._path(_VECTORS), dtype=np.float32,
+                                           count=shape[0] * shape[1]).reshape(shape)
+
+    def _query_vectors(self, job_descriptions):
+        import numpy as np
+
+        queries = self.embedder.embed_many(job_descriptions)
+        if self.embedder.uses_idf and self._df is not None and len(self._names):
+            # Down-weight features that most resumes share, such as generic job-ad wording
+            idf = np.log((1 + len(self._rows)) / (1 + self._df)).astype(np.float32) + 1.0
+            queries *= idf
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            np.divide(queries, norms, out=queries, where=norms > 0)
+        return queries
+
+    def search_many(self, job_descriptions, k=DEFAULT_TOP_K):
+        """Top ``k`` resumes for each job description by cosine similarity, best first"""
+        import numpy as np
+
+        with self._lock:
+            self.flush()
+            if not self._names:
+                return [[] for _ in job_descriptions]
+            queries = self._query_vectors(list(job_descriptions))
+            best_rows, best_scores = [], []
+            for start in range(0, len(self._rows), SEARCH_BLOCK_ROWS):
+                block = np.asarray(self._matrix[start:start + SEARCH_BLOCK_ROWS])
+                scores = queries @ block.T
+                rows = top_k(scores, k)
+                best_rows.append(rows + start)
+                best_scores.append(np.take_along_axis(scores, rows, axis=1))
+            rows = np.hstack(best_rows)
+            scores = np.hstack(best_scores)
+            order = top_k(scores, k)
+            results = []
+            for query_rows, query_scores in zip(np.take_along_axis(rows, order, axis=1),
+                                                np.take_along_axis(scores, order, axis=1)):
+                results.append([
+                    SearchHit(self._rows[row], round(float(score), 4), int(row), self._titles.get(self._rows[row]))
+                    for row, score in zip(query_rows.tolist(), query_scores.tolist())
+                    if self._rows[row] is not None and score > 0
+                ])
+            return results
+
+    def search(self, job_description, k=DEFAULT_TOP_K):
+        return self.search_many([job_description], k)[0]
@@ -0,0 +1,226 @@
+"""Structured analyses: Gemini JSON response schemas and typed, validated results.
+
+In structured mode each analysis asks the model for JSON matching a response
+schema instead of markdown, and ``parse_analysis`` turns the reply into an
+``AnalysisResult``. Results are plain frozen values, so they can be cached,
+aggregated across many resumes and compared without calling the model again.
+"""
+import json
+import statistics
+from collections import Counter
+from dataclasses import asdict, dataclass
+from functools import lru_cache, partial
+
+from .client import DEFAULT_GENERATION_CONFIG, generate_analysis
+from .errors import StructuredOutputError
+from .prompts import structured_prompts
+
+# Items per list; keeps replies short and bounds output tokens
+MAX_ITEMS = 12
+STRUCTURED_MAX_OUTPUT_TOKENS = 1024
+
+LIST_FIELDS = (
+    "strengths", "weaknesses", "keywords_found", "keywords_missing",
+    "skills_found", "skills_required", "gaps", "recommendations",
+)
+FIELD_DESCRIPTIONS = {
+    "score": "Match between resume and job description, 0 to 100",
+    "summary": "One-sentence conclusion",
+    "strengths": "Strengths relative to the job requirements",
+    "weaknesses": "Weaknesses relative to the job requirements",
+    "keywords_found": "Job description keywords present in the resume",
+    "keywords_missing": "Important job description keywords absent from the resume",
+    "skills_found": "Skills mentioned in the resume",
+    "skills_required": "Skills required by the job description",
+    "gaps": "Required skills the candidate lacks",
+    "recommendations": "Specific, actionable suggestions",
+}
+# Fields each analysis returns, in the order the model should write them
+ANALYSIS_FIELDS = {
+    "resume_review": ("score", "summary", "strengths", "weaknesses", "recommendations"),
+    "skill_gap": ("skills_found", "skills_required", "gaps", "recommendations"),
+    "improvement": ("keywords_missing", "recommendations"),
+    "ats_score": ("score", "keywords_found", "keywords_missing", "recommendations", "summary"),
+}
+
+_MARKDOWN_LABELS = {
+    "strengths": "Strengths",
+    "weaknesses": "Weaknesses",
+    "keywords_found": "Keywords Found",
+    "keywords_missing": "Keywords Missing",
+    "skills_found": "Skills Found in Resume",
+    "skills_required": "Skills Required by Job Description",
+    "gaps": "Skill Gaps",
+    "recommendations": "Recommendations",
+}
+
+
+@dataclass(frozen=True)
+class AnalysisResult:
+    """Validated structured reply for one analysis; fields it does not use stay empty"""
+
+    analysis: str
+    score: int = None
+    summary: str = ""
+    strengths: tuple = ()
+    weaknesses: tuple = ()
+    keywords_found: tuple = ()
+    keywords_missing: tuple = ()
+    skills_found: tuple = ()
+    skills_required: tuple = ()
+    gaps: tuple = ()
+    recommendations: tuple = ()
+
+    def as_dict(self):
+        """Only the fields this analysis returns, lists as lists"""
+        result = asdict(self)
+        return {"analysis": self.analysis, **{
+            field: list(result[field]) if field in LIST_FIELDS else result[field]
+            for field in ANALYSIS_FIELDS[self.analysis]
+        }}
+
+    def to_markdown(self):
+        lines = []
+        if self.score is not None:
+            lines.append(f"**Match Score: {self.score}%**")
+        if self.summary:
+            lines.append(self.summary)
+        for field in ANALYSIS_FIELDS[self.analysis]:
+            if field not in LIST_FIELDS:
+                continue
+            items = getattr(self, field)
+            if not items:
+                body = "none"
+            elif field.startswith(("keywords", "skills")):
+                body = ", ".join(items)
+            else:
+                body = "".join(f"\n- {item}" for item in items)
+            lines.append(f"**{_MARKDOWN_LABELS[field]}:** {body}")
+        return "\n\n".join(lines)
+
+
+def response_schema(prompt_key):
+    """Gemini response schema (OpenAPI subset) for one analysis"""
+    properties = {}
+    for field in ANALYSIS_FIELDS[prompt_key]:
+        if field == "score":
+            properties[field] = {"type": "integer", "description": FIELD_DESCRIPTIONS[field]}
+        elif field == "summary":
+            properties[field] = {"type": "string", "description": FIELD_DESCRIPTIONS[field]}
+        else:
+            properties[field] = {
+                "type": "array",
+                "items": {"type": "string"},
+                "max_items": MAX_ITEMS,
+                "description": FIELD_DESCRIPTIONS[field],
+            }
+    return {"type": "object", "properties": properties, "required": list(ANALYSIS_FIELDS[prompt_key])}
+
+
+def structured_generation_config(prompt_key, generation_config=None):
+    """``generation_config`` with JSON output constrained to the analysis' schema"""
+    config = dict(generation_config or DEFAULT_GENERATION_CONFIG)
+    config["max_output_tokens"] = min(config.get("max_output_tokens", STRUCTURED_MAX_OUTPUT_TOKENS),
+                                      STRUCTURED_MAX_OUTPUT_TOKENS)
+    config["response_mime_type"] = "application/json"
+    config["response_schema"] = response_schema(prompt_key)
+    return config
+
+
+def _string_list(field, value):
+    if not isinstance(value, list):
+        raise StructuredOutputError(f"{field}: expected a list, got {type(value).__name__}")
+    items = []
+    for item in value:
+        if not isinstance(item, str):
+            raise StructuredOutputError(f"{field}: expected strings, got {type(item).__name__}")
+        item = item.strip()
+        if item:
+            items.append(item)
+    return tuple(items)
+
+
+def load_json_reply(text):
+    """Decode a JSON object reply, raising ``StructuredOutputError`` if it is not one"""
+    text = text.strip()
+    if text.startswith("```"):
+        # Tolerate a fenced reply from models that ignore the MIME type
+        text = text.strip("`")
+        text = text[4:] if text.startswith("json") else text
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise StructuredOutputError(f"Reply is not valid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise StructuredOutputError(f"Expected a JSON object, got {type(data).__name__}")
+    return data
+
+
+def result_from_data(prompt_key, data):
+    """Validate a decoded reply against the analysis' schema and return an ``AnalysisResult``"""
+    if not isinstance(data, dict):
+        raise StructuredOutputError(f"{prompt_key}: expected a JSON object, got {type(data).__name__}")
+    values = {}
+    for field in ANALYSIS_FIELDS[prompt_key]:
+        if field not in data:
+            raise StructuredOutputError(f"Missing field {field!r}")
+        value = data[field]
+        if field == "score":
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+                raise StructuredOutputError(f"score: expected a number from 0 to 100, got {value!r}")
+            values[field] = round(value)
+        elif field == "summary":
+            if not isinstance(value, str):
+                raise StructuredOutputError(f"summary: expected a string, got {type(value).__name__}")
+            values[field] = value.strip()
+        else:
+            values[field] = _string_list(field, value)
+    return AnalysisResult(analysis=prompt_key, **values)
+
+
+@lru_cache(maxsize=1024)
+def parse_analysis(prompt_key, text):
+    """Validate a JSON reply against the analysis' schema and return an ``AnalysisResult``.
+
+    Raises ``StructuredOutputError`` if the reply is not JSON, a required field
+    is missing or a field has the wrong type. Results are cached by reply text.
+    """
+    if prompt_key not in ANALYSIS_FIELDS:
+        raise KeyError(prompt_key)
+    return result_from_data(prompt_key, load_json_reply(text))
+
+
+def generate_structured_analysis(prompt_key, pdf_content, job_description, generation_config=None, **kwargs):
+    """Run one analysis in structured mode and return its ``AnalysisResult``.
+
+    Other arguments are passed to ``generate_analysis``; with a response cache
+    the JSON reply is cached once it parses, so a repeat call only re-parses it.
+    Raises the errors of ``generate_analysis`` and ``StructuredOutputError``.
+    """
+    text = generate_analysis(
+        structured_prompts[prompt_key],
+        pdf_content,
+        job_description,
+        generation_config=structured_generation_config(prompt_key, generation_config),
+        validate=partial(parse_analysis, prompt_key),
+        **kwargs,
+    )
+    return parse_analysis(prompt_key, text)
+
+
+def aggregate_results(results):
+    """Summary over many results: score statistics and the most frequent missing keywords and gaps"""
+    scores = sorted(result.score for result in results if result.score is not None)
+    missing = Counter(keyword.lower() for result in results for keyword in result.keywords_missing)
+    gaps = Counter(gap.lower() for result in results for gap in result.gaps)
+    summary = {"results": len(results), "scored": len(scores)}
+    if scores:
+        summary.update({
+            "score_mean": round(sum(scores) / len(scores), 1),
+            "score_median": statistics.median(scores),
+            "score_min": scores[0],
+            "score_max": scores[-1],
+        })
+    summary["top_keywords_missing"] = missing.most_common(10)
+    summary["top_gaps"] = gaps.most_common(10)
+    return summary
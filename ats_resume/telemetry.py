@@ -0,0 +1,294 @@
+"""Per-stage latency spans and token counts, exported as Prometheus metrics and OpenTelemetry traces.
+
+Instrumented code wraps each stage in ``span("stage")``. Every span is
+observed in the process-wide ``Metrics`` registry, which renders the
+Prometheus text format for ``start_metrics_server`` or a metrics file. After
+``enable_tracing()`` spans are also sent as OpenTelemetry spans, and while a
+collector is set (``collect_spans``) they are recorded as ``SpanRecord``
+objects for the caller, e.g. the app's debug panel.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STAGE_SECONDS = "ats_stage_seconds"
+STAGE_ERRORS = "ats_stage_errors_total"
+FIRST_TOKEN_SECONDS = "ats_model_first_token_seconds"
+MODEL_TOKENS = "ats_model_tokens_total"
+
+# Latency buckets in seconds, from a cached page to a slow model call
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+_HELP = {
+    STAGE_SECONDS: ("histogram", "Time spent in each instrumented stage"),
+    STAGE_ERRORS: ("counter", "Stages that ended with an exception, by exception type"),
+    FIRST_TOKEN_SECONDS: ("histogram", "Time from request to the first streamed text"),
+    MODEL_TOKENS: ("counter", "Tokens reported in Gemini usage metadata"),
+}
+
+_collector = contextvars.ContextVar("ats_span_collector", default=None)
+_tracer = None
+
+
+@dataclass(frozen=True)
+class SpanRecord:
+    """One finished span: stage name, duration, attributes and the exception type if it failed"""
+
+    name: str
+    seconds: float
+    attributes: dict = field(default_factory=dict)
+    error: str = None
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "ms": round(self.seconds * 1000, 1),
+            **self.attributes,
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metrics:
+    """Thread-safe counters and histograms keyed by metric name and labels"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        # (name, labels) -> [bucket counts..., sum, count]
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def stage_summary(self):
+        """{stage: {"count", "mean_ms", "p50_ms", "p95_ms"}}, percentiles estimated from the buckets"""
+        with self._lock:
+            histograms = {dict(labels).get("stage"): list(values)
+                          for (name, labels), values in self._histograms.items() if name == STAGE_SECONDS}
+        summary = {}
+        for stage, values in sorted(histograms.items()):
+            count = values[-1]
+            summary[stage] = {
+                "count": count,
+                "mean_ms": round(values[-2] / count * 1000, 1),
+                "p50_ms": self._bucket_quantile(values, 0.5),
+                "p95_ms": self._bucket_quantile(values, 0.95),
+            }
+        return summary
+
+    def _bucket_quantile(self, values, fraction):
+        """Upper bound of the bucket holding the quantile, in ms; None when it is past the last bucket"""
+        target = fraction * values[-1]
+        for bound, cumulative in zip(self.buckets, values):
+            if cumulative >= target:
+                return bound * 1000
+        return None
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, list(values)) for key, values in self._histograms.items())
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name in described:
+                return
+            described.add(name)
+            kind, text = _HELP.get(name, ("untyped", name))
+            lines.extend([f"# HELP {name} {text}", f"# TYPE {name} {kind}"])
+
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), values in histograms:
+            describe(name)
+            for bound, cumulative in zip(self.buckets, values):
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {values[-1]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {values[-2]:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {values[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics to ``path`` atomically, e.g. for node_exporter's textfile collector"""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temporary, path)
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """The process-wide metrics registry"""
+    return _metrics
+
+
+def enable_tracing(service_name="ats-resume"):
+    """Send spans to OpenTelemetry; returns False if opentelemetry is not installed.
+
+    When the application has not configured a tracer provider and the SDK
+    and OTLP exporter are installed, one is set up here; the exporter reads
+    the standard OTEL_EXPORTER_OTLP_* environment variables.
+    """
+    global _tracer
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return False
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        if not isinstance(trace.get_tracer_provider(), TracerProvider):
+            provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            trace.set_tracer_provider(provider)
+    except ImportError:
+        # API only: spans go to whatever provider the application installed
+        pass
+    _tracer = trace.get_tracer("ats_resume")
+    return True
+
+
+def _finish(name, seconds, attributes, error):
+    _metrics.observe(STAGE_SECONDS, seconds, stage=name)
+    if error is not None:
+        _metrics.inc(STAGE_ERRORS, stage=name, error=error)
+    records = _collector.get()
+    if records is not None:
+        records.append(SpanRecord(name, seconds, dict(attributes), error))
+
+
+def _otel_attributes(attributes):
+    return {key: value for key, value in attributes.items() if isinstance(value, (str, bool, int, float))}
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time the block as stage ``name``; yields the attributes dict so the block can add to it"""
+    otel_span = _tracer.start_as_current_span(name) if _tracer is not None else None
+    current = otel_span.__enter__() if otel_span is not None else None
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _finish(name, time.perf_counter() - started, attributes, error)
+        if otel_span is not None:
+            current.set_attributes(_otel_attributes(attributes))
+            if error is not None:
+                from opentelemetry.trace import Status, StatusCode
+
+                current.set_status(Status(StatusCode.ERROR, error))
+            otel_span.__exit__(None, None, None)
+
+
+def record_span(name, seconds, error=None, **attributes):
+    """Record a stage timed elsewhere, such as a stream consumed across several yields"""
+    _finish(name, seconds, attributes, error)
+    if _tracer is not None:
+        end = time.time_ns()
+        otel_span = _tracer.start_span(name, start_time=end - int(seconds * 1e9),
+                                       attributes=_otel_attributes(attributes))
+        if error is not None:
+            from opentelemetry.trace import Status, StatusCode
+
+            otel_span.set_status(Status(StatusCode.ERROR, error))
+        otel_span.end(end_time=end)
+
+
+def record_usage(response, model_name):
+    """Count the tokens in ``response.usage_metadata`` and return them as span attributes"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return {}
+    counts = {
+        "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+        "output_tokens": getattr(usage, "candidates_token_count", 0) or 0,
+        "cached_tokens": getattr(usage, "cached_content_token_count", 0) or 0,
+    }
+    for kind, count in counts.items():
+        if count:
+            _metrics.inc(MODEL_TOKENS, count, model=model_name, kind=kind.replace("_tokens", ""))
+    return counts
+
+
+def set_span_collector(records):
+    """Append spans finished in this context (and copies of it) to ``records``; None stops collecting"""
+    return _collector.set(records)
+
+
+@contextmanager
+def collect_spans():
+    """Collect the spans finished inside the block into the yielded list"""
+    records = []
+    token = _collector.set(records)
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_metrics_server(port, host="0.0.0.0", metrics=None):
+    """Serve ``/metrics`` from a daemon thread and return the server"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics or _metrics
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
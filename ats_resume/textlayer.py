@@ -0,0 +1,118 @@
+"""Text layer quality scoring and text/image routing for resume PDFs"""
+import re
+import unicodedata
+from dataclasses import dataclass
+
+ROUTE_TEXT = "text"
+ROUTE_IMAGE = "image"
+ROUTE_BOTH = "both"
+
+# A born-digital resume page usually carries well over a thousand characters
+GOOD_CHARS_PER_PAGE = 300
+MIN_CHARS_PER_PAGE = 50
+GOOD_COVERAGE = 0.9
+MIN_COVERAGE = 0.6
+MAX_GARBAGE_RATIO = 0.01
+BAD_GARBAGE_RATIO = 0.1
+
+_CID_PATTERN = re.compile(r"\(cid:\d+\)")
+_COMMON_PUNCTUATION = set(".,;:!?'\"()[]{}-–—/\\&@#%+*=<>_|•·$€£~`^")
+
+
+@dataclass(frozen=True)
+class TextLayerReport:
+    """How usable a PDF's extracted text is.
+
+    ``coverage`` is the share of non-space characters that are letters, digits
+    or common punctuation. ``garbage_ratio`` is the share that are replacement,
+    control or private-use characters, or unmapped ``(cid:N)`` glyphs.
+    """
+
+    page_count: int
+    char_count: int
+    chars_per_page: float
+    coverage: float
+    garbage_ratio: float
+
+    @property
+    def score(self):
+        """0..1 summary of text layer quality"""
+        density = min(1.0, self.chars_per_page / GOOD_CHARS_PER_PAGE)
+        cleanliness = 1.0 - min(1.0, self.garbage_ratio / BAD_GARBAGE_RATIO)
+        return round(density * self.coverage * cleanliness, 3)
+
+
+@dataclass
+class RoutingDecision:
+    """Which content was sent to the model for one document, and why"""
+
+    route: str
+    reason: str
+    report: TextLayerReport = None
+    text_seconds: float = 0.0
+    render_seconds: float = 0.0
+    saved_seconds: float = 0.0
+
+    def as_dict(self):
+        data = {
+            "route": self.route,
+            "reason": self.reason,
+            "text_seconds": round(self.text_seconds, 4),
+            "render_seconds": round(self.render_seconds, 4),
+            "saved_seconds": round(self.saved_seconds, 4),
+        }
+        if self.report is not None:
+            data["text_layer"] = {
+                "score": self.report.score,
+                "chars_per_page": round(self.report.chars_per_page, 1),
+                "coverage": round(self.report.coverage, 3),
+                "garbage_ratio": round(self.report.garbage_ratio, 4),
+            }
+        return data
+
+
+def _is_garbage(char):
+    if char == "\ufffd":
+        return True
+    category = unicodedata.category(char)
+    # Control, private-use, unassigned and surrogate code points
+    return category in ("Cc", "Co", "Cn", "Cs")
+
+
+def assess_text_layer(text, page_count):
+    """Score extracted text for density, glyph coverage and garbage"""
+    page_count = max(1, page_count)
+    cid_count = len(_CID_PATTERN.findall(text))
+    text = _CID_PATTERN.sub("", text)
+
+    chars = [char for char in text if not char.isspace()]
+    char_count = len(chars)
+    if char_count == 0:
+        return TextLayerReport(page_count, 0, 0.0, 0.0, 1.0 if cid_count else 0.0)
+
+    covered = 0
+    garbage = cid_count
+    for char in chars:
+        if char.isalnum() or char in _COMMON_PUNCTUATION:
+            covered += 1
+        elif _is_garbage(char):
+            garbage += 1
+    return TextLayerReport(
+        page_count=page_count,
+        char_count=char_count,
+        chars_per_page=char_count / page_count,
+        coverage=covered / char_count,
+        garbage_ratio=garbage / (char_count + cid_count),
+    )
+
+
+def choose_route(report):
+    """Pick text-only, image-only or both for a text layer report, with a reason"""
+    if report.chars_per_page < MIN_CHARS_PER_PAGE:
+        return ROUTE_IMAGE, "no usable text layer (likely scanned)"
+    if report.garbage_ratio > BAD_GARBAGE_RATIO or report.coverage < MIN_COVERAGE:
+        return ROUTE_IMAGE, "text layer is mostly unreadable glyphs"
+    if (report.chars_per_page >= GOOD_CHARS_PER_PAGE and report.coverage >= GOOD_COVERAGE
+            and report.garbage_ratio <= MAX_GARBAGE_RATIO):
+        return ROUTE_TEXT, "clean text layer"
+    return ROUTE_BOTH, "text layer is sparse or partly garbled"
@@ -0,0 +1,7 @@
+import sys
+
+
+def is_image(value):
+    """True if ``value`` is a PIL image, without importing PIL when it isn't loaded"""
+    pil_image = sys.modules.get("PIL.Image")
+    return pil_image is not None and isinstance(value, pil_image.Image)
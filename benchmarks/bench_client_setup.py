@@ -0,0 +1,77 @@
+"""Measure per-call client setup cost against a local Gemini stub.
+
+Compares the old per-rerun pattern (``genai.configure`` plus a new
+``GenerativeModel`` for every call) with the shared ``ClientRegistry``.
+
+    python benchmarks/bench_client_setup.py --calls 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_resume import DEFAULT_GENERATION_CONFIG, DEFAULT_MODEL, ClientRegistry, configure  # noqa: E402
+from gemini_stub import GeminiStub  # noqa: E402
+
+PARTS = ["You are an ATS scanner.", "Job Description: Python developer\n\nResume Content:\nPython, SQL"]
+
+
+def _summary(setup_times, call_times):
+    return {
+        "setup_us_p50": round(statistics.median(setup_times) * 1e6, 1),
+        "call_ms_p50": round(statistics.median(call_times) * 1000, 2),
+        "call_ms_p95": round(sorted(call_times)[int(len(call_times) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def bench_per_call(stub, calls):
+    import google.generativeai as genai
+
+    setup_times, call_times = [], []
+    for _ in range(calls):
+        started = time.perf_counter()
+        genai.configure(api_key="stub-key", transport="rest", client_options={"api_endpoint": stub.endpoint})
+        model = genai.GenerativeModel(model_name=DEFAULT_MODEL, generation_config=DEFAULT_GENERATION_CONFIG)
+        setup_times.append(time.perf_counter() - started)
+        model.generate_content(PARTS)
+        call_times.append(time.perf_counter() - started)
+    return _summary(setup_times, call_times)
+
+
+def bench_registry(stub, calls):
+    configure("stub-key", transport="rest", api_endpoint=stub.endpoint)
+    registry = ClientRegistry()
+    setup_times, call_times = [], []
+    for _ in range(calls):
+        started = time.perf_counter()
+        model = registry.get_model(DEFAULT_MODEL, DEFAULT_GENERATION_CONFIG)
+        setup_times.append(time.perf_counter() - started)
+        with registry.connection():
+            model.generate_content(PARTS)
+        call_times.append(time.perf_counter() - started)
+    return _summary(setup_times, call_times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub latency per request in seconds")
+    args = parser.parse_args(argv)
+
+    with GeminiStub(latency=args.latency) as stub:
+        results = {
+            "per-call": bench_per_call(stub, args.calls),
+            "registry": bench_registry(stub, args.calls),
+        }
+
+    columns = ["setup_us_p50", "call_ms_p50", "call_ms_p95"]
+    print(f"{'client':<10}" + "".join(f"{column:>16}" for column in columns))
+    for label, row in results.items():
+        print(f"{label:<10}" + "".join(f"{row[column]:>16}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measure per-call latency and input tokens with and without Gemini context caching.
+
+Runs every analysis for each of several job descriptions against one resume,
+first sending the resume inline on every call, then uploading it once to the
+context cache. The stub charges ``--input-token-latency`` per prompt token
+not held in a cache, standing in for the model reading its input.
+
+    python benchmarks/bench_context_cache.py --resume-tokens 8000 --jds 4
+    python benchmarks/bench_context_cache.py --live --resume resume.pdf
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_resume import (  # noqa: E402
+    DEFAULT_MODEL,
+    ClientRegistry,
+    ContextCache,
+    configure,
+    generate_analysis,
+    prepare_pdf_content,
+    prompts,
+)
+from bench_resume_index import FILLER, JOB_DESCRIPTION  # noqa: E402
+from gemini_stub import GeminiStub  # noqa: E402
+
+
+def run(registry, model_name, pdf_content, job_descriptions, context_cache):
+    call_times = []
+    for job_description in job_descriptions:
+        for prompt in prompts.values():
+            started = time.perf_counter()
+            generate_analysis(
+                prompt, pdf_content, job_description,
+                model_name=model_name, registry=registry, context_cache=context_cache,
+            )
+            call_times.append(time.perf_counter() - started)
+    return call_times
+
+
+def sent_tokens(stub, first_request):
+    """Prompt tokens sent inline since ``first_request``, as the stub counts them"""
+    return sum(stub.estimate_prompt_tokens(request) for _, request in stub.requests[first_request:])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jds", type=int, default=3, help="Job descriptions per resume")
+    parser.add_argument("--resume-tokens", type=int, default=8000, help="Size of the synthetic text resume")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub latency per request in seconds")
+    parser.add_argument("--input-token-latency", type=float, default=0.00005,
+                        help="Stub processing time per uncached prompt token in seconds")
+    parser.add_argument("--live", action="store_true", help="Call Gemini with GOOGLE_API_KEY instead of the stub")
+    parser.add_argument("--resume", help="Resume PDF (default: synthetic text)")
+    parser.add_argument("--model", default=os.getenv("MODEL", DEFAULT_MODEL))
+    args = parser.parse_args(argv)
+
+    if args.resume:
+        with open(args.resume, "rb") as f:
+            pdf_content = prepare_pdf_content(f.read())
+    else:
+        # About four characters per token
+        words = FILLER * (args.resume_tokens // len(FILLER) + 1)
+        pdf_content = " ".join(words)[:args.resume_tokens * 4]
+    job_descriptions = [f"{JOB_DESCRIPTION}\nTeam {number}" for number in range(args.jds)]
+
+    stub = None
+    if args.live:
+        configure(os.getenv("GOOGLE_API_KEY"))
+    else:
+        stub = GeminiStub(latency=args.latency, input_token_latency=args.input_token_latency).start()
+        configure("stub-key", transport="rest", api_endpoint=stub.endpoint)
+
+    registry = ClientRegistry()
+    # The stub accepts caches of any size; the real API enforces its own minimum
+    context_cache = ContextCache(min_tokens=0) if stub else ContextCache()
+    columns = ["calls", "sent_tokens", "call_ms_p50", "call_ms_first", "total_s"]
+    print(f"{'resume':<10}" + "".join(f"{column:>15}" for column in columns))
+    try:
+        for label, cache in (("inline", None), ("cached", context_cache)):
+            first_request = len(stub.requests) if stub else 0
+            started = time.perf_counter()
+            call_times = run(registry, args.model, pdf_content, job_descriptions, cache)
+            row = {
+                "calls": len(call_times),
+                "sent_tokens": sent_tokens(stub, first_request) if stub else "n/a",
+                "call_ms_p50": round(statistics.median(call_times) * 1000, 1),
+                "call_ms_first": round(call_times[0] * 1000, 1),
+                "total_s": round(time.perf_counter() - started, 2),
+            }
+            print(f"{label:<10}" + "".join(f"{row[column]:>15}" for column in columns))
+        print(f"context cache: {context_cache.stats()}")
+    finally:
+        context_cache.clear()
+        if stub is not None:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
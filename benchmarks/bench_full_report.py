@@ -0,0 +1,142 @@
+"""Compare one combined report call with four separate analysis calls.
+
+Reports calls, input and output tokens (from the API's usage metadata) and
+wall time per resume for separate calls run one after another, separate calls
+run concurrently as "Analyze Everything" does, and a single combined report.
+By default it runs against the local stub with a synthetic resume page.
+
+    python benchmarks/bench_full_report.py --rounds 10 --output-token-latency 0.004
+    python benchmarks/bench_full_report.py --live --resume resume.pdf --job-description jd.txt
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_resume import (  # noqa: E402
+    DEFAULT_GENERATION_CONFIG,
+    DEFAULT_MODEL,
+    ClientRegistry,
+    build_content_parts,
+    build_report_prompt,
+    configure,
+    prepare_pdf_content,
+    prompts,
+    split_report,
+)
+from ats_resume.report import report_generation_config, section_marker  # noqa: E402
+from bench_resume_index import JOB_DESCRIPTION  # noqa: E402
+from gemini_stub import GeminiStub  # noqa: E402
+
+# Stub reply length per analysis, roughly what the model writes for one tab
+SECTION_WORDS = 350
+
+
+def stub_reply(request):
+    """One section per marker in the prompt, or a single analysis"""
+    prompt = request["contents"][0]["parts"][0].get("text", "")
+    keys = [key for key in prompts if section_marker(key) in prompt] or [None]
+    body = " ".join(["Candidate matches most requirements."] * (SECTION_WORDS // 5))
+    return "\n".join(f"{section_marker(key)}\n{body}" if key else body for key in keys)
+
+
+def call(registry, model_name, prompt, inputs, generation_config):
+    model = registry.get_model(model_name, generation_config)
+    with registry.connection():
+        response = model.generate_content(build_content_parts(prompt, *inputs))
+    usage = response.usage_metadata
+    return response.text, usage.prompt_token_count, usage.candidates_token_count
+
+
+def run_separate(registry, model_name, inputs, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            lambda key: call(registry, model_name, prompts[key], inputs, DEFAULT_GENERATION_CONFIG), prompts
+        ))
+    return len(results), sum(r[1] for r in results), sum(r[2] for r in results), len(results)
+
+
+def run_combined(registry, model_name, inputs, workers):
+    text, input_tokens, output_tokens = call(
+        registry, model_name, build_report_prompt(), inputs, report_generation_config()
+    )
+    return 1, input_tokens, output_tokens, len(split_report(text))
+
+
+def synthetic_page():
+    from PIL import Image, ImageDraw
+
+    page = Image.new("RGB", (1275, 1650), "white")
+    draw = ImageDraw.Draw(page)
+    for line in range(60):
+        draw.text((80, 80 + line * 25), f"Led data platform work with Python, SQL and Spark ({line})", fill="black")
+    return page
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub latency per request in seconds")
+    parser.add_argument("--output-token-latency", type=float, default=0.004,
+                        help="Stub generation time per output token in seconds")
+    parser.add_argument("--live", action="store_true", help="Call Gemini with GOOGLE_API_KEY instead of the stub")
+    parser.add_argument("--resume", help="Resume PDF (default: one synthetic page image)")
+    parser.add_argument("--job-description", help="Job description text file (default: a sample posting)")
+    parser.add_argument("--model", default=os.getenv("MODEL", DEFAULT_MODEL))
+    args = parser.parse_args(argv)
+
+    if args.resume:
+        with open(args.resume, "rb") as f:
+            pdf_content = prepare_pdf_content(f.read())
+    else:
+        pdf_content = [synthetic_page()]
+    job_description = JOB_DESCRIPTION
+    if args.job_description:
+        with open(args.job_description, "r", encoding="utf-8") as f:
+            job_description = f.read()
+
+    stub = None
+    if args.live:
+        configure(os.getenv("GOOGLE_API_KEY"))
+    else:
+        stub = GeminiStub(latency=args.latency, output_token_latency=args.output_token_latency).start()
+        stub.reply = stub_reply
+        configure("stub-key", transport="rest", api_endpoint=stub.endpoint)
+
+    registry = ClientRegistry()
+    variants = {
+        "separate, sequential": (run_separate, 1),
+        "separate, concurrent": (run_separate, len(prompts)),
+        "combined": (run_combined, 1),
+    }
+    columns = ["calls", "input_tokens", "output_tokens", "sections", "wall_s_p50", "wall_s_max"]
+    print(f"{'mode':<22}" + "".join(f"{column:>15}" for column in columns))
+    try:
+        for label, (run, workers) in variants.items():
+            times = []
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                calls, input_tokens, output_tokens, sections = run(
+                    registry, args.model, (pdf_content, job_description), workers
+                )
+                times.append(time.perf_counter() - started)
+            row = {
+                "calls": calls,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "sections": sections,
+                "wall_s_p50": round(statistics.median(times), 2),
+                "wall_s_max": round(max(times), 2),
+            }
+            print(f"{label:<22}" + "".join(f"{row[column]:>15}" for column in columns))
+    finally:
+        if stub is not None:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Compare image payload settings on a directory of resume PDFs.
+
+For each setting this reports encode time, upload size and estimated image
+tokens. With --live it also calls Gemini with the ATS prompt and reports call
+latency and how far the ATS score drifts from the unoptimized baseline.
+
+    python benchmarks/bench_image_payload.py fixtures/resumes/
+    python benchmarks/bench_image_payload.py fixtures/resumes/ --live --job-description jd.txt
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_resume import (  # noqa: E402
+    DEFAULT_DPI,
+    ImageOptions,
+    configure,
+    generate_analysis,
+    iter_page_images,
+    optimize_image,
+    parse_page_selection,
+    payload_stats,
+    prompts,
+)
+from ats_resume.pdf import pdf_page_count  # noqa: E402
+
+SETTINGS = {
+    "baseline-png": ImageOptions(max_pixels=None, crop_margins=False, image_format="PNG"),
+    "png-1536": ImageOptions(image_format="PNG"),
+    "jpeg-85": ImageOptions(image_format="JPEG", quality=85),
+    "jpeg-60": ImageOptions(image_format="JPEG", quality=60),
+    "webp-80": ImageOptions(image_format="WEBP", quality=80),
+    "gray-jpeg-75": ImageOptions(grayscale=True, image_format="JPEG", quality=75),
+    "jpeg-1024": ImageOptions(max_pixels=1024 * 1024, image_format="JPEG", quality=80),
+}
+
+SCORE_PATTERN = re.compile(r"ATS Match Score:\s*\**\s*(\d+(?:\.\d+)?)\s*%")
+
+
+def parse_score(text):
+    match = SCORE_PATTERN.search(text or "")
+    return float(match.group(1)) if match else None
+
+
+def render_fixtures(directory, dpi, max_pages):
+    """Render every PDF in ``directory`` once so all settings start from the same pages"""
+    documents = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            pdf_bytes = f.read()
+        pages = parse_page_selection("all", pdf_page_count(pdf_bytes), max_pages)
+        documents[name] = list(iter_page_images(pdf_bytes, pages, dpi=dpi))
+    return documents
+
+
+def run(documents, settings, job_description=None, model_name=None):
+    results = {}
+    baseline_scores = {}
+    for label, options in settings.items():
+        encode_times, sizes, tokens, latencies, drifts = [], [], [], [], []
+        for name, images in documents.items():
+            started = time.perf_counter()
+            payloads = [optimize_image(image, options) for image in images]
+            encode_times.append(time.perf_counter() - started)
+            stats = payload_stats(payloads)
+            sizes.append(stats["bytes"])
+            tokens.append(stats["estimated_tokens"])
+
+            if job_description is not None:
+                started = time.perf_counter()
+                response = generate_analysis(prompts["ats_score"], payloads, job_description, model_name=model_name)
+                latencies.append(time.perf_counter() - started)
+                score = parse_score(response)
+                if label == "baseline-png":
+                    baseline_scores[name] = score
+                elif score is not None and baseline_scores.get(name) is not None:
+                    drifts.append(abs(score - baseline_scores[name]))
+
+        results[label] = {
+            "encode_ms_p50": round(statistics.median(encode_times) * 1000, 2),
+            "bytes_mean": round(statistics.mean(sizes)),
+            "tokens_mean": round(statistics.mean(tokens)),
+        }
+        if latencies:
+            results[label]["latency_s_p50"] = round(statistics.median(latencies), 3)
+        if drifts:
+            results[label]["score_drift_mean"] = round(statistics.mean(drifts), 2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixtures", help="Directory of resume PDFs")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--max-pages", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="Also call Gemini to measure latency and score drift")
+    parser.add_argument("--job-description", help="Job description file used with --live")
+    parser.add_argument("--model", default=os.getenv("MODEL", "gemini-2.0-flash"))
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    job_description = None
+    if args.live:
+        if not args.job_description:
+            parser.error("--live requires --job-description")
+        configure(
+            os.getenv("GOOGLE_API_KEY"),
+            transport=os.getenv("GEMINI_TRANSPORT") or None,
+            api_endpoint=os.getenv("GEMINI_API_ENDPOINT") or None,
+        )
+        with open(args.job_description, "r", encoding="utf-8") as f:
+            job_description = f.read()
+
+    documents = render_fixtures(args.fixtures, args.dpi, args.max_pages)
+    if not documents:
+        parser.error(f"No PDFs found in {args.fixtures}")
+    results = run(documents, SETTINGS, job_description, args.model)
+
+    columns = ["encode_ms_p50", "bytes_mean", "tokens_mean", "latency_s_p50", "score_drift_mean"]
+    print(f"{'setting':<14}" + "".join(f"{column:>18}" for column in columns))
+    for label, row in results.items():
+        print(f"{label:<14}" + "".join(f"{str(row.get(column, '-')):>18}" for column in columns))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"documents": len(documents), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Compare the local keyword scorer with the model's ATS Score analysis.
+
+Reports per-pair latency for both paths and the throughput of the vectorized
+``score_matrix`` over every resume/job description pair (optionally repeated
+to simulate a large batch). The model path runs against the local Gemini stub
+unless --live is given, in which case it also reports how far the local score
+is from the model's.
+
+    python benchmarks/bench_keyword_score.py fixtures/resumes/ fixtures/jds/
+    python benchmarks/bench_keyword_score.py fixtures/resumes/ fixtures/jds/ --live
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_resume import (  # noqa: E402
+    DEFAULT_MODEL,
+    configure,
+    extract_pdf_text,
+    extract_terms,
+    generate_analysis,
+    prompts,
+    score_matrix,
+    score_resume,
+)
+from ats_resume.batch import list_files  # noqa: E402
+from bench_image_payload import parse_score  # noqa: E402
+from gemini_stub import GeminiStub  # noqa: E402
+
+
+def load_fixtures(resumes_dir, jds_dir):
+    resumes = {}
+    for path in list_files(resumes_dir, (".pdf",)):
+        with open(path, "rb") as f:
+            resumes[os.path.basename(path)] = extract_pdf_text(f.read())
+    jds = {}
+    for path in list_files(jds_dir, (".txt", ".md")):
+        with open(path, "r", encoding="utf-8") as f:
+            jds[os.path.basename(path)] = f.read()
+    return resumes, jds
+
+
+def _percentiles(times):
+    times = sorted(times)
+    return {
+        "ms_p50": round(statistics.median(times) * 1000, 3),
+        "ms_p95": round(times[int(len(times) * 0.95) - 1] * 1000, 3) if len(times) > 1 else round(times[0] * 1000, 3),
+    }
+
+
+def bench_local(resumes, jds):
+    times, scores = [], {}
+    for resume_name, resume_text in resumes.items():
+        for jd_name, jd in jds.items():
+            # Measure a cold pair: the term cache would otherwise hide tokenization
+            extract_terms.cache_clear()
+            started = time.perf_counter()
+            scores[resume_name, jd_name] = score_resume(resume_text, jd).score
+            times.append(time.perf_counter() - started)
+    return _percentiles(times), scores
+
+
+def bench_matrix(resumes, jds, repeat):
+    # Distinct texts per copy so the term cache does not short-circuit the work
+    resume_texts = [f"{text}\n{copy}" for copy in range(repeat) for text in resumes.values()]
+    extract_terms.cache_clear()
+    started = time.perf_counter()
+    matrix = score_matrix(resume_texts, list(jds.values()))
+    elapsed = time.perf_counter() - started
+    return {"pairs": matrix.size, "seconds": round(elapsed, 3), "pairs_per_second": round(matrix.size / elapsed)}
+
+
+def bench_model(resumes, jds, model_name):
+    times, scores = [], {}
+    for resume_name, resume_text in resumes.items():
+        for jd_name, jd in jds.items():
+            started = time.perf_counter()
+            response = generate_analysis(prompts["ats_score"], resume_text, jd, model_name=model_name)
+            times.append(time.perf_counter() - started)
+            scores[resume_name, jd_name] = parse_score(response)
+    return _percentiles(times), scores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("resumes", help="Directory of resume PDFs")
+    parser.add_argument("jds", help="Directory of job description .txt/.md files")
+    parser.add_argument("--repeat", type=int, default=1000, help="Copies of the resume set for the matrix run")
+    parser.add_argument("--latency", type=float, default=1.0, help="Stub latency per model call in seconds")
+    parser.add_argument("--live", action="store_true", help="Call Gemini instead of the local stub")
+    parser.add_argument("--model", default=os.getenv("MODEL", DEFAULT_MODEL))
+    args = parser.parse_args(argv)
+
+    resumes, jds = load_fixtures(args.resumes, args.jds)
+    if not resumes or not jds:
+        parser.error("Need at least one resume PDF and one job description")
+
+    local, local_scores = bench_local(resumes, jds)
+    matrix = bench_matrix(resumes, jds, args.repeat)
+    if args.live:
+        configure(
+            os.getenv("GOOGLE_API_KEY"),
+            transport=os.getenv("GEMINI_TRANSPORT") or None,
+            api_endpoint=os.getenv("GEMINI_API_ENDPOINT") or None,
+        )
+        model, model_scores = bench_model(resumes, jds, args.model)
+    else:
+        with GeminiStub(latency=args.latency) as stub:
+            configure("stub-key", transport="rest", api_endpoint=stub.endpoint)
+            model, model_scores = bench_model(resumes, jds, args.model)
+
+    print(f"{'path':<8}{'ms_p50':>12}{'ms_p95':>12}")
+    print(f"{'local':<8}{local['ms_p50']:>12}{local['ms_p95']:>12}")
+    print(f"{'model':<8}{model['ms_p50']:>12}{model['ms_p95']:>12}")
+    print(f"score_matrix: {matrix['pairs']} pairs in {matrix['seconds']}s ({matrix['pairs_per_second']} pairs/s)")
+    if args.live:
+        drifts = [
+            abs(local_scores[pair] - model_scores[pair])
+            for pair in local_scores if model_scores.get(pair) is not None
+        ]
+        if drifts:
+            print(f"mean |local - model| score: {statistics.mean(drifts):.1f} points over {len(drifts)} pairs")
+
+
+if __name__ == "__main__":
+    main()
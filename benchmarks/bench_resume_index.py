@@ -0,0 +1,90 @@
+"""Measure resume index build, search and incremental update times on a synthetic corpus.
+
+    python benchmarks/bench_resume_index.py --docs 50000
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_resume import ResumeIndex  # noqa: E402
+from ats_resume.keywords import PHRASES, SKILLS  # noqa: E402
+
+FILLER = (
+    "led delivered designed built maintained improved migrated reduced latency cost customers "
+    "reporting dashboards stakeholders platform services product launch roadmap budget hiring"
+).split()
+
+JOB_DESCRIPTION = """Senior Data Engineer
+Requirements:
+- Python, SQL and Spark in production
+- Airflow or dbt pipelines on AWS or GCP
+- Kubernetes, Docker, CI/CD
+Nice to have: Kafka, machine learning, Snowflake
+"""
+
+
+def synthetic_resume(rng, vocabulary):
+    words = rng.sample(vocabulary, 12) + rng.choices(FILLER, k=rng.randint(150, 600))
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    vocabulary = sorted(SKILLS | PHRASES)
+    directory = tempfile.mkdtemp(prefix="resume-index-")
+    try:
+        index = ResumeIndex(directory)
+        started = time.perf_counter()
+        for doc in range(args.docs):
+            index.add(f"resume-{doc}.pdf", synthetic_resume(rng, vocabulary))
+        index.flush()
+        build_seconds = time.perf_counter() - started
+
+        # Reopen so searches run against the memory-mapped segment, not fresh arrays
+        index = ResumeIndex(directory)
+        search_times = []
+        for _ in range(args.queries):
+            started = time.perf_counter()
+            index.search(JOB_DESCRIPTION, args.top_k)
+            search_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for doc in range(100):
+            index.add(f"new-{doc}.pdf", synthetic_resume(rng, vocabulary))
+            index.remove(f"resume-{doc}.pdf")
+        index.flush()
+        update_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index.compact()
+        compact_seconds = time.perf_counter() - started
+
+        search_times.sort()
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"docs: {len(index)}  index size: {size / 1e6:.1f} MB")
+        print(f"build: {build_seconds:.2f}s ({args.docs / build_seconds:.0f} docs/s)")
+        print(f"search top-{args.top_k}: p50 {statistics.median(search_times) * 1000:.2f} ms, "
+              f"p95 {search_times[int(len(search_times) * 0.95) - 1] * 1000:.2f} ms")
+        print(f"100 adds + 100 removes: {update_seconds * 1000:.1f} ms")
+        print(f"compact: {compact_seconds:.2f}s")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Measure the semantic pre-filter at corpus sizes such as 10k and 100k resumes.
+
+For each size this reports embedding throughput, the time to write the
+vector file, and batched top-K search latency over the memory-mapped matrix.
+
+    python benchmarks/bench_semantic_prefilter.py --sizes 10000 100000
+    python benchmarks/bench_semantic_prefilter.py --embedder st:all-MiniLM-L6-v2 --sizes 10000
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_resume import SemanticIndex, get_embedder  # noqa: E402
+from ats_resume.keywords import PHRASES, SKILLS  # noqa: E402
+from bench_resume_index import FILLER, JOB_DESCRIPTION, synthetic_resume  # noqa: E402
+
+ADD_BATCH = 1024
+
+
+def bench_size(size, embedder_spec, queries, batch, k, seed):
+    rng = random.Random(seed)
+    vocabulary = sorted(SKILLS | PHRASES)
+    directory = tempfile.mkdtemp(prefix="semantic-index-")
+    try:
+        index = SemanticIndex(directory, get_embedder(embedder_spec))
+        embed_seconds = 0.0
+        for start in range(0, size, ADD_BATCH):
+            documents = [
+                (f"resume-{doc}.pdf", synthetic_resume(rng, vocabulary), None)
+                for doc in range(start, min(size, start + ADD_BATCH))
+            ]
+            started = time.perf_counter()
+            index.add_many(documents)
+            embed_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        index.flush()
+        flush_seconds = time.perf_counter() - started
+
+        # Reopen so searches read the memory-mapped file
+        index = SemanticIndex(directory, get_embedder(embedder_spec))
+        job_descriptions = [
+            JOB_DESCRIPTION + " ".join(rng.sample(FILLER, 5)) for _ in range(batch)
+        ]
+        search_times = []
+        for _ in range(queries):
+            started = time.perf_counter()
+            index.search_many(job_descriptions, k)
+            search_times.append(time.perf_counter() - started)
+        search_times.sort()
+        return {
+            "docs": size,
+            "embed_docs_per_s": round(size / embed_seconds),
+            "flush_s": round(flush_seconds, 2),
+            "file_mb": round(os.path.getsize(os.path.join(directory, "vectors.f32")) / 1e6, 1),
+            "search_ms_p50": round(statistics.median(search_times) * 1000, 2),
+            "search_ms_p95": round(search_times[max(0, int(len(search_times) * 0.95) - 1)] * 1000, 2),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--embedder", default="hashing")
+    parser.add_argument("--queries", type=int, default=20, help="Timed search calls per size")
+    parser.add_argument("--batch", type=int, default=16, help="Job descriptions per search call")
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    columns = ["docs", "embed_docs_per_s", "flush_s", "file_mb", "search_ms_p50", "search_ms_p95"]
+    print("".join(f"{column:>18}" for column in columns))
+    for size in args.sizes:
+        row = bench_size(size, args.embedder, args.queries, args.batch, args.top_k, args.seed)
+        print("".join(f"{row[column]:>18}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
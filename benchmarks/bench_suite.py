@@ -0,0 +1,336 @@
+"""Time each stage of a resume analysis offline, over a synthetic PDF corpus.
+
+Stages are PyPDF2 text extraction, poppler rendering (skipped when poppler
+is not installed), PDF preparation as ``input_pdf_setup`` does it, Gemini
+client setup, the model round-trip against the local stub with injected
+failures, and the whole path end to end. Each stage reports p50/p95
+latency, throughput and peak RSS. Results are written as JSON so runs can
+be compared between versions; ``--compare`` prints the change against an
+earlier file and exits non-zero on a regression.
+
+    python benchmarks/bench_suite.py --output bench-results.json
+    python benchmarks/bench_suite.py --failure-rate 0.1 --compare bench-results.json --output new.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_resume import (  # noqa: E402
+    DEFAULT_GENERATION_CONFIG,
+    DEFAULT_MAX_PAGES,
+    DEFAULT_MODEL,
+    ClientRegistry,
+    configure,
+    extract_pdf_text,
+    generate_analysis,
+    iter_page_images,
+    parse_page_selection,
+    prepare_pdf_content,
+    prompts,
+)
+from bench_resume_index import JOB_DESCRIPTION  # noqa: E402
+from corpus import CORPUS, build_corpus  # noqa: E402
+from gemini_stub import FAILURES, GeminiStub  # noqa: E402
+
+COLUMNS = ("calls", "p50_ms", "p95_ms", "ops_per_s", "peak_rss_mb", "errors")
+# Metrics compared by --compare; higher is worse for all of them
+COMPARED = ("p50_ms", "p95_ms", "peak_rss_mb")
+
+
+def current_rss_mb():
+    """Resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def max_rss_mb():
+    """Peak RSS of the process so far"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+class RssSampler:
+    """Highest RSS seen while the block runs, sampled every ``interval`` seconds"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None:
+            self.peak_mb = max(self.peak_mb or 0, rss)
+
+    def _run(self):
+        self._sample()
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        if current_rss_mb() is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._sample()
+        else:
+            # No /proc: fall back to the lifetime peak
+            self.peak_mb = max_rss_mb()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def measure(fn, inputs, rounds, concurrency=1):
+    """Call ``fn`` on every input ``rounds`` times and summarize the calls"""
+    # One untimed pass to load modules and warm caches outside the measurement
+    for item in inputs[:1]:
+        fn(item)
+    times = []
+    errors = []
+
+    def timed(item):
+        started = time.perf_counter()
+        try:
+            fn(item)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        times.append(time.perf_counter() - started)
+
+    work = [item for _ in range(rounds) for item in inputs]
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(timed, work))
+        else:
+            for item in work:
+                timed(item)
+        wall = time.perf_counter() - started
+    return {
+        "calls": len(times),
+        "p50_ms": round(statistics.median(times) * 1000, 3),
+        "p95_ms": round(percentile(times, 0.95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(times) * 1000, 3),
+        "max_ms": round(max(times) * 1000, 3),
+        "ops_per_s": round(len(times) / wall, 2),
+        "peak_rss_mb": round(rss.peak_mb, 1) if rss.peak_mb is not None else None,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def poppler_available():
+    return shutil.which("pdftoppm") is not None and shutil.which("pdfinfo") is not None
+
+
+def run_suite(args, corpus):
+    """{stage name: summary}; PDF stages get one row per corpus document"""
+    results = {}
+
+    def record(name, summary, **extra):
+        results[name] = {**summary, **extra}
+        print(f"{name:<30}" + "".join(f"{str(results[name].get(column)):>12}" for column in COLUMNS), flush=True)
+
+    documents = list(corpus.items())
+    page_counts = {name: pages for name, _, pages in CORPUS}
+    for name, pdf_bytes in documents:
+        record(f"text_extract/{name}", measure(lambda _: extract_pdf_text(pdf_bytes), [None], args.rounds))
+    if poppler_available():
+        for name, pdf_bytes in documents:
+            page_numbers = parse_page_selection("all", page_counts[name], DEFAULT_MAX_PAGES)
+            record(f"render/{name}", measure(
+                lambda _: list(iter_page_images(pdf_bytes, page_numbers, args.dpi)), [None], args.rounds
+            ))
+    else:
+        print("render: skipped, poppler is not installed", file=sys.stderr)
+
+    prepared = {}
+    for name, pdf_bytes in documents:
+        routes = []
+        record(f"prepare/{name}", measure(
+            lambda _: prepare_pdf_content(pdf_bytes, dpi=args.dpi, mode=args.mode, on_route=routes.append),
+            [None], args.rounds,
+        ), route=routes[-1].route)
+        prepared[name] = prepare_pdf_content(pdf_bytes, dpi=args.dpi, mode=args.mode)
+
+    import google.generativeai as genai
+
+    record("client_setup/per_call", measure(
+        lambda _: genai.GenerativeModel(model_name=args.model, generation_config=DEFAULT_GENERATION_CONFIG),
+        [None], args.rounds * 10,
+    ))
+    registry = ClientRegistry(max_connections=args.concurrency)
+    record("client_setup/registry", measure(
+        lambda _: registry.get_model(args.model, DEFAULT_GENERATION_CONFIG), [None], args.rounds * 10,
+    ))
+
+    prompt = prompts["ats_score"]
+    retries = []
+
+    def model_call(pdf_content):
+        generate_analysis(
+            prompt, pdf_content, JOB_DESCRIPTION, model_name=args.model, registry=registry,
+            max_retries=args.max_retries, on_retry=lambda *_: retries.append(1),
+        )
+
+    contents = list(prepared.values())
+    for label, concurrency in (("sequential", 1), ("concurrent", args.concurrency)):
+        retries.clear()
+        record(f"model_call/{label}", measure(model_call, contents, args.rounds, concurrency), retries=len(retries))
+
+    def end_to_end(pdf_bytes):
+        model_call(prepare_pdf_content(pdf_bytes, dpi=args.dpi, mode=args.mode))
+
+    retries.clear()
+    record("end_to_end", measure(end_to_end, list(corpus.values()), args.rounds, args.concurrency),
+           retries=len(retries))
+    return results
+
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results, threshold, min_delta):
+    """Print the change in each compared metric; returns the stages that regressed.
+
+    A metric regresses when it grows by more than ``threshold`` (relative) and
+    by at least ``min_delta`` milliseconds or megabytes, so timer noise on
+    microsecond stages is not reported.
+    """
+    regressed = []
+    print(f"\n{'stage':<30}{'metric':>12}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, current in results.items():
+        previous = baseline["stages"].get(name)
+        if previous is None:
+            continue
+        for metric in COMPARED:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            flag = ""
+            if change > threshold and new - old >= min_delta:
+                flag = "  REGRESSION"
+                regressed.append(name)
+            print(f"{name:<30}{metric:>12}{old:>12}{new:>12}{change:>+10.1%}{flag}")
+    return sorted(set(regressed))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="Timed passes over each stage's inputs")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative increase in a compared metric reported as a regression (default: 0.1)")
+    parser.add_argument("--min-delta", type=float, default=1.0,
+                        help="Smallest absolute increase, in ms or MB, reported as a regression (default: 1)")
+    parser.add_argument("--corpus-dir", help="Also write the synthetic corpus here, e.g. to inspect it")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--mode", default="auto", help="PDF_MODE used for preparation (default: auto)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Model calls in flight for concurrent stages")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub latency per request in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.05,
+                        help="Random extra stub latency, up to this many seconds")
+    parser.add_argument("--input-token-latency", type=float, default=0.00001,
+                        help="Stub processing time per prompt token in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="Share of stub requests that fail")
+    parser.add_argument("--failure-kinds", default="rate_limit,unavailable",
+                        help=f"Comma-separated failures to inject: {', '.join(FAILURES)}")
+    parser.add_argument("--retry-after", type=float, default=0.05,
+                        help="Retry delay the stub asks for in failed responses, in seconds")
+    parser.add_argument("--max-retries", type=int, default=4)
+    parser.add_argument("--model", default=os.getenv("MODEL", DEFAULT_MODEL))
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(seed=args.seed)
+    if args.corpus_dir:
+        from corpus import write_corpus
+
+        write_corpus(args.corpus_dir, seed=args.seed)
+
+    stub = GeminiStub(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        input_token_latency=args.input_token_latency,
+        failure_rate=args.failure_rate,
+        failure_kinds=[kind.strip() for kind in args.failure_kinds.split(",") if kind.strip()],
+        retry_after=args.retry_after,
+        seed=args.seed,
+    ).start()
+    configure("stub-key", transport="rest", api_endpoint=stub.endpoint)
+
+    print(f"{'stage':<30}" + "".join(f"{column:>12}" for column in COLUMNS))
+    started = time.perf_counter()
+    try:
+        results = run_suite(args, corpus)
+    finally:
+        stub.stop()
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "poppler": poppler_available(),
+        "settings": {key: value for key, value in vars(args).items()
+                     if key not in ("output", "compare", "threshold", "min_delta")},
+        "injected_failures": dict(stub.failures),
+        "total_seconds": round(time.perf_counter() - started, 2),
+        "stages": results,
+    }
+    print(f"injected failures: {report['injected_failures']}, total {report['total_seconds']}s")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressed = compare(baseline, results, args.threshold, args.min_delta)
+        if regressed:
+            print(f"{len(regressed)} stage(s) regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
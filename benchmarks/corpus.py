@@ -0,0 +1,132 @@
+"""Synthetic resume PDFs for offline benchmarks: text-layer and scanned, one to many pages.
+
+Text PDFs are written directly (Helvetica, a real text layer PyPDF2 can
+extract); scanned PDFs are page images with no text layer, saved by Pillow.
+Generation is deterministic for a given seed.
+
+    python benchmarks/corpus.py corpus/ --seed 1
+"""
+import argparse
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_resume.keywords import SKILLS  # noqa: E402
+from bench_resume_index import FILLER  # noqa: E402
+
+# (name, kind, pages)
+CORPUS = (
+    ("text-1p", "text", 1),
+    ("text-2p", "text", 2),
+    ("text-12p", "text", 12),
+    ("text-60p", "text", 60),
+    ("scanned-1p", "scanned", 1),
+    ("scanned-3p", "scanned", 3),
+)
+
+SECTIONS = ("Summary", "Experience", "Projects", "Skills", "Education", "Publications")
+LINES_PER_PAGE = 52
+
+
+def resume_lines(rng, pages):
+    """Lines of a plausible resume, ``LINES_PER_PAGE`` per page"""
+    skills = sorted(SKILLS)
+    lines = ["Jordan Example", "jordan@example.com | +1 555 0100 | github.com/example", ""]
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.extend(["", rng.choice(SECTIONS).upper()])
+        for _ in range(rng.randint(4, 10)):
+            words = rng.sample(skills, 2) + rng.choices(FILLER, k=9)
+            rng.shuffle(words)
+            lines.append("- " + " ".join(words).capitalize() + f" ({rng.randint(2014, 2024)})")
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _write_pdf(objects):
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n").encode("latin-1")
+    return bytes(out)
+
+
+def text_pdf(pages, seed=0):
+    """US Letter PDF with a text layer"""
+    lines = resume_lines(random.Random(seed), pages)
+    page_ids = [4 + 2 * page for page in range(pages)]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>".encode("latin-1"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page, page_id in enumerate(page_ids):
+        chunk = lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE]
+        stream = "BT /F1 10 Tf 13 TL 54 740 Td " + " ".join(f"({_escape(line)}) ' " for line in chunk) + "ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode("latin-1")
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode("latin-1"))
+    return _write_pdf(objects)
+
+
+def scanned_pdf(pages, seed=0, dpi=150):
+    """US Letter PDF of page images only, as a scanner produces"""
+    from PIL import Image, ImageDraw
+
+    lines = resume_lines(random.Random(seed), pages)
+    images = []
+    for page in range(pages):
+        image = Image.new("L", (int(8.5 * dpi), 11 * dpi), 255)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE]):
+            draw.text((dpi * 3 // 4, dpi * 3 // 4 + row * dpi * 13 // 72), line, fill=0)
+        images.append(image)
+    out = io.BytesIO()
+    images[0].save(out, "PDF", save_all=True, append_images=images[1:], resolution=dpi)
+    return out.getvalue()
+
+
+def build_corpus(spec=CORPUS, seed=0):
+    """{name: pdf bytes} for each (name, kind, pages) in ``spec``"""
+    makers = {"text": text_pdf, "scanned": scanned_pdf}
+    return {name: makers[kind](pages, seed) for name, kind, pages in spec}
+
+
+def write_corpus(directory, spec=CORPUS, seed=0):
+    """Write the corpus to ``directory`` and return the file paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, pdf_bytes in build_corpus(spec, seed).items():
+        path = os.path.join(directory, f"{name}.pdf")
+        with open(path, "wb") as f:
+            f.write(pdf_bytes)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", nargs="?", default="corpus", help="Where to write the PDFs (default: corpus)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for path in write_corpus(args.directory, seed=args.seed):
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
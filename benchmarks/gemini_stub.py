@@ -0,0 +1,298 @@
+"""Local stand-in for the Gemini REST API, for benchmarks that must run without network.
+
+    stub = GeminiStub(latency=0.05).start()
+    configure("test-key", transport="rest", api_endpoint=stub.endpoint)
+    ...
+    stub.stop()
+"""
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_GENERATE_PATH = re.compile(r"^/v1beta/(models/[^:/]+):(generateContent|streamGenerateContent|countTokens)")
+_CACHE_PATH = re.compile(r"^/v1beta/(cachedContents(?:/[^/?]+)?)(?:\?.*)?$")
+
+# Injectable failures: (HTTP status, message, API status)
+FAILURES = {
+    "rate_limit": (429, "Resource has been exhausted (e.g. check quota).", "RESOURCE_EXHAUSTED"),
+    "server_error": (500, "An internal error has occurred.", "INTERNAL"),
+    "unavailable": (503, "The model is overloaded. Please try again later.", "UNAVAILABLE"),
+}
+
+
+def _response_body(text, prompt_tokens, output_tokens, cached_tokens=0):
+    body = {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens,
+        },
+    }
+    if cached_tokens:
+        body["usageMetadata"]["cachedContentTokenCount"] = cached_tokens
+    return body
+
+
+def _timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _error(status, message, api_status):
+    return {"error": {"code": status, "message": message, "status": api_status}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Keep-alive responses are written as headers + body; avoid delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _cache_request(self, method):
+        match = _CACHE_PATH.match(self.path)
+        if match is None:
+            self._send_json(404, _error(404, f"Unknown path {self.path}", "NOT_FOUND"))
+            return
+        request = self._read_json() if method in ("POST", "PATCH") else {}
+        stub = self.server.stub
+        status, body = stub.cache_request(method, match.group(1), request)
+        if method == "POST" and status == 200:
+            # Creating a cache reads its content once
+            time.sleep(stub.latency + body["usageMetadata"]["totalTokenCount"] * stub.input_token_latency)
+        self._send_json(status, body)
+
+    def do_GET(self):
+        self._cache_request("GET")
+
+    def do_PATCH(self):
+        self._cache_request("PATCH")
+
+    def do_DELETE(self):
+        self._cache_request("DELETE")
+
+    def do_POST(self):
+        stub = self.server.stub
+        if _CACHE_PATH.match(self.path):
+            self._cache_request("POST")
+            return
+        request = self._read_json()
+        match = _GENERATE_PATH.match(self.path)
+        if match is None:
+            self._send_json(404, _error(404, f"Unknown path {self.path}", "NOT_FOUND"))
+            return
+
+        if match.group(2) == "countTokens":
+            # The SDK wraps the contents in the request it would generate from
+            request = request.get("generateContentRequest", request)
+            self._send_json(200, {"totalTokens": stub.estimate_prompt_tokens(request)})
+            return
+
+        stub.record(match.group(1), request)
+        failure = stub.next_failure()
+        time.sleep(stub.request_latency())
+        if failure is not None:
+            status, message, api_status = failure
+            self._send_json(status, {"error": {"code": status, "message": message, "status": api_status}})
+            return
+
+        cached_tokens = 0
+        if request.get("cachedContent"):
+            cached_tokens = stub.cached_tokens(request["cachedContent"])
+            if cached_tokens is None:
+                self._send_json(404, _error(404, "CachedContent not found (or permission denied)", "NOT_FOUND"))
+                return
+        prompt_tokens = stub.estimate_prompt_tokens(request)
+        # Prompt processing time grows with the tokens not already in a cache
+        time.sleep(prompt_tokens * stub.input_token_latency)
+        prompt_tokens += cached_tokens
+        text = stub.reply(request)
+        output_tokens = max(1, len(text) // 4)
+        # Generation time grows with the reply, as it does for a real model
+        time.sleep(output_tokens * stub.output_token_latency)
+        if match.group(2) == "streamGenerateContent":
+            # The SDK's REST transport reads a JSON array of partial responses
+            words = text.split(" ")
+            size = max(1, len(words) // stub.stream_chunks)
+            chunks = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+            body = [_response_body(chunk, prompt_tokens, output_tokens, cached_tokens) for chunk in chunks]
+            self._send_json(200, body)
+        else:
+            self._send_json(200, _response_body(text, prompt_tokens, output_tokens, cached_tokens))
+
+
+class GeminiStub:
+    """Threaded HTTP server answering generateContent with canned text.
+
+    ``latency`` is added to every request, ``input_token_latency`` per prompt
+    token not held in a context cache and ``output_token_latency`` per
+    output token of the reply. ``cachedContents`` create, get, update and
+    delete are supported; caches under ``cache_min_tokens`` are rejected as
+    the real API does. ``latency_jitter`` adds up to that many seconds at
+    random. ``failure_rate`` (0..1) makes that share of requests fail with
+    one of ``failure_kinds`` (keys of ``FAILURES``, HTTP 429 by default), or
+    ``fail_next(n)`` fails the next ``n`` requests. With ``retry_after`` the
+    error asks the client to retry after that many seconds. ``reply`` may be
+    replaced to customise the response text.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, response_text=None, stream_chunks=4, seed=0,
+                 output_token_latency=0.0, input_token_latency=0.0, cache_min_tokens=0,
+                 latency_jitter=0.0, failure_kinds=("rate_limit",), retry_after=None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.output_token_latency = output_token_latency
+        self.input_token_latency = input_token_latency
+        self.cache_min_tokens = cache_min_tokens
+        self.caches = {}
+        self._cache_ids = itertools.count(1)
+        self.failure_rate = failure_rate
+        self.failure_kinds = tuple(failure_kinds)
+        self.retry_after = retry_after
+        self.failures = Counter()
+        self.stream_chunks = stream_chunks
+        self.response_text = response_text or (
+            "1. ATS Match Score: 72%\n2. Keywords Found: Python, SQL\n"
+            "3. Keywords Missing: Kubernetes\n4. Recommendations: Add metrics.\n5. Final Thoughts: Good fit."
+        )
+        self.requests = []
+        self._pending_failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def fail_next(self, count=1):
+        with self._lock:
+            self._pending_failures += count
+
+    def next_failure(self):
+        with self._lock:
+            if self._pending_failures > 0:
+                self._pending_failures -= 1
+                kind = self.failure_kinds[0]
+            elif self.failure_rate and self._random.random() < self.failure_rate:
+                kind = self._random.choice(self.failure_kinds)
+            else:
+                return None
+            self.failures[kind] += 1
+        status, message, api_status = FAILURES[kind]
+        if self.retry_after is not None:
+            message = f"{message} Please retry in {self.retry_after}s."
+        return status, message, api_status
+
+    def request_latency(self):
+        if not self.latency_jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.latency_jitter)
+
+    def record(self, model, request):
+        with self._lock:
+            self.requests.append((model, request))
+
+    def estimate_prompt_tokens(self, request):
+        tokens = 0
+        for content in request.get("contents", []):
+            for part in content.get("parts", []):
+                if "text" in part:
+                    tokens += max(1, len(part["text"]) // 4)
+                elif "inlineData" in part or "inline_data" in part:
+                    tokens += 258
+        return tokens
+
+    def _cache_resource(self, name, entry):
+        return {
+            "name": name,
+            "model": entry["model"],
+            "createTime": _timestamp(entry["created"]),
+            "updateTime": _timestamp(entry["updated"]),
+            "expireTime": _timestamp(entry["expires"]),
+            "usageMetadata": {"totalTokenCount": entry["tokens"]},
+        }
+
+    def cache_request(self, method, name, request):
+        """Handle a cachedContents call, returning (status, body)"""
+        now = time.time()
+        with self._lock:
+            for expired in [key for key, entry in self.caches.items() if entry["expires"] <= now]:
+                del self.caches[expired]
+            if method == "POST":
+                tokens = self.estimate_prompt_tokens(request)
+                if tokens < self.cache_min_tokens:
+                    return 400, _error(400, f"Cached content is too small. total_token_count={tokens}, "
+                                            f"min_total_token_count={self.cache_min_tokens}", "INVALID_ARGUMENT")
+                name = f"cachedContents/stub-{next(self._cache_ids)}"
+                ttl = float(request.get("ttl", "3600s").rstrip("s"))
+                self.caches[name] = {"model": request.get("model"), "tokens": tokens,
+                                     "created": now, "updated": now, "expires": now + ttl}
+                return 200, self._cache_resource(name, self.caches[name])
+            entry = self.caches.get(name)
+            if entry is None:
+                return 404, _error(404, "CachedContent not found (or permission denied)", "NOT_FOUND")
+            if method == "DELETE":
+                del self.caches[name]
+                return 200, {}
+            if method == "PATCH" and "ttl" in request:
+                entry["updated"] = now
+                entry["expires"] = now + float(request["ttl"].rstrip("s"))
+            return 200, self._cache_resource(name, entry)
+
+    def cached_tokens(self, name):
+        """Token count of a live cache, or None if it does not exist or has expired"""
+        with self._lock:
+            entry = self.caches.get(name)
+            if entry is None or entry["expires"] <= time.time():
+                return None
+            return entry["tokens"]
+
+    def reply(self, request):
+        return self.response_text
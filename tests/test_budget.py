@@ -0,0 +1,45 @@
+from ats_resume.budget import TokenBudget, apply_budget, trim_text
+from ats_resume.errors import AnalysisError
+from ats_resume.jobdesc import estimate_text_tokens
+
+EXPERIENCE = "Experience\n" + "\n".join(f"- Built Kafka and Spark pipelines for team {n}" for n in range(60))
+PUBLICATIONS = "Publications\n" + "\n".join(f"- Paper {n} on medieval poetry and archives" for n in range(200))
+RESUME = "Jane Doe\njane@example.com\n\n" + EXPERIENCE + "\n\n" + PUBLICATIONS
+JOB_DESCRIPTION = "Data engineer. Requirements: Kafka, Spark and streaming pipelines."
+
+
+def test_short_text_is_untouched():
+    text, trim = trim_text("Jane Doe\nSkills\nPython", 100)
+    assert text == "Jane Doe\nSkills\nPython"
+    assert not trim.trimmed
+
+
+def test_low_value_sections_go_first():
+    text, trim = trim_text(RESUME, 800)
+    assert estimate_text_tokens(text) <= 800
+    assert "Kafka and Spark pipelines for team 59" in text
+    assert "Jane Doe" in text
+    # The leftover budget goes to the opening of the lowest-ranked section
+    assert trim.trimmed and trim.shortened == ("Publications",) and trim.dropped == ()
+    assert "Paper 0 on" in text and "Paper 199 on" not in text
+    assert "[Trimmed to fit the input budget: Publications (shortened)]" in text
+
+
+def test_apply_budget_reports_both_inputs():
+    budgeted = apply_budget(RESUME, JOB_DESCRIPTION, TokenBudget(resume_tokens=800, job_description_tokens=None))
+    assert budgeted.job_description == JOB_DESCRIPTION
+    assert budgeted.resume_trim.trimmed and not budgeted.job_description_trim.trimmed
+    assert budgeted.describe().startswith("Resume trimmed from")
+
+
+def test_counter_tightens_a_low_estimate_and_its_errors_are_ignored():
+    # A tokenizer that counts twice the local estimate forces a second, tighter trim
+    budgeted = apply_budget(RESUME, JOB_DESCRIPTION, TokenBudget(800, None),
+                            counter=lambda text: 2 * estimate_text_tokens(text))
+    assert budgeted.resume_trim.counted_tokens <= 800 * 1.05
+
+    def failing(text):
+        raise AnalysisError("count_tokens failed")
+
+    budgeted = apply_budget(RESUME, JOB_DESCRIPTION, TokenBudget(800, None), counter=failing)
+    assert budgeted.resume_trim.counted_tokens is None and budgeted.resume_trim.tokens <= 800
@@ -0,0 +1,44 @@
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+from ats_resume import client
+from ats_resume.telemetry import collect_spans
+
+
+class Chunk:
+    def __init__(self, text=None, usage=None):
+        self._text = text
+        self.usage_metadata = usage
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError("no text parts")
+        return self._text
+
+
+class StreamingRegistry:
+    limiter = None
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def connection(self):
+        return nullcontext()
+
+    def get_model(self, model_name, generation_config):
+        return self
+
+    def generate_content(self, parts, stream=False):
+        return iter(self.chunks)
+
+
+def test_stream_usage_comes_from_the_final_chunk_even_without_text(monkeypatch):
+    monkeypatch.setattr(client, "_configured", True)
+    usage = SimpleNamespace(prompt_token_count=120, candidates_token_count=8, cached_content_token_count=0)
+    registry = StreamingRegistry([Chunk("Strong "), Chunk("fit."), Chunk(usage=usage)])
+    with collect_spans() as spans:
+        text = "".join(client.stream_analysis("prompt", "resume", "job", registry=registry))
+    assert text == "Strong fit."
+    stream_span = next(record for record in spans if record.name == "model_stream")
+    assert (stream_span.attributes["prompt_tokens"], stream_span.attributes["output_tokens"]) == (120, 8)
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from ats_resume.context_cache import ContextCache, is_missing_cache_error
+
+NAME = "cachedContents/abc123"
+
+
+class NotFound(Exception):
+    pass
+
+
+def test_missing_cache_error_must_name_the_cached_content():
+    assert is_missing_cache_error(NotFound(f"404 {NAME} not found"), NAME)
+    assert is_missing_cache_error(NotFound("404 Cached content abc123 was not found"), NAME)
+    assert is_missing_cache_error(NotFound("403 CachedContent not found (or permission denied)"), NAME)
+    assert not is_missing_cache_error(NotFound("404 models/gemini-9 is not found"), NAME)
+    assert not is_missing_cache_error(NotFound("404 cachedContents/other not found"), NAME)
+
+
+def test_no_cached_content_is_never_a_missing_cache():
+    assert not is_missing_cache_error(NotFound("403 CachedContent not found (or permission denied)"), None)
+
+
+def test_per_key_locks_are_dropped_once_unused(monkeypatch):
+    from google.generativeai import caching
+
+    uploads = []
+
+    def create(**kwargs):
+        uploads.append(kwargs["display_name"])
+        time.sleep(0.05)
+        if kwargs["model"] == "rejecting-model":
+            raise ValueError("content too small for this model")
+        return object()
+
+    monkeypatch.setattr(caching.CachedContent, "create", create)
+    cache = ContextCache(min_tokens=0)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("model", "resume", [], 10)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Concurrent callers shared one upload
+    assert len(uploads) == 1 and len(set(map(id, results))) == 1
+    assert cache.get("rejecting-model", "other resume", [], 10) is None
+    cache.invalidate("model", "resume")
+    assert cache._key_locks == {}
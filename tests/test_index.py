@@ -0,0 +1,84 @@
+from ats_resume import batch
+from ats_resume.batch import update_index
+from ats_resume.index import COMPACT_MAX_SEGMENTS, ResumeIndex, unindexable_reason
+from ats_resume.semantic import SemanticIndex
+
+PYTHON = "Backend engineer. " + "Python, Django, PostgreSQL and Kubernetes services for payments. " * 10
+DESIGN = "Product designer. " + "Figma prototypes, user research and design systems for mobile apps. " * 10
+
+
+def write_resumes(directory, texts):
+    paths = []
+    for name, text in texts.items():
+        path = directory / name
+        path.write_bytes(text.encode("utf-8"))
+        paths.append(str(path))
+    return paths
+
+
+def test_search_ranks_by_keyword_overlap_and_survives_reopening(tmp_path):
+    index = ResumeIndex(str(tmp_path))
+    index.add_many([("python.pdf", PYTHON, "d1"), ("design.pdf", DESIGN, "d2")])
+    hits = index.search("Senior Python engineer with Kubernetes and PostgreSQL", k=1)
+    assert [hit.name for hit in hits] == ["python.pdf"]
+
+    reopened = ResumeIndex(str(tmp_path))
+    assert set(reopened.names()) == {"python.pdf", "design.pdf"}
+    reopened.remove("python.pdf")
+    assert [hit.name for hit in reopened.search("Python Kubernetes PostgreSQL")] == []
+
+
+def test_update_index_skips_and_reports_resumes_without_text(tmp_path, monkeypatch):
+    # The resume files hold their text
+    monkeypatch.setattr(batch, "extract_pdf_text", lambda pdf_bytes, max_chars: pdf_bytes.decode("utf-8"))
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    index = ResumeIndex(str(tmp_path / "index"))
+    paths = write_resumes(resumes, {"python.pdf": PYTHON, "design.pdf": DESIGN, "scan.pdf": ""})
+
+    added, removed, skipped = update_index(index, paths)
+    assert (added, removed) == (2, 0)
+    assert [name for name, _ in skipped] == ["scan.pdf"]
+    assert "scan.pdf" not in index
+
+    # Unchanged files are not re-read; a resume replaced by a scan leaves the index
+    write_resumes(resumes, {"design.pdf": "(cid:3)(cid:4)"})
+    added, removed, skipped = update_index(index, paths)
+    assert (added, removed) == (0, 1)
+    assert sorted(name for name, _ in skipped) == ["design.pdf", "scan.pdf"]
+    assert set(index.names()) == {"python.pdf"}
+
+
+def test_flush_compacts_once_segments_or_deletions_pile_up(tmp_path):
+    index = ResumeIndex(str(tmp_path))
+    for number in range(COMPACT_MAX_SEGMENTS + 1):
+        index.add(f"resume{number}.pdf", PYTHON, f"d{number}")
+        index.flush()
+    assert len(index._segments) == 1
+
+    # Replacing most documents marks the old versions deleted until the next compaction drops them
+    for number in range(COMPACT_MAX_SEGMENTS // 2):
+        index.add(f"resume{number}.pdf", DESIGN, f"e{number}")
+    index.flush()
+    assert not index._deleted
+    assert len(index._segments) == 1
+    assert len(index.search("Figma design systems", k=100)) == COMPACT_MAX_SEGMENTS // 2
+
+
+def test_documents_keyed_by_digest_keep_their_file_name_as_title(tmp_path):
+    for index in (ResumeIndex(str(tmp_path / "bm25")), SemanticIndex(str(tmp_path / "semantic"))):
+        index.add("d1", PYTHON, digest="d1", title="resume.pdf")
+        index.add("d2", DESIGN, digest="d2", title="resume.pdf")
+        index.flush()
+        assert set(index.names()) == {"d1", "d2"}
+
+        reopened = type(index)(index.directory)
+        hits = reopened.search("Python Kubernetes PostgreSQL payments", k=1)
+        assert [(hit.name, hit.title) for hit in hits] == [("d1", "resume.pdf")]
+
+
+def test_unindexable_reason_rejects_scans_and_unreadable_glyphs_only():
+    assert unindexable_reason("Python engineer") is None
+    assert unindexable_reason("") == "no text layer (likely scanned)"
+    assert unindexable_reason("(cid:3)(cid:4)(cid:5)") == "no text layer (likely scanned)"
+    assert unindexable_reason("\ufffd" * 40 + "Python") == "text layer is mostly unreadable glyphs"
@@ -0,0 +1,60 @@
+from ats_resume.jobdesc import normalize_job_description, prepare_job_description
+
+POSTING = """About Acme
+Acme has built payment software since 1999 and now serves customers in forty countries around the world.
+
+About the role
+You will design and run the services behind our checkout.
+
+Requirements:
+• 5+ years of Python
+• Experience with PostgreSQL
+
+Nice to have:
+• Kubernetes
+
+Benefits
+Unlimited holidays and a generous pension.
+
+Acme is an equal opportunity employer.
+"""
+
+
+def test_boilerplate_sections_and_lines_are_stripped():
+    prepared = prepare_job_description(POSTING)
+    assert "About the role" in prepared.text
+    assert "checkout" in prepared.text
+    for boilerplate in ("payment software since 1999", "Unlimited holidays", "equal opportunity"):
+        assert boilerplate not in prepared.text
+    assert prepared.tokens < prepared.original_tokens
+
+
+def test_requirements_and_preferred_items_are_pulled_out():
+    prepared = prepare_job_description(POSTING)
+    assert prepared.requirements == ("5+ years of Python", "Experience with PostgreSQL")
+    assert prepared.preferred == ("Kubernetes",)
+
+
+def test_requirement_bullets_outside_a_requirements_section_are_found():
+    prepared = prepare_job_description("We build tools.\n- Proficiency in Go\n- Lunch on Fridays\n")
+    assert prepared.requirements == ("Proficiency in Go",)
+
+
+def test_normalization_unifies_bullets_and_drops_repeated_lines():
+    assert normalize_job_description("* Python\r\n\r\n\r\n2) SQL\n* python  \n") == "- Python\n\n- SQL"
+
+
+def test_digest_is_stable_across_whitespace_and_bullet_style():
+    prepared = prepare_job_description(POSTING)
+    reformatted = prepare_job_description(POSTING.replace("•", "-").replace("\n", "\r\n  "))
+    assert reformatted.digest == prepared.digest
+    assert reformatted.requirements == prepared.requirements
+    # Savings are reported against the text as pasted
+    assert reformatted.original_tokens > prepared.original_tokens
+    assert prepare_job_description(POSTING + "Remote.").digest != prepared.digest
+
+
+def test_stripping_nearly_everything_keeps_the_original():
+    text = "Benefits\n" + "Free snacks and a great office. " * 20 + "\nSenior Python engineer."
+    prepared = prepare_job_description(text)
+    assert prepared.text == normalize_job_description(text)
@@ -0,0 +1,53 @@
+import contextvars
+
+from ats_resume.jobs import DONE, FAILED, JobQueue
+from ats_resume.telemetry import span
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def traced(on_progress):
+    with span("model_call", model="m"):
+        on_progress(step=1)
+    return request_id.get()
+
+
+def failing(on_progress):
+    with span("model_call"):
+        raise ValueError("boom")
+
+
+def test_job_runs_in_the_submitters_context_and_keeps_its_spans():
+    queue = JobQueue(max_workers=1)
+    try:
+        token = request_id.set("r-1")
+        try:
+            job_id = queue.submit(traced)
+        finally:
+            request_id.reset(token)
+        job = queue.wait(job_id, timeout=5)
+    finally:
+        queue.shutdown()
+    assert job.status == DONE and job.result == "r-1"
+    assert job.info == {"step": 1}
+    assert [record.name for record in job.spans] == ["model_call"]
+
+
+def test_failed_job_keeps_its_spans_and_error():
+    queue = JobQueue(max_workers=1)
+    try:
+        job = queue.wait(queue.submit(failing), timeout=5)
+    finally:
+        queue.shutdown()
+    assert job.status == FAILED and job.error_type == "ValueError"
+    assert [(record.name, record.error) for record in job.spans] == [("model_call", "ValueError")]
+
+
+def test_live_key_is_deduplicated():
+    queue = JobQueue(max_workers=1)
+    try:
+        first = queue.submit(traced, key="same")
+        assert queue.submit(traced, key="same") == first
+        queue.wait(first, timeout=5)
+    finally:
+        queue.shutdown()
@@ -0,0 +1,61 @@
+import pytest
+
+from ats_resume.keywords import KeywordScorer, extract_keywords, iter_terms, score_matrix, score_resume
+
+JOB = """Backend Engineer
+
+Requirements:
+- Python and PostgreSQL
+- Kubernetes in production
+
+Nice to have:
+- Terraform
+"""
+
+
+def test_terms_map_synonyms_phrases_and_plurals_to_one_form():
+    terms = [term for term, _ in iter_terms("Py, k8s and Postgres; Machine Learning pipelines with ReactJS.")]
+    assert terms == ["python", "kubernetes", "postgresql", "machine learning", "pipeline", "react"]
+
+
+def test_stopwords_and_job_ad_filler_are_dropped():
+    assert [term for term, _ in iter_terms("The ideal candidate has strong experience with Go.")] == ["go"]
+
+
+def test_surface_keeps_the_text_as_written():
+    assert list(iter_terms("K8s")) == [("kubernetes", "k8s")]
+
+
+def test_must_have_keywords_outweigh_nice_to_have_ones():
+    weights = {term: weight for term, _, weight in extract_keywords(JOB)}
+    assert weights["python"] == weights["kubernetes"] == 2 * weights["terraform"]
+
+    # Missing a requirement costs more than missing a nice-to-have
+    without_requirement = score_resume("Python, PostgreSQL, Terraform", JOB)
+    without_nice_to_have = score_resume("Python, PostgreSQL, Kubernetes", JOB)
+    assert without_requirement.score < without_nice_to_have.score
+    assert without_requirement.missing[0] == "kubernetes"
+
+
+@pytest.mark.parametrize("resume", ["", "Gardening and cooking", "Python PostgreSQL Kubernetes Terraform backend engineer"])
+def test_scores_stay_between_zero_and_one_hundred(resume):
+    score = score_resume(resume, JOB)
+    assert 0 <= score.score <= 100
+    assert len(score.found) + len(score.missing) == len(extract_keywords(JOB))
+
+
+def test_full_and_empty_matches_hit_the_bounds():
+    scorer = KeywordScorer(JOB)
+    assert scorer.score(JOB).score == 100
+    assert scorer.score("").score == 0
+    assert KeywordScorer("").score("Python").score == 0
+
+
+def test_batch_scores_match_single_scores():
+    resumes = ["Python and Kubernetes", "Terraform", JOB]
+    scorer = KeywordScorer(JOB)
+    assert scorer.score_many(resumes) == [scorer.score(resume) for resume in resumes]
+    matrix = score_matrix(resumes, [JOB, ""])
+    assert matrix.shape == (3, 2)
+    assert [round(float(value)) for value in matrix[:, 0]] == [scorer.score(resume).score for resume in resumes]
+    assert not matrix[:, 1].any()
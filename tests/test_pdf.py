@@ -0,0 +1,116 @@
+from ats_resume import pdf
+from ats_resume.pdf_cache import PdfCache
+
+
+def test_cached_text_keeps_the_page_count(tmp_path, monkeypatch):
+    calls = []
+
+    def extract(pdf_bytes, max_chars):
+        calls.append(pdf_bytes)
+        return "resume text", 3
+
+    monkeypatch.setattr(pdf, "extract_pdf_text_with_page_count", extract)
+    cache = PdfCache(disk_dir=str(tmp_path))
+    assert pdf._cached_text(b"%PDF", cache) == ("resume text", 3)
+    assert pdf._cached_text(b"%PDF", cache) == ("resume text", 3)
+    # Another process reading the disk tier gets the count without parsing the PDF either
+    assert pdf._cached_text(b"%PDF", PdfCache(disk_dir=str(tmp_path))) == ("resume text", 3)
+    assert calls == [b"%PDF"]
+
+
+CLEAN = "Senior backend engineer building payment services in Python and PostgreSQL. " * 10
+SPARSE = "Jane Doe, backend engineer. Python, PostgreSQL and Kubernetes for payment services."
+
+
+def prepare(monkeypatch, text, page_count=2, **kwargs):
+    """Run prepare_pdf_content on a fake PDF whose text layer is ``text``; returns (content, decision, rendered pages)"""
+    from PIL import Image
+
+    rendered = []
+
+    def render(pdf_bytes, page_numbers, dpi, cache, thread_count):
+        rendered.extend(page_numbers)
+        return [Image.new("RGB", (40, 60), "white") for _ in page_numbers]
+
+    monkeypatch.setattr(pdf, "pdf2image_available", lambda: True)
+    monkeypatch.setattr(pdf, "extract_pdf_text_with_page_count", lambda pdf_bytes, max_chars: (text, page_count))
+    monkeypatch.setattr(pdf, "pdf_page_count", lambda pdf_bytes: page_count)
+    monkeypatch.setattr(pdf, "iter_page_images", render)
+    decisions = []
+    content = pdf.prepare_pdf_content(b"%PDF", on_route=decisions.append, **kwargs)
+    return content, decisions[0], rendered
+
+
+def test_clean_text_layer_skips_rendering(monkeypatch):
+    content, decision, rendered = prepare(monkeypatch, CLEAN, page_count=1)
+    assert (decision.route, content, rendered) == ("text", CLEAN, [])
+    assert decision.saved_seconds > 0
+
+
+def test_scanned_pdf_is_rendered(monkeypatch):
+    content, decision, rendered = prepare(monkeypatch, "", page_count=2)
+    assert (decision.route, decision.reason) == ("image", "no usable text layer (likely scanned)")
+    assert rendered == [1, 2]
+    assert len(content) == 2 and not any(isinstance(page, str) for page in content)
+
+
+def test_sparse_text_layer_sends_text_and_pages(monkeypatch):
+    content, decision, rendered = prepare(monkeypatch, SPARSE, page_count=1, mode="auto")
+    assert decision.route == "both"
+    assert content[0] == SPARSE and len(content) == 2
+
+
+def test_forced_text_mode_never_renders(monkeypatch):
+    content, decision, rendered = prepare(monkeypatch, "", mode="text")
+    assert (decision.route, decision.reason, content, rendered) == ("text", "configured", "", [])
+
+
+def test_render_failure_falls_back_to_text(monkeypatch):
+    def fail(*args):
+        raise RuntimeError("poppler crashed")
+
+    warnings = []
+    monkeypatch.setattr(pdf, "iter_page_images", fail)
+    monkeypatch.setattr(pdf, "pdf2image_available", lambda: True)
+    monkeypatch.setattr(pdf, "pdf_page_count", lambda pdf_bytes: 1)
+    monkeypatch.setattr(pdf, "extract_pdf_text_with_page_count", lambda pdf_bytes, max_chars: (SPARSE, 1))
+    decisions = []
+    content = pdf.prepare_pdf_content(b"%PDF", mode="image", on_route=decisions.append, on_warning=warnings.append)
+    assert (decisions[0].route, decisions[0].reason, content) == ("text", "rendering failed", SPARSE)
+    assert warnings and "poppler crashed" in warnings[0]
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self):
+        return self.text
+
+
+def reader_text(pages, max_chars=None):
+    reader = type("Reader", (), {"pages": [FakePage(text) for text in pages]})
+    return list(pdf._iter_reader_text(reader, max_chars))
+
+
+def test_words_hyphenated_across_pages_are_rejoined():
+    assert reader_text(["Senior devel-", "opment lead"]) == ["Senior", "development lead"]
+    # A capitalised next page is a real hyphen, not a broken word
+    assert reader_text(["Python-", "Django"]) == ["Python-\nDjango"]
+    # Blank pages in between keep the fragment, and a fragment on the last page is kept whole
+    assert reader_text(["Senior devel-", "", None, "opment"]) == ["Senior", "development"]
+    assert reader_text(["Skills: Kuber-"]) == ["Skills:", "Kuber"]
+
+
+def test_blank_pages_are_skipped_and_not_charged_to_the_cap():
+    pages = ["", "Python", None, " \n ", "SQL"]
+    assert reader_text(pages) == ["Python", "SQL"]
+    assert "\n".join(reader_text(pages, max_chars=10)) == "Python\nSQL"
+
+
+def test_cap_truncates_the_joined_text_without_empty_pages():
+    assert reader_text(["Python developer", "SQL"], max_chars=6) == ["Python"]
+    # The joining newline uses up the cap, so no empty page text follows
+    assert reader_text(["Python", "SQL"], max_chars=7) == ["Python"]
+    assert reader_text(["Python", "SQL"], max_chars=9) == ["Python", "SQ"]
+    assert reader_text(["Python"], max_chars=0) == []
@@ -0,0 +1,68 @@
+import os
+import time
+
+import pytest
+
+from ats_resume import pdf_cache
+from ats_resume.pdf_cache import PdfCache, _entry_size, make_cache_key
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = PdfCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa" and cache.get("c") == "cccc"
+
+
+def test_other_values_are_sized_by_pickle():
+    assert _entry_size(("x" * 1000, 3)) > 1000
+    cache = PdfCache(max_bytes=100)
+    cache.put("big", {"text": "x" * 1000})
+    assert cache.get("big") is None
+
+
+def test_disk_tier_is_shared_and_bounded(tmp_path):
+    writer = PdfCache(disk_dir=str(tmp_path), max_disk_bytes=2500)
+    for index in range(3):
+        writer.put(f"key{index}", str(index) * 1000)
+        # Distinct modification times for the LRU order
+        os.utime(tmp_path / f"key{index}.txt", (time.time() - 100 + index, time.time() - 100 + index))
+    # key0 went when key2 pushed the directory over; reading key1 makes key2 the oldest
+    reader = PdfCache(disk_dir=str(tmp_path), max_disk_bytes=2500)
+    assert reader.get("key1") == "1" * 1000
+    writer.put("key3", "3" * 1000)
+    names = sorted(os.listdir(tmp_path))
+    assert names == ["key1.txt", "key3.txt"]
+    assert sum(os.path.getsize(tmp_path / name) for name in names) <= 2500
+
+
+def test_rewriting_an_entry_only_counts_its_new_size(tmp_path):
+    cache = PdfCache(disk_dir=str(tmp_path), max_disk_bytes=2500)
+    cache.put("key0", "0" * 1000)
+    for _ in range(5):
+        cache.put("key1", "1" * 1000)
+    assert cache._disk_size == 2000
+    cache.put("key1", "1" * 500)
+    assert cache._disk_size == 1500
+    # Nothing was evicted for the repeated writes
+    assert sorted(os.listdir(tmp_path)) == ["key0.txt", "key1.txt"]
+
+
+def test_failed_disk_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pdf_cache.os, "replace", fail)
+    PdfCache(disk_dir=str(tmp_path)).put("key", "text")
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("settings", [{"dpi": 100}, {"dpi": 200}])
+def test_cache_key_depends_on_bytes_and_settings(settings):
+    key = make_cache_key(b"%PDF-1", **settings)
+    assert key == make_cache_key(b"%PDF-1", **settings)
+    assert key != make_cache_key(b"%PDF-2", **settings)
+    assert key != make_cache_key(b"%PDF-1", dpi=300)
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from ats_resume import ratelimit
+from ats_resume.errors import RateLimitTimeout
+from ats_resume.ratelimit import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    RateLimiter,
+    SqliteBucketStore,
+    call_with_retries,
+    is_rate_limit_error,
+)
+
+
+class HttpError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def test_rate_limit_errors_are_recognised_by_type_then_status_then_message():
+    assert is_rate_limit_error(google_exceptions.ResourceExhausted("out of tokens"))
+    assert is_rate_limit_error(HttpError("slow down", 429))
+    # A status code outranks a message that mentions quota
+    assert not is_rate_limit_error(google_exceptions.NotFound("quota project not found"))
+    assert not is_rate_limit_error(HttpError("quota dashboard unavailable", 503))
+    assert is_rate_limit_error(RuntimeError("429 Too Many Requests"))
+    assert not is_rate_limit_error(RuntimeError("request 14290 failed"))
+
+
+def test_requests_per_minute_budget_blocks_until_timeout():
+    limiter = RateLimiter(rpm=2)
+    limiter.acquire()
+    limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(timeout=0.05)
+    assert limiter.stats()["granted"] == 2
+
+
+def test_large_requests_are_capped_to_the_token_budget():
+    limiter = RateLimiter(tpm=100)
+    assert limiter.acquire(tokens=10_000, timeout=0.05) < 0.05
+
+
+def test_buckets_are_shared_through_sqlite(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    first = RateLimiter(rpm=1, store=SqliteBucketStore(path))
+    second = RateLimiter(rpm=1, store=SqliteBucketStore(path))
+    first.acquire()
+    with pytest.raises(RateLimitTimeout):
+        second.acquire(timeout=0.05)
+
+
+def test_interactive_callers_are_served_before_batch():
+    limiter = RateLimiter()
+    # Hold every caller back so both are queued when the pause ends
+    limiter.throttle(0.2)
+    order = []
+
+    def caller(priority, label):
+        limiter.acquire(priority=priority)
+        order.append(label)
+
+    threads = [threading.Thread(target=caller, args=(PRIORITY_BATCH, "batch"))]
+    threads[0].start()
+    deadline = time.monotonic() + 1
+    while limiter.stats()["queue_depth"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=caller, args=(PRIORITY_INTERACTIVE, "interactive")))
+    threads[1].start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == ["interactive", "batch"]
+
+
+def test_throttle_halves_the_rate_and_successes_restore_it():
+    limiter = RateLimiter(rpm=60, min_rate_fraction=0.25)
+    limiter.throttle(0)
+    limiter.throttle(0)
+    limiter.throttle(0)
+    assert limiter.stats()["rate_fraction"] == 0.25
+    limiter.record_success()
+    assert limiter.stats()["rate_fraction"] == 0.3
+
+
+def test_retries_transient_errors_using_the_retry_hint(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(ratelimit.time, "sleep", sleeps.append)
+    failures = [google_exceptions.ServiceUnavailable("try again, retry in 3s"), ConnectionError("reset")]
+    retries = []
+
+    def call():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert call_with_retries(call, on_retry=lambda *args: retries.append(args[:2])) == "ok"
+    assert sleeps[0] == 3.0
+    assert [attempt for attempt, _ in retries] == [1, 2]
+
+
+def test_rate_limit_errors_throttle_the_limiter_instead_of_sleeping(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, "sleep", lambda delay: pytest.fail("slept"))
+    limiter = RateLimiter(rpm=600)
+    failures = [google_exceptions.ResourceExhausted("quota, retry in 0.01s")]
+
+    def call():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert call_with_retries(call, limiter=limiter) == "ok"
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_gives_up_after_max_retries_and_on_other_errors(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, "sleep", lambda delay: None)
+    calls = []
+
+    def unavailable():
+        calls.append(1)
+        raise google_exceptions.ServiceUnavailable("down")
+
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        call_with_retries(unavailable, max_retries=2)
+    assert len(calls) == 3
+
+    def invalid():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        call_with_retries(invalid)
+    assert len(calls) == 4
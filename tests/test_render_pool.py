@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+
+import pytest
+
+from ats_resume.errors import RenderLimitError
+from ats_resume.render_pool import RenderLimits, RenderPool
+
+
+@pytest.fixture
+def pool():
+    pool = RenderPool(max_workers=2, limits=RenderLimits(timeout_seconds=1, max_memory_mb=0))
+    yield pool
+    pool.shutdown()
+
+
+def test_timeout_interrupts_the_job_and_keeps_the_worker(pool):
+    assert pool._run(os.getpid) > 0
+    pid = pool._run(os.getpid)
+    with pytest.raises(RenderLimitError, match="longer than 1s"):
+        pool._run(time.sleep, 5)
+    assert pool._run(os.getpid) == pid
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_time_queued_for_a_worker_is_not_counted():
+    pool = RenderPool(max_workers=1, limits=RenderLimits(timeout_seconds=1, max_memory_mb=0))
+    errors = []
+
+    def run():
+        try:
+            pool._run(time.sleep, 0.8)
+        except RenderLimitError as e:
+            errors.append(e)
+
+    try:
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        pool.shutdown()
+    assert errors == []
+
+
+def test_a_crash_only_fails_its_own_render(pool):
+    results = []
+    sleeper = threading.Thread(target=lambda: results.append(pool._run(time.sleep, 0.5)))
+    sleeper.start()
+    time.sleep(0.1)
+    with pytest.raises(RenderLimitError, match="crashed"):
+        pool._run(os._exit, 1)
+    sleeper.join()
+    assert results == [None]
+    assert pool.stats()["crashes"] == 1
+
+
+def test_a_worker_is_killed_when_sending_the_job_fails(pool):
+    pid = pool._run(os.getpid)
+    # A lambda cannot be pickled, so the job never reaches the worker
+    with pytest.raises(Exception, match="pickle"):
+        pool._run(len, lambda: None)
+    assert pool._idle == []
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+    assert pool._run(os.getpid) != pid
+
+
+def test_pages_are_cached_at_the_dpi_actually_used(pool, monkeypatch):
+    from ats_resume.pdf_cache import make_cache_key
+
+    class Cache(dict):
+        def put(self, key, value):
+            self[key] = value
+
+    rendered = []
+    monkeypatch.setattr(pool, "fit_dpi", lambda pdf_bytes, pages, dpi: 100)
+
+    def render(pdf_bytes, page_numbers, dpi, thread_count, page_count, timeout=None):
+        rendered.append(dpi)
+        return [f"page {page}" for page in page_numbers], 0.0
+
+    monkeypatch.setattr(pool, "render", render)
+    cache = Cache()
+    assert list(pool.render_pages(b"%PDF", [1, 2], 200, 2, 2, cache)) == ["page 1", "page 2"]
+    assert rendered == [100]
+    assert set(cache) == {make_cache_key(b"%PDF", mode="image", dpi=100, page=page) for page in (1, 2)}
+    assert list(pool.render_pages(b"%PDF", [1, 2], 200, 2, 2, cache)) == ["page 1", "page 2"]
+    assert rendered == [100]
+
+
+def test_uncached_pages_are_rendered_in_order_a_chunk_at_a_time(pool, monkeypatch):
+    from ats_resume.pdf_cache import PdfCache, make_cache_key
+
+    cache = PdfCache()
+    cache.put(make_cache_key(b"%PDF", mode="image", dpi=200, page=3), "cached 3")
+    chunks = []
+    monkeypatch.setattr(pool, "fit_dpi", lambda pdf_bytes, pages, dpi: dpi)
+
+    def render(pdf_bytes, page_numbers, dpi, thread_count, page_count, timeout=None):
+        chunks.append(list(page_numbers))
+        return [f"page {page}" for page in page_numbers], 0.0
+
+    monkeypatch.setattr(pool, "render", render)
+    pages = list(pool.render_pages(b"%PDF", [1, 2, 3, 4, 5], 200, 2, 5, cache))
+    assert pages == ["page 1", "page 2", "cached 3", "page 4", "page 5"]
+    assert chunks == [[1, 2], [4, 5]]
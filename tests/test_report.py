@@ -0,0 +1,46 @@
+import json
+
+from ats_resume.report import parse_report, section_marker, split_report
+
+KEYS = ["resume_review", "skill_gap", "improvement"]
+
+
+def report(*sections):
+    return "\n".join(f"{section_marker(key)}\n{body}" for key, body in sections)
+
+
+def test_split_report_maps_each_marker_to_its_section():
+    text = report(("resume_review", "Strong fit."), ("skill_gap", "Missing Go."), ("improvement", "Add metrics."))
+    assert split_report(text, KEYS) == {
+        "resume_review": "Strong fit.", "skill_gap": "Missing Go.", "improvement": "Add metrics.",
+    }
+
+
+def test_split_report_leaves_out_a_missing_or_empty_section():
+    text = report(("resume_review", "Strong fit."), ("skill_gap", ""))
+    assert split_report(text, KEYS) == {"resume_review": "Strong fit."}
+
+
+def test_split_report_accepts_reordered_and_decorated_markers():
+    text = f"**{section_marker('improvement')}**\nAdd metrics.\n## {section_marker('resume_review')}:\nStrong fit."
+    assert split_report(text, KEYS) == {"improvement": "Add metrics.", "resume_review": "Strong fit."}
+
+
+def test_split_report_ignores_stray_markers():
+    # An unknown key ends the section before it; a repeated key keeps the first body
+    text = report(("resume_review", "Strong fit."), ("footnote", "Ignore me."), ("resume_review", "Second copy."))
+    assert split_report(text, KEYS) == {"resume_review": "Strong fit."}
+    # A marker that is not on its own line is part of the body
+    text = report(("skill_gap", "Use <<<improvement>>> markers."))
+    assert split_report(text, KEYS) == {"skill_gap": "Use <<<improvement>>> markers."}
+
+
+def test_parse_report_drops_missing_and_invalid_sections():
+    data = {
+        "improvement": {"keywords_missing": ["Go"], "recommendations": ["Add Go"]},
+        "skill_gap": {"skills_found": "Python"},
+        "footnote": {},
+    }
+    results = parse_report(json.dumps(data), KEYS)
+    assert list(results) == ["improvement"]
+    assert results["improvement"].keywords_missing == ("Go",)
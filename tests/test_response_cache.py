@@ -0,0 +1,54 @@
+import time
+
+from ats_resume import response_cache
+from ats_resume.response_cache import (
+    MemoryResponseCache,
+    SqliteResponseCache,
+    TieredResponseCache,
+    content_digest,
+    make_response_key,
+)
+
+
+def test_key_ignores_prompt_whitespace_but_not_inputs():
+    key = make_response_key("Review   this\n resume", "model", {"temperature": 0}, "r", "j")
+    assert key == make_response_key("Review this resume", "model", {"temperature": 0}, "r", "j")
+    assert key != make_response_key("Review this resume", "model", {"temperature": 0}, "r", "other")
+    assert content_digest(["a", "b"]) != content_digest(["b", "a"])
+
+
+def test_memory_cache_is_lru_with_ttl(monkeypatch):
+    cache = MemoryResponseCache(max_entries=2, ttl=10)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    now = time.time()
+    monkeypatch.setattr(response_cache.time, "time", lambda: now + 60)
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_sqlite_cache_persists_and_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = SqliteResponseCache(path, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.close()
+
+    reopened = SqliteResponseCache(path, max_entries=2)
+    assert reopened.get("a") == "1"
+    reopened.set("c", "3")
+    assert reopened.get("b") is None
+    assert reopened.get("a") == "1" and reopened.get("c") == "3"
+    reopened.close()
+
+
+def test_tiered_cache_fills_memory_from_the_persistent_tier(tmp_path):
+    persistent = SqliteResponseCache(str(tmp_path / "responses.db"))
+    persistent.set("key", "value")
+    cache = TieredResponseCache(MemoryResponseCache(), persistent)
+    assert cache.get("key") == "value"
+    assert cache.memory.get("key") == "value"
+    persistent.close()
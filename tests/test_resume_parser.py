@@ -0,0 +1,68 @@
+from datetime import date
+
+from ats_resume.resume_parser import ParsedResume, compact_content, parse_resume, section_heading
+
+TODAY = date(2024, 6, 1)
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 010 0199
+
+Experience
+Senior Engineer, Acme Corp    Jan 2020 - Present
+- Built internal tools for the data team
+- Led the move to Kubernetes
+Engineer, Beta Inc    2016 - 2019
+- Maintained the billing service
+
+Skills
+Languages: Python, Go
+Tools: Docker, Kubernetes
+
+Education: BSc Computer Science, State University 2015
+"""
+
+
+def test_section_heading_is_a_whole_line_section_name():
+    assert section_heading("Experience") == ("Experience", "experience", "")
+    assert section_heading("  TECHNICAL SKILLS:  ") == ("TECHNICAL SKILLS", "skills", "")
+    assert section_heading("Education: BSc, 2015") == ("Education", "education", "BSc, 2015")
+    assert section_heading("Built internal tools") is None
+    assert section_heading("Tools: Docker, Kubernetes") is None
+
+
+def test_body_line_mentioning_tools_does_not_open_a_section():
+    parsed = parse_resume(RESUME, today=TODAY)
+    assert [position.heading for position in parsed.experience] == [
+        "Senior Engineer, Acme Corp", "Engineer, Beta Inc",
+    ]
+    assert parsed.experience[0].details == ("Built internal tools for the data team", "Led the move to Kubernetes")
+    # Jan 2020 - Jun 2024 and 2016 - 2019
+    assert parsed.experience_months == 54 + 48
+
+
+def test_labelled_skill_lines_are_kept():
+    parsed = parse_resume(RESUME, today=TODAY)
+    assert parsed.skills == ("Python", "Go", "Docker", "Kubernetes")
+
+
+def test_text_after_heading_colon_is_section_body():
+    parsed = parse_resume(RESUME, today=TODAY)
+    assert [entry.year for entry in parsed.education] == [2015]
+    assert parsed.education[0].text == "BSc Computer Science, State University 2015"
+    assert parsed.contact.name == "Jane Doe"
+    assert parsed.contact.email == "jane@example.com"
+
+
+def test_unplaced_lines_are_kept_in_other():
+    text = "Jane Doe\n\nExperience\nOpen to contract work\nEngineer, Acme 2019 - 2020\n\nSkills\n" \
+           "Comfortable presenting to large non-technical audiences"
+    parsed = parse_resume(text, today=TODAY)
+    assert ("Experience", "Open to contract work") in parsed.other
+    assert ("Skills", "Comfortable presenting to large non-technical audiences") in parsed.other
+
+
+def test_round_trip_and_compact_content():
+    parsed = parse_resume(RESUME, today=TODAY)
+    assert ParsedResume.from_dict(parsed.as_dict()) == parsed
+    compact = compact_content(RESUME, parsed)
+    assert "Docker" in compact and "Beta Inc" in compact
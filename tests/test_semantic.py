@@ -0,0 +1,58 @@
+import numpy as np
+
+from ats_resume import semantic
+from ats_resume.batch import build_tasks, shortlist_resumes
+from ats_resume.semantic import HashingEmbedder, SemanticIndex, top_k
+
+RESUMES = {
+    "data.pdf": "Data analyst. SQL, Tableau dashboards and data analysis of sales figures.",
+    "analytics.pdf": "Analytics engineer. SQL, dbt and data pipelines; some Tableau reporting.",
+    "backend.pdf": "Backend engineer. Python, Django and PostgreSQL services.",
+    "chef.pdf": "Pastry chef. Croissants, sourdough and plated desserts.",
+}
+JOB = "Data analyst to build Tableau dashboards with SQL and analyse sales data"
+
+
+def test_hashing_embedding_is_deterministic_and_normalized():
+    texts = list(RESUMES.values())
+    first = HashingEmbedder().embed_many(texts)
+    # A fresh embedder, with no cached term slots, gives the same vectors
+    second = HashingEmbedder().embed_many(texts)
+    assert first.dtype == np.float32 and first.shape == (4, semantic.DEFAULT_DIMENSIONS)
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-5)
+    assert not HashingEmbedder().embed_many(["the and of"]).any()
+
+
+def test_search_ranks_by_cosine_similarity(tmp_path):
+    index = SemanticIndex(str(tmp_path))
+    index.add_many((name, text, None) for name, text in RESUMES.items())
+    hits = index.search(JOB, k=10)
+    assert [hit.name for hit in hits][:2] == ["data.pdf", "analytics.pdf"]
+    assert all(earlier.score >= later.score for earlier, later in zip(hits, hits[1:]))
+    # Resumes sharing nothing with the job description are not hits at all
+    assert "chef.pdf" not in [hit.name for hit in hits]
+
+    reopened = SemanticIndex(str(tmp_path))
+    assert [hit.name for hit in reopened.search(JOB, k=2)] == ["data.pdf", "analytics.pdf"]
+
+
+def test_top_k_cut_off_holds_across_search_blocks(monkeypatch):
+    monkeypatch.setattr(semantic, "SEARCH_BLOCK_ROWS", 2)
+    index = SemanticIndex()
+    index.add_many((name, text, None) for name, text in RESUMES.items())
+    assert [hit.name for hit in index.search(JOB, k=2)] == ["data.pdf", "analytics.pdf"]
+    assert top_k(np.array([[0.1, 0.9, 0.5]]), 5).tolist() == [[1, 2, 0]]
+
+
+def test_shortlist_only_pairs_a_job_description_with_its_top_resumes(tmp_path):
+    index = SemanticIndex()
+    index.add_many((name, text, None) for name, text in RESUMES.items())
+    resume_paths = [str(tmp_path / name) for name in RESUMES]
+    jd_path = str(tmp_path / "analyst.txt")
+    (tmp_path / "analyst.txt").write_text(JOB, encoding="utf-8")
+
+    shortlists = shortlist_resumes(index, resume_paths, [jd_path], top_k=2)
+    assert shortlists == {jd_path: [str(tmp_path / "data.pdf"), str(tmp_path / "analytics.pdf")]}
+    tasks = build_tasks(resume_paths, [jd_path], ["ats_score"], shortlists=shortlists)
+    assert [resume_path for _, resume_path, _, _ in tasks] == shortlists[jd_path]
@@ -0,0 +1,73 @@
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+
+from ats_resume import client
+from ats_resume.errors import StructuredOutputError
+from ats_resume.report import generate_report
+from ats_resume.response_cache import MemoryResponseCache
+from ats_resume.structured import generate_structured_analysis
+
+VALID = '{"keywords_missing": ["Kubernetes"], "recommendations": ["Mention Kubernetes"]}'
+TRUNCATED = '{"keywords_missing": ["Kubernetes"], "recommen'
+
+
+class FakeRegistry:
+    """Answers each generate_content call with the next reply"""
+
+    limiter = None
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def connection(self):
+        return nullcontext()
+
+    def get_model(self, model_name, generation_config):
+        return self
+
+    def generate_content(self, parts):
+        self.calls += 1
+        return SimpleNamespace(text=self.replies.pop(0))
+
+
+@pytest.fixture(autouse=True)
+def configured(monkeypatch):
+    monkeypatch.setattr(client, "_configured", True)
+
+
+def test_invalid_structured_reply_is_not_cached():
+    cache = MemoryResponseCache()
+    registry = FakeRegistry(TRUNCATED, VALID)
+    with pytest.raises(StructuredOutputError):
+        generate_structured_analysis("improvement", "resume", "job", cache=cache, registry=registry)
+
+    result = generate_structured_analysis("improvement", "resume", "job", cache=cache, registry=registry)
+    assert result.keywords_missing == ("Kubernetes",)
+    # The valid reply is now served from the cache
+    assert generate_structured_analysis("improvement", "resume", "job", cache=cache, registry=registry) == result
+    assert registry.calls == 2
+
+
+def test_cached_reply_that_fails_validation_is_fetched_again():
+    cache = MemoryResponseCache()
+    assert client.generate_analysis("prompt", "resume", "job", cache=cache, registry=FakeRegistry(TRUNCATED)) == TRUNCATED
+
+    registry = FakeRegistry(VALID)
+    result = generate_structured_analysis("improvement", "resume", "job", cache=cache, registry=registry)
+    assert result.recommendations == ("Mention Kubernetes",)
+    assert registry.calls == 1
+
+
+def test_unreadable_structured_report_falls_back_without_caching_it():
+    cache = MemoryResponseCache()
+    registry = FakeRegistry("{", VALID)
+    fallbacks = []
+    sections = generate_report("resume", "job", ["improvement"], structured=True, cache=cache,
+                               registry=registry, on_fallback=fallbacks.append)
+    assert fallbacks == [["improvement"]]
+    assert sections["improvement"].keywords_missing == ("Kubernetes",)
+    # Only the fallback's reply was cached
+    assert [value for value, _ in cache._entries.values()] == [VALID]
@@ -0,0 +1,48 @@
+from ats_resume.textlayer import (
+    BAD_GARBAGE_RATIO,
+    GOOD_CHARS_PER_PAGE,
+    MIN_CHARS_PER_PAGE,
+    ROUTE_BOTH,
+    ROUTE_IMAGE,
+    ROUTE_TEXT,
+    TextLayerReport,
+    assess_text_layer,
+    choose_route,
+)
+
+
+def report(chars_per_page, coverage=1.0, garbage_ratio=0.0):
+    return TextLayerReport(1, int(chars_per_page), chars_per_page, coverage, garbage_ratio)
+
+
+def test_assess_counts_coverage_and_garbage():
+    layer = assess_text_layer("Python, SQL!\n�(cid:12)", 2)
+    # Eleven readable characters, one replacement character and one unmapped glyph
+    assert layer.char_count == 12
+    assert layer.chars_per_page == 6
+    assert layer.coverage == 11 / 12
+    assert layer.garbage_ratio == 2 / 13
+
+
+def test_assess_empty_and_glyph_only_layers():
+    assert assess_text_layer("", 0) == TextLayerReport(1, 0, 0.0, 0.0, 0.0)
+    assert assess_text_layer("(cid:1)(cid:2)", 1).garbage_ratio == 1.0
+
+
+def test_route_thresholds():
+    assert choose_route(report(MIN_CHARS_PER_PAGE - 1))[0] == ROUTE_IMAGE
+    assert choose_route(report(GOOD_CHARS_PER_PAGE))[0] == ROUTE_TEXT
+    # Sparse text, imperfect coverage or a little garbage sends both
+    assert choose_route(report(GOOD_CHARS_PER_PAGE - 1))[0] == ROUTE_BOTH
+    assert choose_route(report(GOOD_CHARS_PER_PAGE, coverage=0.8))[0] == ROUTE_BOTH
+    assert choose_route(report(GOOD_CHARS_PER_PAGE, garbage_ratio=0.05))[0] == ROUTE_BOTH
+    # Mostly unreadable glyphs are rendered however dense they are
+    assert choose_route(report(GOOD_CHARS_PER_PAGE, garbage_ratio=BAD_GARBAGE_RATIO + 0.01)) == (
+        ROUTE_IMAGE, "text layer is mostly unreadable glyphs")
+    assert choose_route(report(GOOD_CHARS_PER_PAGE, coverage=0.5))[0] == ROUTE_IMAGE
+
+
+def test_score_rewards_dense_clean_text():
+    assert report(GOOD_CHARS_PER_PAGE).score == 1.0
+    assert report(GOOD_CHARS_PER_PAGE / 2).score == 0.5
+    assert report(GOOD_CHARS_PER_PAGE, garbage_ratio=BAD_GARBAGE_RATIO).score == 0.0